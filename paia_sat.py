@@ -24,6 +24,8 @@ import random
 import signal
 import time
 
+from sat.dimacs import read_dimacs
+
 # Functions
 
 def receive_alarm(signum, stack):
@@ -46,33 +48,33 @@ signal.signal(signal.SIGALRM, receive_alarm)
 class CNF():
 	"""A CNF formula """
 
-	def __init__(self, cnf_file_name):
+	def __init__(self, cnf_file_name=None):
 		"""
 		Initialization
 		num_vars: Number of variables
 		num_clauses: Number of clauses
 		clause_length: Length of the clauses
 		clauses: List of clauses
+		dictionary: Numbers (from 1) of the clauses where each literal appears, indexed by literal
 		"""
 		self.num_vars = None
 		self.num_clauses = None
 		self.clauses = []
-		self.read_cnf_file(cnf_file_name)
+		self.dictionary = []
+		if cnf_file_name is not None:
+			self.read_cnf_file(cnf_file_name)
 
 	def read_cnf_file(self, cnf_file_name):
-		instance = open(cnf_file_name, "r")
-		for l in instance:
-			if l[0] == "c":
-				continue
-			if l[0] == "p":
-				sl = l.split()
-				self.num_vars = int(sl[2])
-				self.num_clauses = int(sl[3])
-				continue
-			if l.strip() == "":
-				continue
-			sl = list(map(int, l.split()))
-			sl.pop() # Remove last 0
+		self.load_formula(read_dimacs(cnf_file_name))
+
+	def load_formula(self, formula):
+		"""Takes the clauses of an already parsed sat.dimacs Formula"""
+		self.num_vars = formula.num_vars
+		self.num_clauses = formula.num_clauses
+		self.dictionary = [[] for _ in range(self.num_vars * 2 + 1)]
+		for sl in formula:
+			for l in sl:
+				self.dictionary[l].append(len(self.clauses) + 1)
 			self.clauses.append(sl)
 
 	def show(self):
@@ -107,6 +109,12 @@ class Interpretation():
 				cost += 1
 		return cost
 
+	def assign(self, var, value):
+		self.vars[var] = value
+
+	def unassign(self, var):
+		self.vars[var] = None
+
 	def copy(self):
 		new = Interpretation(self.num_vars)
 		new.vars = list(self.vars)
@@ -123,17 +131,54 @@ class Interpretation():
 				sys.stdout.write('%i ' % (v + 1))
 			sys.stdout.write('0\n')
 
+class IncrementalInterpretation(Interpretation):
+	"""An interpretation that keeps the cost up to date while variables are assigned"""
+
+	def __init__(self, cnf):
+		"""
+		Initialization
+		false_lits: Number of falsified literals per clause
+		falsified: Number of clauses with all their literals falsified
+		"""
+		Interpretation.__init__(self, cnf.num_vars)
+		self.cnf = cnf
+		self.lengths = [0] + [len(c) for c in cnf.clauses] # Clauses are numbered from 1 in cnf.dictionary
+		self.false_lits = [0] * len(self.lengths)
+		self.falsified = 0
+
+	def cost(self):
+		return self.falsified
+
+	def assign(self, var, value):
+		self.vars[var] = value
+		lit = var if value == 1 else -var
+		for c in self.cnf.dictionary[-lit]:
+			self.false_lits[c] += 1
+			if self.false_lits[c] == self.lengths[c]: # All the literals falsified
+				self.falsified += 1
+
+	def unassign(self, var):
+		if self.vars[var] == None:
+			return
+		lit = var if self.vars[var] == 1 else -var
+		self.vars[var] = None
+		for c in self.cnf.dictionary[-lit]:
+			if self.false_lits[c] == self.lengths[c]:
+				self.falsified -= 1
+			self.false_lits[c] -= 1
+
 class Solver():
 	"""The class Solver implements an algorithm to solve a given problem instance"""
 
-	def __init__(self, cnf):
+	def __init__(self, cnf, incremental=True):
 		"""
 		Initialization
-		TODO
+		incremental: Track falsified clauses on assignment instead of rescanning the formula
 		"""
 		self.cnf = cnf
 		self.best_sol = None
 		self.best_cost = cnf.num_clauses + 1
+		self.incremental = incremental
 
 	def solve(self):
 		"""
@@ -141,17 +186,21 @@ class Solver():
 		"""
 		#global curr_sol # For signal
 		#signal.alarm(1) # Call receive_alarm in 1 seconds
-		curr_sol = Interpretation(self.cnf.num_vars)
+		if self.incremental:
+			curr_sol = IncrementalInterpretation(self.cnf)
+		else:
+			curr_sol = Interpretation(self.cnf.num_vars)
 		var = 1
 		while var > 0:
 			if curr_sol.vars[var] == 1: # Backtrack
-				curr_sol.vars[var] = None
+				curr_sol.unassign(var)
 				var = var - 1
 				continue
 			if curr_sol.vars[var] == None: # Extend left branch
-				curr_sol.vars[var] = 0
+				curr_sol.assign(var, 0)
 			else: # Extend right branch
-				curr_sol.vars[var] = 1
+				curr_sol.unassign(var)
+				curr_sol.assign(var, 1)
 			if curr_sol.cost() == 0: # Undet or SAT
 				if var == self.cnf.num_vars: # SAT
 					return curr_sol
@@ -167,8 +216,8 @@ if __name__ == '__main__' :
 	"""
 
 	# Check parameters
-	if len(sys.argv) < 1 or len(sys.argv) > 2:
-		sys.exit("Use: %s <cnf_instance>" % sys.argv[0])
+	if len(sys.argv) < 2 or len(sys.argv) > 3 or (len(sys.argv) == 3 and sys.argv[2] != '--full-cost'):
+		sys.exit("Use: %s <cnf_instance> [--full-cost]" % sys.argv[0])
 	
 	if os.path.isfile(sys.argv[1]):
 		cnf_file_name = os.path.abspath(sys.argv[1])
@@ -178,7 +227,7 @@ if __name__ == '__main__' :
 	# Read cnf instance
 	cnf = CNF(cnf_file_name)
 	# Create a solver instance with the problem to solve
-	solver = Solver(cnf)
+	solver = Solver(cnf, incremental = len(sys.argv) == 2)
 	# Solve the problem and get the best solution found
 	best_sol = solver.solve()
 	# Show the best solution found
@@ -5,154 +5,93 @@
 import sys
 import os
 import glob
-import re
-import stat
+import json
+import time
+import base64
+import socket
+import argparse
+import resource
+import tempfile
+import threading
 import subprocess
+import socketserver
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from sat.dimacs import COMPRESSED, read_dimacs
+from sat.profiling import MERGED, merge, ranking
+from sat.verify import Verifier, parse_output
 
-out_file = "out.txt" # Solver output
-limits_file = "tmp-limits.sh" # Limits script file
 timeout = 10 # Timeout for each run
 inc_to = 2 # Multiplier for timeout
 inc_bug = 10000 # Multiplier for bug
 verbose = False # Verbose flag
+lease_margin = 60 # Seconds a worker may hold a job beyond its CPU limit before the job is re-queued
+connect_retry = 30 # Seconds a worker keeps trying to reach the coordinator
+wait_poll = 0.5 # Seconds a worker waits to ask again when every remaining job is running elsewhere
 
-# Parse CPU time in file
-def get_time(out_file):
-    time = None
-    r = re.compile(r"^user (\d+\.\d+)")
-    for l in open(out_file, "r"):
-        s = re.search(r, l)
-        if s:
-            time = s.group(1)
-            break
-    return time
-
-# Parse SATISFIABLE in file
-def get_sat(out_file):
-    r = re.compile(r"^s SATISFIABLE")
-    for l in open(out_file, "r"):
-        s = re.search(r, l)
-        if s:
-            return True
-    return False
-
-# Parse UNSATISFIABLE in file
-def get_unsat(out_file):
-    r = re.compile(r"^s UNSATISFIABLE")
-    for l in open(out_file, "r"):
-        s = re.search(r, l)
-        if s:
-            return True
-    return False
-
-# Parse solver solution in file
-def get_solution(out_file):
-    r = re.compile(r"^v (.+)")
-    for l in open(out_file, "r"):
-        s = re.search(r, l)
-        if s:
-            sol = s.group(1).split()
-            sol.insert(0, "0") # Adds a 0 at the begginig to make variable 'i' at potition 'i'
-            try:
-                return list(map(int, sol))
-            except:
-                return None
-            break
-    return None
-
-# Check if the solution is a real solution to the benchmark file
-def check_solution(solution, benchmark_file):
-    instance = open(benchmark_file, "r")
-    for l in instance:
-        if l[0] in ["c", "p"]: # Pass comments and program line
-            continue
-        sl = list(map(int, l.split()))
-        sl.pop() # Remove last 0
-        length = len(sl)
-        for lit in sl:
-            if lit == solution[abs(lit)]: # Satisfies clause
-                break
-            else:
-                length -= 1
-        if length == 0: # Falsified clause
-            return False
-    return True
-
-# Check the correctness of the solution
-def check_correctness(benchmark_file, out_file):
-    sat = get_sat(out_file)
-    if sat:
-        solution = get_solution(out_file)
-        if solution != None:
-            return check_solution(solution, benchmark_file)
-    else: # Search UNSAT for complete solvers, it does not check it
-        if get_unsat(out_file):
-            sys.stdout.write("UNSAT ")
-            return True
-    return None
+root = os.path.dirname(os.path.abspath(__file__))
+profiling = os.path.join(root, "sat", "profiling.py")
 
-if __name__ == '__main__' :
+# Limit the CPU time of the solver process pid, from the parent: a preexec_fn is not safe while the
+# threads of a worker start solvers at once. The grace seconds after the SIGXCPU of the soft limit
+# let a profiled run save its profile
+def set_cpu_limit(pid, seconds, grace = 0):
+    resource.prlimit(pid, resource.RLIMIT_CPU, (seconds, seconds + grace))
 
-    if len(sys.argv) < 3 or len(sys.argv) > 4:
-        sys.exit("Use: %s <benchmark_folder> <solver>" % sys.argv[0])
+# Profile of one instance in the profile folder
+def profile_path(profile, benchmark_file, mode):
+    return os.path.join(profile, os.path.basename(benchmark_file) + "." + mode)
 
-    if len(sys.argv) == 4:
-        option = sys.argv[3]
-        if option == 'v':
-            verbose = True
+# Run the solver on one instance, returns its output and its user CPU time
+# (with a profile folder the solver runs under sat/profiling.py)
+def run_solver(solver, benchmark_file, seconds, profile = None, mode = "prof"):
+    command = [sys.executable, solver, benchmark_file]
+    if profile:
+        command[1:1] = [profiling, "run", "-o", profile_path(profile, benchmark_file, mode)]
+    proc = subprocess.Popen(command, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    set_cpu_limit(proc.pid, seconds, 1 if profile else 0)
+    with proc.stdout:
+        output = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return output.decode(errors = "replace"), usage.ru_utime
 
-    benchmark_folder = sys.argv[1]
-    solver = sys.argv[2]
+# Check the correctness of the solution, returns it and the UNSAT flag
+def check_correctness(benchmark_file, output):
+    return check_result(benchmark_file, *parse_output(output)) # One pass over the output
 
-    # Check benchmark folder and solver
-    if os.path.isdir(benchmark_folder):
-        benchmark_folder = os.path.abspath(benchmark_folder)
-    else:
-        sys.exit("ERROR: Benchmark folder not found (%s)." % benchmark_folder)
+# Check a status and a solution (the answer of a worker)
+def check_result(benchmark_file, status, solution):
+    if status == "SATISFIABLE":
+        if solution != None:
+            return Verifier(read_dimacs(benchmark_file)).check(solution), False
+    elif status == "UNSATISFIABLE": # Complete solvers, it does not check it
+        return True, True
+    return None, False
 
-    if os.path.isfile(solver):
-        solver = os.path.abspath(solver)
-    else:
-        sys.exit("ERROR: Solver not found (%s)." % solver)
+# Run and check one instance (one pool task), returns the output, the CPU time and the checks
+def race(solver, benchmark_file, seconds, profile = None, mode = "prof"):
+    output, time = run_solver(solver, benchmark_file, seconds, profile, mode)
+    correct, unsat = check_correctness(benchmark_file, output)
+    return output, time, correct, unsat
 
-    # Check solver
-    # if not (os.stat(solver).st_mode & stat.S_IXUSR):
-    #     sys.exit("ERROR: Solver %s without execute (x) permission." % solver)
-    #Create file limits.sh
-    with open(limits_file, "w") as f:
-        f.write('#!/bin/bash\nulimit -t %i\npython3 $1 $2\n' % timeout)
-    st = os.stat(limits_file)
-    os.chmod(limits_file, st.st_mode | stat.S_IXUSR)
-
-    # Get all the instances
-    benchmark_files = glob.glob("%s/*.cnf" % benchmark_folder)
-    if not benchmark_files:
-        sys.exit("ERROR: Benchmark files in \"%s/*.cnf\" not found." % benchmark_folder)
-    benchmark_files.sort()
+# Write the results in instance order, returns the total time
+def report(benchmark_files, results):
     total_time = 0
-    # Run the solver for al the instances
     for bf in benchmark_files:
         sys.stdout.write("File %s... " % os.path.basename(bf))
         sys.stdout.flush()
-        # Run the solver under limits
-        with open(out_file, 'w') as output:
-            subprocess.run(['time', '-p', './%s' % limits_file, solver, bf], stdout = output, stderr = subprocess.STDOUT)
+        output, cpu_time, correct, unsat = next(results)
         if verbose:
-            with open(out_file, 'r') as output:
-                sys.stdout.write('\n')
-                for l in output.readlines():
-                    sys.stdout.write(l)
+            sys.stdout.write('\n')
+            sys.stdout.write(output)
         #Check result
-        correct = check_correctness(bf, out_file)
+        if unsat:
+            sys.stdout.write("UNSAT ")
         if correct == True: # The solution is correct or is UNSAT
-            #Get Time
-            time = get_time(out_file)
-            if time == None: # This should not happend
-                time = timeout * inc_to
-                sys.stdout.write("Time not found! time = %.2f\n" % time)
-            else:
-                time = float(time)
-                sys.stdout.write("OK! time = %.2f\n" % time)
+            time = cpu_time
+            sys.stdout.write("OK! time = %.2f\n" % time)
         elif correct == None: # There is no solution
             time = timeout * inc_to
             sys.stdout.write("No solution found! time = %i\n" % time)
@@ -161,9 +100,282 @@ if __name__ == '__main__' :
             sys.stdout.write("Wrong solution! time = %i\n" % time)
         total_time += time
         sys.stdout.write("Current time = %.2f\n" % total_time)
-    # Remove temp files
-    os.system("rm %s" % out_file)
-    os.system("rm %s" % limits_file)
+    return total_time
+
+# Coordinator/worker mode: the coordinator serves one job per instance over TCP, the messages are JSON
+# objects, one per line. A worker sends {"type": "get"} and receives {"type": "job", ...} with the
+# instance file and the solver, {"type": "wait"} while the remaining jobs run elsewhere or {"type": "done"}.
+# It runs the job and sends {"type": "result", "id": ..., "status": ..., "model": ..., "time": ...}.
+# The jobs of a worker are re-queued when its connection drops or its lease expires.
+# The protocol has no authentication: run it on a trusted network only. The coordinator listens on
+# localhost unless --serve names a host, and workers only run solvers inside their own package.
+
+def send_message(stream, message):
+    stream.write((json.dumps(message) + "\n").encode())
+    stream.flush()
+
+# Next message of the stream, None when the connection is closed
+def receive_message(stream):
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+# (host, port) of a "HOST:PORT" address
+def parse_address(address, host = "localhost"):
+    name, _, port = address.rpartition(":")
+    return name or host, int(port)
+
+# Solver as the workers find it: relative to their race-complete.py, None when it is not in this package
+def solver_name(solver):
+    solver = os.path.abspath(solver)
+    return os.path.relpath(solver, root) if solver.startswith(root + os.sep) else None
+
+# Path of the solver of a job, None for an absolute path or one leaving the package
+def job_solver(name):
+    if os.path.isabs(name) or os.pardir in name.replace("\\", "/").split("/"):
+        return None
+    return os.path.join(root, name)
+
+# One connection of a worker
+class WorkerHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        coordinator = self.server
+        try:
+            while True:
+                message = receive_message(self.rfile)
+                if message is None:
+                    break
+                if message["type"] == "get":
+                    send_message(self.wfile, coordinator.next_job(self))
+                elif message["type"] == "result":
+                    coordinator.finish(message)
+        except (OSError, ValueError, LookupError, TypeError): # Dropped connection or malformed message
+            pass
+        finally:
+            coordinator.release(self)
+
+# Job queue of a benchmark folder, served to the workers by a thread per connection
+class Coordinator(socketserver.ThreadingTCPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, benchmark_files, solver, seconds = timeout, output = False, lease = None):
+        """
+        Initialization
+        benchmark_files: Instances, the job of each one is its index
+        solver: Solver script run by the workers
+        pending: Jobs not handed to any worker, re-queued jobs first
+        leases: Running jobs, job -> (connection, expiry time)
+        results: Checked results, job -> (output, CPU time, correct, UNSAT flag) as race() returns them
+        requeued: Number of jobs taken back from dead or late workers
+        """
+        if solver_name(solver) is None:
+            raise ValueError("the workers only run solvers inside %s" % root)
+        super().__init__(address, WorkerHandler)
+        self.benchmark_files = benchmark_files
+        self.solver = solver_name(solver)
+        self.seconds = seconds
+        self.output = output
+        self.lease = seconds + lease_margin if lease is None else lease
+        self.pending = deque(range(len(benchmark_files)))
+        self.leases = {}
+        self.results = {}
+        self.requeued = 0
+        self.changed = threading.Condition()
+
+    # Message answering a "get" of the connection owner
+    def next_job(self, owner):
+        with self.changed:
+            now = time.monotonic()
+            for job, (_, expiry) in list(self.leases.items()): # Late workers lose their jobs
+                if expiry <= now:
+                    self.requeue(job)
+            if not self.pending:
+                return {"type": "done"} if len(self.results) == len(self.benchmark_files) else \
+                       {"type": "wait", "seconds": wait_poll}
+            job = self.pending.popleft()
+            self.leases[job] = (owner, now + self.lease)
+        benchmark_file = self.benchmark_files[job]
+        with open(benchmark_file, "rb") as f: # Workers do not share the file system, compressed files stay so
+            data = base64.b64encode(f.read()).decode()
+        return {"type": "job", "id": job, "name": os.path.basename(benchmark_file), "data": data,
+                "solver": self.solver, "seconds": self.seconds, "output": self.output}
+
+    def requeue(self, job):
+        del self.leases[job]
+        self.pending.appendleft(job)
+        self.requeued += 1
+
+    # Check and record a result, the first one of each job counts
+    def finish(self, message):
+        self.validate(message)
+        job = message["id"]
+        correct, unsat = check_result(self.benchmark_files[job], message["status"], message["model"])
+        with self.changed:
+            if job not in self.results:
+                self.leases.pop(job, None)
+                if job in self.pending: # A late result of a re-queued job
+                    self.pending.remove(job)
+                self.results[job] = (message.get("output") or "", message["time"], correct, unsat)
+                self.changed.notify_all()
+
+    # Raise ValueError unless the fields of the result message have the types of the protocol
+    def validate(self, message):
+        job, status, model, output = message["id"], message["status"], message["model"], message.get("output")
+        if type(job) is not int or not 0 <= job < len(self.benchmark_files):
+            raise ValueError("unknown job %r" % (job,))
+        if type(message["time"]) not in (int, float) or not (status is None or isinstance(status, str)) or \
+           not (output is None or isinstance(output, str)):
+            raise ValueError("malformed result of job %d" % job)
+        if model is not None and not (isinstance(model, list) and all(type(l) is int for l in model)):
+            raise ValueError("malformed model of job %d" % job)
+
+    # The connection is closed: its running jobs go back to the queue
+    def release(self, owner):
+        with self.changed:
+            for job, (connection, _) in list(self.leases.items()):
+                if connection is owner:
+                    self.requeue(job)
+
+    # Result of a job, once a worker sends it
+    def wait_result(self, job):
+        with self.changed:
+            self.changed.wait_for(lambda: job in self.results)
+            return self.results[job]
+
+    # Results in instance order, as the local run gives them
+    def wait_results(self):
+        return (self.wait_result(job) for job in range(len(self.benchmark_files)))
+
+# Run a job in a temporary folder, returns its result message
+def run_job(job):
+    solver = job_solver(job["solver"])
+    with tempfile.TemporaryDirectory() as folder:
+        benchmark_file = os.path.join(folder, os.path.basename(job["name"]))
+        with open(benchmark_file, "wb") as f:
+            f.write(base64.b64decode(job["data"]))
+        if solver is None:
+            output, cpu_time = "ERROR: Solver outside the package (%s).\n" % job["solver"], 0
+        elif os.path.isfile(solver):
+            output, cpu_time = run_solver(solver, benchmark_file, job["seconds"])
+        else:
+            output, cpu_time = "ERROR: Solver not found (%s).\n" % solver, 0
+    status, model = parse_output(output)
+    return {"type": "result", "id": job["id"], "status": status, "model": model, "time": cpu_time,
+            "output": output if job["output"] else None}
+
+# Connect to the coordinator, trying again while it starts
+def connect(address, retry = connect_retry):
+    deadline = time.monotonic() + retry
+    while True:
+        try:
+            return socket.create_connection(address)
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(wait_poll)
+
+# Worker: pull and run jobs until the coordinator has no more, returns the number of jobs run
+def work(address, retry = connect_retry, log = None):
+    done = 0
+    with connect(address, retry) as sock, sock.makefile("rwb") as stream:
+        while True:
+            send_message(stream, {"type": "get"})
+            message = receive_message(stream)
+            if message is None or message["type"] == "done":
+                return done
+            if message["type"] == "wait":
+                time.sleep(message["seconds"])
+                continue
+            result = run_job(message)
+            send_message(stream, result)
+            done += 1
+            if log:
+                log("File %s... %s time = %.2f" % (message["name"], result["status"], result["time"]))
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser(description = "Runs a solver on every instance of a benchmark folder")
+    parser.add_argument("benchmark_folder", nargs = "?")
+    parser.add_argument("solver", nargs = "?")
+    parser.add_argument("option", nargs = "?", choices = ["v"], help = "v: show the output of the solver")
+    parser.add_argument("-j", "--jobs", type = int, default = 1, help = "Instances run at once, by a worker too (0: one per CPU)")
+    parser.add_argument("--cache", metavar = "DIR", help = "Folder of parsed formulas shared by the solver runs (see sat/cache.py)")
+    parser.add_argument("--profile", metavar = "DIR", help = "Save a profile of every run in DIR and rank the functions over all of them")
+    parser.add_argument("--profile-mode", dest = "profile_mode", choices = ["prof", "folded"], default = "prof",
+                        help = "prof: cProfile, folded: sampled collapsed stacks (default: prof)")
+    parser.add_argument("--serve", metavar = "[HOST:]PORT",
+                        help = "Coordinator: serve the instances to workers instead of running them (HOST: localhost by default)")
+    parser.add_argument("--worker", metavar = "HOST:PORT", help = "Worker: run the jobs of the coordinator at HOST:PORT")
+    args = parser.parse_args()
+    if args.worker and (args.benchmark_folder or args.serve or args.profile):
+        parser.error("a worker only takes --worker, -j and --cache")
+    if not args.worker and not (args.benchmark_folder and args.solver):
+        parser.error("the benchmark folder and the solver are required")
+    if args.serve and args.profile:
+        parser.error("--profile runs on the local machine only")
+    if args.cache: # The solvers of the package read the formulas through this cache
+        os.environ["SAT_CACHE"] = os.path.abspath(args.cache)
+
+    verbose = args.option == "v"
+    jobs = args.jobs or os.cpu_count()
+    if args.worker: # One connection per job run at once
+        address = parse_address(args.worker)
+        log = lambda line: sys.stdout.write(line + "\n")
+        workers = [threading.Thread(target = work, args = (address, connect_retry, log)) for _ in range(jobs)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        sys.exit(0)
+    benchmark_folder = args.benchmark_folder
+    solver = args.solver
+
+    # Check benchmark folder and solver
+    if os.path.isdir(benchmark_folder):
+        benchmark_folder = os.path.abspath(benchmark_folder)
+    else:
+        sys.exit("ERROR: Benchmark folder not found (%s)." % benchmark_folder)
+
+    if os.path.isfile(solver):
+        solver = os.path.abspath(solver)
+    else:
+        sys.exit("ERROR: Solver not found (%s)." % solver)
+    if args.serve and solver_name(solver) is None:
+        sys.exit("ERROR: The workers only run solvers inside %s (%s)." % (root, solver))
+
+    # Get all the instances, plain or compressed
+    benchmark_files = [f for ext in [""] + list(COMPRESSED) for f in glob.glob("%s/*.cnf%s" % (benchmark_folder, ext))]
+    if not benchmark_files:
+        sys.exit("ERROR: Benchmark files in \"%s/*.cnf\" not found." % benchmark_folder)
+    benchmark_files.sort()
+    # Run the solver for al the instances, each one with its own pipes and CPU limit
+    if args.profile:
+        args.profile = os.path.abspath(args.profile)
+        os.makedirs(args.profile, exist_ok = True)
+    pool = coordinator = None
+    if args.serve: # The workers run the instances, the coordinator checks their results
+        coordinator = Coordinator(parse_address(args.serve), benchmark_files, solver, timeout, verbose)
+        threading.Thread(target = coordinator.serve_forever, daemon = True).start()
+        sys.stderr.write("Serving %d instances on %s:%d\n" % ((len(benchmark_files),) + coordinator.server_address[:2]))
+        results = coordinator.wait_results()
+    else:
+        run = partial(race, solver, seconds = timeout, profile = args.profile, mode = args.profile_mode)
+        pool = ProcessPoolExecutor(jobs) if jobs > 1 else None
+        results = pool.map(run, benchmark_files) if pool else map(run, benchmark_files)
+    total_time = report(benchmark_files, results) # Results are reported in instance order
+    if pool:
+        pool.shutdown()
+    if coordinator:
+        sys.stderr.write("%d jobs re-queued\n" % coordinator.requeued)
+        time.sleep(2 * wait_poll) # The waiting workers get their "done"
+        coordinator.shutdown()
+        coordinator.server_close()
 
     # Results
     sys.stdout.write("Total time = %.2f\n" % total_time)
+    if args.profile: # Profiles of the whole folder
+        merge(args.profile, os.path.join(args.profile, MERGED))
+        sys.stdout.write("\n".join(ranking(args.profile)) + "\n")
+        sys.stdout.write("Collapsed stacks in %s\n" % os.path.join(args.profile, MERGED))
@@ -19,8 +19,14 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 # Libraries
 
 import sys
+import argparse
 import random
 
+# Parameters
+
+BATCH = 1 << 16 # Clauses generated and written at once
+FAMILIES = ["uniform", "planted", "community"]
+
 # Classes
 
 class Clause():
@@ -83,52 +89,182 @@ class CNF():
 
         sys.stdout.write("c Random CNF formula\n")
         sys.stdout.write("p cnf %d %d\n" % (self.num_vars, self.num_clauses))
-        for c in self.clauses:
-            c.show()
+        for i in range(0, len(self.clauses), BATCH): # Buffered output, one write per batch
+            sys.stdout.write("".join("%s 0\n" % " ".join(str(l) for l in c.lits) for c in self.clauses[i:i + BATCH]))
 
 
-# Main
+class Generator():
+    """Random clauses of one family, generated in batches of rows of literals"""
 
-if __name__ == '__main__':
-    # A random CNF generator
+    def __init__(self, num_vars, clause_length, family = "uniform", communities = 10, modularity = 0.8, seed = None, numpy = None):
+        """
+        Initialization
+        family: uniform (random k-SAT), planted (k-SAT satisfied by a hidden assignment) or community
+        communities: Number of communities of the community family, consecutive ranges of variables
+        modularity: The community family puts all the variables of a clause in one community with
+                    probability modularity + 1 / communities, and each in a different one otherwise
+        planted: Hidden assignment of the planted family, planted[v] is v or -v (planted[0] unused)
+        numpy: NumPy module to generate whole batches at once, None to generate clause by clause
+        """
+        if clause_length > num_vars:
+            raise ValueError("clauses of %d distinct variables need at least %d variables" % (clause_length, clause_length))
+        self.num_vars = num_vars
+        self.clause_length = clause_length
+        self.family = family
+        self.numpy = numpy
+        self.random = random.Random(seed) if numpy is None else numpy.random.default_rng(seed)
+        self.communities = None
+        self.modularity = modularity
+        self.planted = None
+        if family == "community":
+            if not clause_length <= communities <= num_vars // clause_length:
+                raise ValueError("the community family needs between %d and %d communities" % (clause_length, num_vars // clause_length))
+            self.communities = [(i * num_vars) // communities + 1 for i in range(communities + 1)] # Community i: [start i, start i + 1)
+        if family == "planted":
+            signs = self.signs(num_vars)
+            self.planted = [0] + [v if s else -v for v, s in zip(range(1, num_vars + 1), signs)]
 
-    # Check parameters
-    if len(sys.argv) < 4 or len(sys.argv) > 5:
-        sys.exit("Use: %s <num-vars> <num-clauses> <clause-length> [<random-seed>]" % sys.argv[0])
+    def signs(self, count):
+        """count random booleans, True for a positive sense"""
+        if self.numpy is None:
+            return [self.random.random() < 0.5 for _ in range(count)]
+        return (self.random.random(count) < 0.5).tolist()
 
-    try:
-        num_vars = int(sys.argv[1])
-    except:
-        sys.exit("ERROR: Number of variables not an integer (%s)." % sys.argv[1])
-    if num_vars < 1:
-        sys.exit("ERROR: Number of variables must be >= 1 (%d)." % num_vars)
+    def batches(self, num_clauses, batch = BATCH):
+        """Yields batches of clauses, numpy arrays of shape (clauses, length) or lists of lists"""
+        for start in range(0, num_clauses, batch):
+            size = min(batch, num_clauses - start)
+            yield self.batch_numpy(size) if self.numpy is not None else [self.clause() for _ in range(size)]
+
+    def variables(self):
+        """Distinct variables of one clause, in the family distribution"""
+        rnd, k = self.random, self.clause_length
+        starts = self.communities
+        if starts is None:
+            return rnd.sample(range(1, self.num_vars + 1), k)
+        if rnd.random() < self.modularity + 1.0 / (len(starts) - 1): # Inside one community
+            c = rnd.randrange(len(starts) - 1)
+            return rnd.sample(range(starts[c], starts[c + 1]), k)
+        return [rnd.randrange(starts[c], starts[c + 1]) for c in rnd.sample(range(len(starts) - 1), k)]
+
+    def clause(self):
+        """One clause, regenerated while it falsifies the planted assignment"""
+        while True:
+            lits = [v if s else -v for v, s in zip(self.variables(), self.signs(self.clause_length))]
+            if self.planted is None or any(self.planted[abs(l)] == l for l in lits):
+                return lits
+
+    def variables_numpy(self, size):
+        """Rows of distinct variables, rows with repeated variables are drawn again"""
+        np, rng, k = self.numpy, self.random, self.clause_length
+        starts = self.communities
+        if starts is None:
+            low, high = np.ones(size, dtype = np.int64), np.full(size, self.num_vars + 1)
+        else:
+            starts = np.asarray(starts)
+            inside = rng.random(size) < self.modularity + 1.0 / (len(starts) - 1)
+            community = rng.integers(0, len(starts) - 1, size)
+            low, high = starts[community], starts[community + 1]
+        rows = np.empty((size, k), dtype = np.int64)
+        todo = np.arange(size)
+        while len(todo):
+            rows[todo] = rng.integers(low[todo, None], high[todo, None], (len(todo), k))
+            ordered = np.sort(rows[todo], axis = 1)
+            todo = todo[(ordered[:, 1:] == ordered[:, :-1]).any(axis = 1)]
+        if starts is not None: # The other clauses take one variable of k different communities
+            outside = np.flatnonzero(~inside)
+            picked = np.argsort(rng.random((len(outside), len(starts) - 1)), axis = 1)[:, :k]
+            rows[outside] = rng.integers(starts[picked], starts[picked + 1])
+        return rows
+
+    def batch_numpy(self, size):
+        """size clauses as an int32 array, with the planted clauses drawn again while falsified"""
+        np = self.numpy
+        rows = np.empty((size, self.clause_length), dtype = np.int32)
+        todo = np.arange(size)
+        planted = np.asarray(self.planted) if self.planted is not None else None
+        while len(todo):
+            lits = self.variables_numpy(len(todo))
+            lits = np.where(self.random.random(lits.shape) < 0.5, lits, -lits)
+            rows[todo] = lits
+            if planted is None:
+                break
+            todo = todo[~(planted[np.abs(lits)] == lits).any(axis = 1)]
+        return rows
 
-    try:
-        num_clauses = int(sys.argv[2])
-    except:
-        sys.exit("ERROR: Number of clauses not an integer (%s)." % sys.argv[2])
-    if num_vars < 1:
-        sys.exit("ERROR: Number of clauses must be >= 1 (%d)." % num_clauses)
 
+# Functions
+
+def format_batch(batch, numpy = None):
+    """DIMACS text of a batch of clauses, NumPy rows when numpy is given"""
+    if numpy is not None: # One flat list, with a column of terminators
+        tokens = numpy.hstack((batch, numpy.zeros((len(batch), 1), dtype = batch.dtype))).ravel().tolist()
+    else:
+        tokens = [l for clause in batch for l in clause + [0]]
+    # A lone 0 token only ends clauses, so the line breaks go after " 0 "
+    return (" ".join(map(str, tokens)) + " ").replace(" 0 ", " 0\n")
+
+
+def write_formula(generator, num_clauses, out = sys.stdout, batch = BATCH):
+    """Writes the header and the clauses of a generator, one write per batch"""
+    out.write("c Random CNF formula (%s family)\n" % generator.family)
+    if generator.planted is not None:
+        out.write("c planted solution: %s\n" % " ".join(map(str, generator.planted[1:])))
+    out.write("p cnf %d %d\n" % (generator.num_vars, num_clauses))
+    for clauses in generator.batches(num_clauses, batch):
+        out.write(format_batch(clauses, generator.numpy))
+
+
+def load_numpy():
     try:
-        clause_length = int(sys.argv[3])
-    except:
-        sys.exit("ERROR: Length of clauses not an integer (%s)." % sys.argv[3])
-    if num_vars < 1:
-        sys.exit("ERROR: Length of clauses must be >= 1 (%d)." % clause_length)
+        import numpy
+    except ImportError:
+        return None
+    return numpy
 
-    if len(sys.argv) > 4:
-        try:
-            seed = int(sys.argv[4])
-        except:
-            sys.exit("ERROR: Seed number not an integer (%s)." % sys.argv[4])
+
+def parse_args(argv = None):
+    parser = argparse.ArgumentParser(description = "A random CNF generator")
+    parser.add_argument("num_vars", metavar = "num-vars", type = int)
+    parser.add_argument("num_clauses", metavar = "num-clauses", type = int, help = "ignored with --ratio")
+    parser.add_argument("clause_length", metavar = "clause-length", type = int)
+    parser.add_argument("seed", metavar = "random-seed", type = int, nargs = "?")
+    parser.add_argument("--family", choices = FAMILIES, default = "uniform", help = "instance family (default: %(default)s)")
+    parser.add_argument("--ratio", type = float, help = "clause/variable ratio, sets the number of clauses")
+    parser.add_argument("--communities", type = int, default = 10, help = "communities of the community family (default: %(default)s)")
+    parser.add_argument("--modularity", type = float, default = 0.8, help = "modularity of the community family (default: %(default)s)")
+    parser.add_argument("--vectorized", action = "store_true", help = "generate batches of clauses with NumPy")
+    args = parser.parse_args(argv)
+    if args.num_vars < 1:
+        parser.error("Number of variables must be >= 1 (%d)." % args.num_vars)
+    if args.ratio is not None:
+        args.num_clauses = int(round(args.ratio * args.num_vars))
+    if args.num_clauses < 1:
+        parser.error("Number of clauses must be >= 1 (%d)." % args.num_clauses)
+    if args.clause_length < 1:
+        parser.error("Length of clauses must be >= 1 (%d)." % args.clause_length)
+    return args
+
+
+# Main
+
+if __name__ == '__main__':
+    # A random CNF generator
+    args = parse_args()
+    numpy = load_numpy() if args.vectorized else None
+    if args.vectorized and numpy is None:
+        sys.exit("ERROR: --vectorized needs NumPy.")
+
+    if args.family == "uniform" and numpy is None:
+        # Initialize random seed (current time)
+        random.seed(args.seed)
+        # Create a solver instance with the problem to solve
+        cnf_formula = CNF(args.num_vars, args.num_clauses, args.clause_length)
+        # Show formula
+        cnf_formula.show()
     else:
-        seed = None
-
-    # Initialize random seed (current time)
-    random.seed(seed)
-    # Create a solver instance with the problem to solve
-    cnf_formula = CNF(num_vars, num_clauses, clause_length)
-    # Show formula
-    cnf_formula.show()
-    
\ No newline at end of file
+        try:
+            generator = Generator(args.num_vars, args.clause_length, args.family, args.communities, args.modularity, args.seed, numpy)
+        except ValueError as e:
+            sys.exit("ERROR: %s." % e)
+        write_formula(generator, args.num_clauses)
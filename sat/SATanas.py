@@ -1,91 +1,54 @@
 #!/usr/bin/env python
+import os
 import sys
-from collections import defaultdict
-from functools import lru_cache
 
-
-def parse(filename):
-    clauses, unit_clauses = [], []
-    for line in open(filename):
-        if line[0] == 'p':
-            variables = int(line.split()[2])
-            continue
-        if line[0] == 'c':
-            continue
-        clause = [int(x) for x in line[:-2].split()]
-        clauses.append(clause)
-    return variables, clauses
-
-
-def new_formula(formula, unit):
-    result = []
-    for clause in formula:
-        if unit in clause:
-            continue
-        if -unit in clause:
-            new_clause = list(filter(lambda x: x != -unit, clause))
-            if not new_clause:
-                return 0
-            result.append(new_clause)
-        else:
-            result.append(clause)
-    return result
-
-
-@lru_cache(maxsize=512)
-def acc_weight(weight, len_clause):
-    return weight ** -len_clause
-
-
-def get_literal(formula, weight=3):
-    counter = defaultdict(float)
-    for clause in formula:
-        for literal in clause:
-            counter[abs(literal)] += acc_weight(weight, len(clause))
-    return max(counter, key=counter.get)
-
-
-def unit_propagation(formula, unit=None):
-    assignment = []
-    unit_clauses = [c for c in formula if len(c) == 1]
-    while unit_clauses:
-        unit = unit_clauses[0]
-        formula = new_formula(formula, unit[0])
-        assignment += [unit[0]]
-        if formula == -1:
-            return -1, []
-        if not formula:
-            return formula, assignment
-        unit_clauses = [c for c in formula if len(c) == 1]
-    return formula, assignment
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import read_dimacs
+from sat.dpll import search
+from sat.heuristics import make_heuristic
+from sat.options import parse_args
+from sat.preprocess import Preprocessor
+from sat.propagate import Propagator, PureLiteralPropagator
+from sat.restarts import make_restart
+from sat.stats import Stats
 
 
+def parse(filename):
+    formula = read_dimacs(filename)
+    return formula.num_vars, formula
 
-def solve(formula, assignment, unit=None):
-    formula, unit_assignment = unit_propagation(formula, unit)
-    assignment = assignment + unit_assignment
-    if formula == 0:
-        return []
-    if not formula:
-        return assignment
-    variable = get_literal(formula)
-    print(variable)
-    solution = solve(new_formula(formula, variable), assignment + [variable])
-    if not solution:
-        solution = solve(new_formula(formula, -variable), assignment + [-variable])
 
-    return solution
+def solve(engine, heuristic, restart=None):
+    return search(engine, heuristic, restart=restart)
 
 
 def main():
-    variables, clauses = parse(sys.argv[1])
-    solution = solve(clauses, [])
-    if solution:
-        solution += [x for x in range(1, variables + 1) if x not in solution and -x not in solution]
-        solution.sort(key=abs)
+    args = parse_args()
+    stats = Stats()
+    with stats.timer('parse'):
+        variables, clauses = parse(args.instance)
+    preprocessor = Preprocessor(variables, clauses) if args.preprocess else None
+    if preprocessor:
+        with stats.timer('preprocess'):
+            clauses = preprocessor.simplify()
+    engine = (PureLiteralPropagator if args.pure_literals else Propagator)(variables, clauses)
+    heuristic = make_heuristic(args.heuristic, engine, weight=3)
+    if args.phase_saving:
+        engine.save_phases()
+    if args.stats:
+        stats.instrument(engine, heuristic)
+    with stats.timer('search'):
+        sat = engine.ok and solve(engine, heuristic, make_restart(args.restart, learning=False))
+    if sat:
+        solution = engine.model()
+        if preprocessor:
+            solution = preprocessor.extend(solution)
         print('s SATISFIABLE' + '\n' + 'v ' + ' '.join([str(x) for x in solution]) + ' 0')
     else:
         print('s UNSATISFIABLE')
+    if args.stats:
+        stats.report(engine)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,9 @@
+__all__ = ['Solver']
+
+
+def __getattr__(name):
+    # Solver is imported on first use, so importing any module of the package does not load the CDCL engine
+    if name == 'Solver':
+        from sat.api import Solver
+        return Solver
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
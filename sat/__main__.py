@@ -1,4 +1,9 @@
+import os
+import sys
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 from sat.newsat import *
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
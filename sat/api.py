@@ -0,0 +1,82 @@
+'''
+    Incremental solver interface of the package
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    A Solver keeps one CDCL engine alive across calls: clauses can be
+    added between calls to solve(), and each call can take assumptions,
+    literals that only hold during that call. Learnt clauses, heuristic
+    activities and saved phases carry over from one call to the next.
+
+        solver = Solver()
+        solver.add_clause([1, 2])
+        solver.solve([-1])    # True, solver.model() has 2
+        solver.add_clause([-2])
+        solver.solve([-1])    # False, solver.failed() == [-1]
+'''
+
+from sat.cdcl import CDCL
+
+
+class Solver():
+    """Incremental SAT solver over a CDCL engine"""
+
+    def __init__(self, clauses=(), num_vars=0, heuristic='vsids', restart='none', phase_saving=True,
+                 learnt_budget=None):
+        """
+        Initialization
+        clauses: Initial clauses, as iterables of non zero integers
+        num_vars: Variables known from the start, more are added as clauses mention them
+        engine: CDCL engine holding the clauses and the search state (see sat.cdcl)
+        status: Result of the last solve() call, None before the first one or after a timeout
+        """
+        self.engine = CDCL(num_vars, (), heuristic, restart, phase_saving, learnt_budget)
+        self.status = None
+        self._model = None
+        for clause in clauses:
+            self.add_clause(clause)
+
+    @property
+    def num_vars(self):
+        return self.engine.num_vars
+
+    def new_var(self):
+        """Adds a fresh variable and returns it"""
+        self.engine.resize(self.engine.num_vars + 1)
+        return self.engine.num_vars
+
+    def add_clause(self, clause):
+        """Adds a clause for the next calls, returns False once the formula is known to be UNSAT"""
+        clause = list(clause)
+        if any(l == 0 for l in clause):
+            raise ValueError('0 is not a literal')
+        engine = self.engine
+        engine.backtrack(0)
+        engine.resize(max((abs(l) for l in clause), default=0))
+        if engine.ok:
+            engine.add_clause(clause)
+        return engine.ok
+
+    def solve(self, assumptions=(), deadline=None):
+        """Returns True if the clauses are satisfiable with every assumption true,
+        None if the time.perf_counter() deadline passes before the answer"""
+        assumptions = list(assumptions)
+        self.engine.resize(max((abs(l) for l in assumptions), default=0))
+        self.status = self.engine.solve(assumptions, deadline)
+        self._model = self.engine.model() if self.status else None
+        return self.status
+
+    def model(self):
+        """Model found by the last satisfiable solve() call, as a list of literals of vars 1..n"""
+        if not self.status:
+            raise ValueError('the last call to solve() did not find a model')
+        return self._model
+
+    def value(self, literal):
+        """Whether the literal is true in the last model"""
+        return self.model()[abs(literal) - 1] == literal
+
+    def failed(self):
+        """Assumptions responsible for the last unsatisfiable solve() call (empty when the clauses alone are)"""
+        if self.status is not False:
+            raise ValueError('the last call to solve() was not unsatisfiable')
+        return list(self.engine.failed)
@@ -0,0 +1,116 @@
+'''
+    Clause database backed by a single literal array
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    All the clauses live one after the other in one array('i'), each one
+    preceded by its length. A clause is referred to by the offset of its
+    first literal (its reference), so the engines reach the literals
+    without any indirection. Storing a clause costs 4 bytes per literal plus
+    8 bytes, instead of a list object holding one pointer and one int object
+    per literal. Removed clauses are only flagged (negative length);
+    compact() squeezes them out once enough space is wasted.
+'''
+
+from array import array
+
+
+class Clause():
+    """Handle on a clause of a ClauseArena, reads the literals in place"""
+
+    __slots__ = ('arena', 'ref')
+
+    def __init__(self, arena, ref):
+        self.arena = arena
+        self.ref = ref
+
+    def __len__(self):
+        return abs(self.arena.lits[self.ref - 1])
+
+    def __getitem__(self, i):
+        lits, ref = self.arena.lits, self.ref
+        size = abs(lits[ref - 1])
+        if isinstance(i, slice):
+            return lits[ref:ref + size][i]
+        if i < 0:
+            i += size
+        if not 0 <= i < size:
+            raise IndexError('clause index out of range')
+        return lits[ref + i]
+
+    def __iter__(self):
+        lits, ref = self.arena.lits, self.ref
+        return iter(lits[ref:ref + abs(lits[ref - 1])])
+
+    def __repr__(self):
+        return 'Clause(%d, %s)' % (self.ref, list(self))
+
+    @property
+    def deleted(self):
+        return self.arena.lits[self.ref - 1] < 0
+
+
+class ClauseArena():
+    """A clause database stored in flat arrays"""
+
+    def __init__(self):
+        """
+        Initialization
+        lits: Length of each clause followed by its literals, one clause after the other
+        refs: Reference (offset of the first literal) of every clause, in insertion order
+        wasted: Number of array slots held by removed clauses
+        """
+        self.lits = array('i')
+        self.refs = array('i')
+        self.wasted = 0
+
+    def __len__(self):
+        return len(self.refs)
+
+    def __getitem__(self, ref):
+        return Clause(self, ref)
+
+    def __iter__(self):
+        """Iterates over the live clauses"""
+        lits = self.lits
+        for ref in self.refs:
+            if lits[ref - 1] > 0:
+                yield Clause(self, ref)
+
+    def add(self, clause):
+        """Appends a clause and returns its reference"""
+        lits = self.lits
+        lits.append(len(clause))
+        ref = len(lits)
+        lits.extend(clause)
+        self.refs.append(ref)
+        return ref
+
+    def size(self, ref):
+        return abs(self.lits[ref - 1])
+
+    def remove(self, ref):
+        lits = self.lits
+        if lits[ref - 1] > 0:
+            self.wasted += lits[ref - 1] + 1
+            lits[ref - 1] = -lits[ref - 1]
+
+    def memory(self):
+        """Bytes held by the arrays of the arena"""
+        return self.lits.itemsize * len(self.lits) + self.refs.itemsize * len(self.refs)
+
+    def compact(self):
+        """Drops the removed clauses and the wasted slots, returns a dict from old to new reference"""
+        lits = self.lits
+        new_lits, new_refs = array('i'), array('i')
+        remap = {}
+        for ref in self.refs:
+            size = lits[ref - 1]
+            if size <= 0:
+                continue
+            new_lits.append(size)
+            remap[ref] = len(new_lits)
+            new_refs.append(len(new_lits))
+            new_lits.extend(lits[ref:ref + size])
+        self.lits, self.refs = new_lits, new_refs
+        self.wasted = 0
+        return remap
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+'''
+    Benchmark suite of the engines of the package
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    Every engine runs in-process on the parsed formulas of the benchmark
+    sets: the formula is read once and each (engine, instance) run calls
+    the engine functions directly in a forked worker, so a timeout or a
+    memory hungry run does not affect the others. A run records its wall
+    and CPU time, the decisions, propagations and conflicts of the engine
+    (and their rates per CPU second) and the peak resident memory of the
+    worker (the formula and the interpreter included), and SAT answers
+    are checked. Each suite run is appended to a JSON history; compare
+    flags the instances that got slower than a baseline run by more than
+    a threshold, or lost their answer.
+    Use: python sat/bench.py run [--engines musk,cdcl,...] [--sets bench,benchmarks,...] [--label NAME]
+         python sat/bench.py compare [--baseline LABEL] [--run LABEL] [--threshold 0.1]
+'''
+
+import argparse
+import contextlib
+import datetime
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import read_dimacs
+from sat.heuristics import HEURISTICS
+from sat.portfolio import ENGINES
+from sat.verify import check_model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETS = ('bench', 'benchmarks', 'benchmarks2')
+HISTORY = os.path.join(ROOT, 'bench-history.json')
+COUNTERS = ('decisions', 'propagations', 'conflicts')
+
+
+def measure(engine, formula, heuristic, conn):
+    """Runs one engine in a worker and sends its record through conn"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        wall, cpu = time.perf_counter(), time.process_time()
+        sat, model, state = ENGINES[engine](formula, heuristic)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    record = {'status': 'SAT' if sat else 'UNSAT', 'wall': wall, 'cpu': cpu,
+              'peak_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    if sat and not check_model(formula, model):
+        record['status'] = 'WRONG'
+    for counter in COUNTERS:
+        value = getattr(state, counter, None)
+        record[counter] = value
+        record[counter + '_per_s'] = value / cpu if value is not None and cpu > 0 else None
+    conn.send(record)
+
+
+def run_one(engine, formula, heuristic='vsids', timeout=10.0):
+    """Record of one engine on one formula, with status TIMEOUT or ERROR when it gives no answer"""
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.get_context('fork').Process(target=measure, args=(engine, formula, heuristic, sender),
+                                                         daemon=True)
+    start = time.perf_counter()
+    worker.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+    except EOFError:  # The worker died before answering
+        pass
+    finally:
+        if worker.is_alive():
+            worker.kill()
+        worker.join()
+        receiver.close()
+    status = 'ERROR' if time.perf_counter() - start < timeout else 'TIMEOUT'
+    return dict({'status': status, 'wall': None, 'cpu': None, 'peak_kb': None},
+                **{key: None for counter in COUNTERS for key in (counter, counter + '_per_s')})
+
+
+def instances(sets):
+    """CNF files of the benchmark sets, folders of the repository or paths"""
+    files = []
+    for name in sets:
+        folder = name if os.path.isdir(name) else os.path.join(ROOT, name)
+        files += sorted(glob.glob(os.path.join(folder, '*.cnf')))
+    return files
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(engines, files, heuristic='vsids', timeout=10.0, repeat=1, label=None, report=None):
+    """Runs every engine on every file (keeping the fastest of repeat runs), returns the suite record"""
+    results = []
+    for filename in files:
+        formula = read_dimacs(filename)
+        instance = os.path.relpath(filename, ROOT)
+        for engine in engines:
+            runs = [run_one(engine, formula, heuristic, timeout) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r['cpu'] if r['cpu'] is not None else float('inf'))
+            record = dict(engine=engine, instance=instance, **best)
+            results.append(record)
+            if report is not None:
+                report(record)
+    return {'label': label or datetime.datetime.now().isoformat(timespec='seconds'),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+            'python': platform.python_version(), 'machine': platform.node(), 'heuristic': heuristic,
+            'timeout': timeout, 'repeat': repeat, 'results': results}
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(path, history):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def find_run(history, label):
+    """Run of the history with this label, the latest one with it"""
+    for run in reversed(history):
+        if run['label'] == label:
+            return run
+    raise KeyError('no run labelled %s in the history' % label)
+
+
+def compare(baseline, current, threshold=0.1, min_time=0.05):
+    """Regressions of current against baseline: lost answers, and CPU times over (1 + threshold) times
+    the baseline by more than min_time seconds. Returns a list of (engine, instance, message)"""
+    before = {(r['engine'], r['instance']): r for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        key = (r['engine'], r['instance'])
+        old = before.get(key)
+        if old is None:
+            continue
+        if r['status'] == 'WRONG':
+            regressions.append(key + ('wrong model',))
+        elif old['status'] in ('SAT', 'UNSAT') and r['status'] not in ('SAT', 'UNSAT'):
+            regressions.append(key + ('%s -> %s' % (old['status'], r['status']),))
+        elif old['cpu'] is not None and r['cpu'] is not None and \
+                r['cpu'] > old['cpu'] * (1 + threshold) and r['cpu'] - old['cpu'] > min_time:
+            regressions.append(key + ('cpu %.3f -> %.3f s (%+.0f%%)' % (
+                old['cpu'], r['cpu'], 100 * (r['cpu'] / old['cpu'] - 1) if old['cpu'] else float('inf')),))
+    return regressions
+
+
+def summary(run):
+    """Per engine totals of a run as text lines"""
+    lines = []
+    for engine in dict.fromkeys(r['engine'] for r in run['results']):
+        rows = [r for r in run['results'] if r['engine'] == engine]
+        solved = [r for r in rows if r['status'] in ('SAT', 'UNSAT')]
+        cpu = sum(r['cpu'] for r in solved)
+        props = sum(r['propagations'] or 0 for r in solved)
+        lines.append('%-10s solved %d/%d  cpu %.2f s  %.0f propagations/s  peak %d MB' % (
+            engine, len(solved), len(rows), cpu, props / cpu if cpu else 0,
+            max((r['peak_kb'] or 0 for r in rows), default=0) // 1024))
+    return lines
+
+
+def format_record(r):
+    if r['cpu'] is None:
+        return '%-10s %-50s %s' % (r['engine'], r['instance'], r['status'])
+    rates = '' if r['decisions'] is None else '  %.0f dec/s  %.0f prop/s  %d conflicts' % (
+        r['decisions_per_s'] or 0, r['propagations_per_s'] or 0, r['conflicts'])
+    return '%-10s %-50s %-7s wall %.3f s  cpu %.3f s%s  peak %d MB' % (
+        r['engine'], r['instance'], r['status'], r['wall'], r['cpu'], rates, r['peak_kb'] // 1024)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the engines of the package')
+    parser.add_argument('--history', default=HISTORY, help='JSON history of the runs (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run the suite and append it to the history')
+    run.add_argument('--engines', default=','.join(ENGINES), help='comma separated engines (default: %(default)s)')
+    run.add_argument('--sets', default=','.join(SETS), help='comma separated benchmark folders (default: %(default)s)')
+    run.add_argument('--heuristic', choices=sorted(HEURISTICS), default='vsids')
+    run.add_argument('--timeout', type=float, default=10.0, help='seconds per run (default: %(default)s)')
+    run.add_argument('--repeat', type=int, default=1, help='runs per instance, the fastest is kept (default: %(default)s)')
+    run.add_argument('--label', help='name of the run in the history (default: its date)')
+    cmp = commands.add_parser('compare', help='flag the regressions of a run against a baseline')
+    cmp.add_argument('--baseline', help='label of the baseline run (default: the one before --run)')
+    cmp.add_argument('--run', help='label of the compared run (default: the latest)')
+    cmp.add_argument('--threshold', type=float, default=0.1, help='tolerated CPU time increase (default: %(default)s)')
+    cmp.add_argument('--min-time', dest='min_time', type=float, default=0.05,
+                     help='CPU time differences below this many seconds are noise (default: %(default)s)')
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        args.engines = args.engines.split(',')
+        for engine in args.engines:
+            if engine not in ENGINES:
+                parser.error('unknown engine %s (choose from %s)' % (engine, ', '.join(ENGINES)))
+        args.sets = args.sets.split(',')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    history = load_history(args.history)
+    if args.command == 'run':
+        run = run_suite(args.engines, instances(args.sets), args.heuristic, args.timeout, args.repeat, args.label,
+                        report=lambda record: print(format_record(record), flush=True))
+        history.append(run)
+        save_history(args.history, history)
+        print('\n'.join(summary(run)))
+        return 0
+    if not history:
+        sys.exit('ERROR: empty history (%s).' % args.history)
+    current = find_run(history, args.run) if args.run else history[-1]
+    if args.baseline:
+        baseline = find_run(history, args.baseline)
+    else:
+        index = history.index(current)
+        if index == 0:
+            sys.exit('ERROR: no run before %s to compare with.' % current['label'])
+        baseline = history[index - 1]
+    regressions = compare(baseline, current, args.threshold, args.min_time)
+    print('%s (%s) against %s (%s): %d regressions' % (
+        current['label'], current['commit'], baseline['label'], baseline['commit'], len(regressions)))
+    for engine, instance, message in regressions:
+        print('REGRESSION %-10s %-50s %s' % (engine, instance, message))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
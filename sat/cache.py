@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+'''
+    Binary cache of parsed DIMACS formulas
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    The first read of an instance writes its Formula to the cache folder as
+    a header (counts and content hash) followed by the int64 clause offsets
+    and the int32 literals. Later reads memory map that entry and view its
+    arrays in place, without tokenizing anything. Entries are keyed by the
+    hash of the instance contents; a small record per instance path keeps
+    its size and mtime, so the contents are only hashed again when those
+    change. The least recently used files are evicted once the folder
+    grows over its size bound.
+    read_dimacs() goes through the cache when the SAT_CACHE environment
+    variable names a folder (SAT_CACHE_SIZE bounds it, in bytes).
+    Use: python sat/cache.py <cache_folder> <cnf_instance>... (fills the cache)
+'''
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import Formula, parse_dimacs
+
+MAX_BYTES = 1 << 30  # Default bound of the cache folder
+_MAGIC = b'CNFC'
+_VERSION = 1
+_DIGEST = 16  # Bytes of the blake2b content hash
+_HEADER = struct.Struct('<4sIqqq%ds' % _DIGEST)  # magic, version, num_vars, offsets, literals, hash
+_RECORD = struct.Struct('<qq%ds' % _DIGEST)  # Source size, source mtime_ns, content hash
+_ENTRY, _PATH = '.formula', '.path'
+
+
+def content_hash(filename):
+    """blake2b digest of the contents of a file"""
+    digest = hashlib.blake2b(digest_size=_DIGEST)
+    with open(filename, 'rb') as f:
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                return digest.digest()
+            digest.update(block)
+
+
+def write_formula(path, formula, digest=bytes(_DIGEST)):
+    """Writes a Formula in the binary format of the cache"""
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, formula.num_vars, len(formula.offsets), len(formula.lits), digest))
+        f.write(array('q', formula.offsets).tobytes())
+        f.write(array('i', formula.lits).tobytes())
+
+
+def map_formula(path):
+    """Formula whose arrays are read only views on the memory mapped file, None if it is not a valid entry"""
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return None
+    if len(data) < _HEADER.size:
+        data.close()
+        return None
+    magic, version, num_vars, num_offsets, num_lits, _ = _HEADER.unpack_from(data)
+    end = _HEADER.size + 8 * num_offsets
+    if magic != _MAGIC or version != _VERSION or len(data) != end + 4 * num_lits:
+        data.close()
+        return None
+    view = memoryview(data)  # The views keep the map open until the Formula is released
+    return Formula(num_vars, view[end:].cast('i'), view[_HEADER.size:end].cast('q'))
+
+
+class FormulaCache():
+    """Folder of parsed formulas with least recently used eviction"""
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        """
+        Initialization
+        directory: Folder of the cache files, created when missing
+        max_bytes: The oldest files are evicted while the folder is larger than this
+        hits, misses: Loads served from an entry and loads that parsed the instance
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name, kind):
+        return os.path.join(self.directory, name + kind)
+
+    def record(self, filename):
+        """Path of the record of an instance, named after its absolute path"""
+        key = hashlib.blake2b(os.path.abspath(filename).encode(errors='surrogateescape'), digest_size=_DIGEST)
+        return self.path(key.hexdigest(), _PATH)
+
+    def replace(self, path, write):
+        """Writes a cache file atomically, other processes see the old file or the new one"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def digest(self, filename, stat):
+        """Content hash of the instance, from its record while its size and mtime do not change"""
+        record = self.record(filename)
+        try:
+            with open(record, 'rb') as f:
+                size, mtime, digest = _RECORD.unpack(f.read())
+        except (OSError, struct.error):
+            size = mtime = digest = None
+        if (size, mtime) != (stat.st_size, stat.st_mtime_ns):
+            digest = content_hash(filename)
+
+            def write(tmp):
+                with open(tmp, 'wb') as f:
+                    f.write(_RECORD.pack(stat.st_size, stat.st_mtime_ns, digest))
+            self.replace(record, write)
+        return digest
+
+    def load(self, filename):
+        """Formula of a DIMACS file, mapped from its entry or parsed and stored"""
+        digest = self.digest(filename, os.stat(filename))
+        entry = self.path(digest.hex(), _ENTRY)
+        try:
+            formula = map_formula(entry)
+        except OSError:  # Missing or evicted
+            formula = None
+        if formula is not None:
+            self.hits += 1
+            os.utime(entry)  # Most recently used
+            return formula
+        self.misses += 1
+        formula = parse_dimacs(filename)
+        self.replace(entry, lambda tmp: write_formula(tmp, formula, digest))
+        self.evict()
+        return formula
+
+    def evict(self):
+        """Removes the least recently used files until the folder fits in max_bytes"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((_ENTRY, _PATH)):
+                try:
+                    stat = entry.stat()
+                except OSError:  # Removed by another process
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def from_environment():
+    """Cache named by the SAT_CACHE environment variable, or None"""
+    directory = os.environ.get('SAT_CACHE')
+    if not directory:
+        return None
+    return FormulaCache(directory, int(os.environ.get('SAT_CACHE_SIZE', MAX_BYTES)))
+
+
+def main():
+    cache = FormulaCache(sys.argv[1], int(os.environ.get('SAT_CACHE_SIZE', MAX_BYTES)))
+    for filename in sys.argv[2:]:
+        formula = cache.load(filename)
+        print('c %s: %d vars, %d clauses' % (filename, formula.num_vars, formula.num_clauses))
+    print('c %d hits, %d misses' % (cache.hits, cache.misses))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+'''
+    SAT solver based on conflict driven clause learning
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    Conflicts are analysed on the implication graph kept by the propagation
+    engine (reason clause per implied variable) down to the first unique
+    implication point. The learnt clause is minimized, added to the formula
+    and the search jumps back to the second highest level in it. The
+    learnt clauses are kept in a LearntClauses database that deletes the
+    useless ones from time to time. solve() takes assumptions, decided
+    first one per level; when one of them is falsified, failed holds the
+    subset of assumptions responsible for it. An optional deadline stops
+    the search without an answer.
+'''
+
+import os
+import sys
+import time
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import read_dimacs
+from sat.heuristics import make_heuristic
+from sat.learnts import LearntClauses
+from sat.options import parse_args
+from sat.preprocess import Preprocessor
+from sat.propagate import Propagator
+from sat.restarts import make_restart
+from sat.stats import Stats
+
+
+def parse(filename):
+    formula = read_dimacs(filename)
+    return formula.num_vars, formula
+
+
+class CDCL(Propagator):
+    """A propagation engine that learns a clause from every conflict"""
+
+    def __init__(self, num_vars, clauses=(), heuristic='vsids', restart='none', phase_saving=True,
+                 learnt_budget=None, report=None):
+        """
+        Initialization
+        heuristic: Name of the decision heuristic (see sat.heuristics)
+        restart: Name of the restart policy (see sat.restarts)
+        phase_saving: Branch on the last polarity of each variable
+        learnt_budget: Maximum number of literals in learnt clauses (None: no limit)
+        report: Optional callable receiving the report line of every learnt clause reduction
+        learnts: Database of the learnt clauses (see sat.learnts)
+        seen: Marks of the variables visited by the conflict analysis
+        marked: Variables marked by the minimization, cleared after each analysis
+        failed: Assumptions that made the last solve() call fail
+        """
+        super().__init__(num_vars, clauses)
+        self.learnts = LearntClauses(self, budget=learnt_budget, report=report)
+        self.seen = [False] * (num_vars + 1)
+        self.marked = []
+        self.failed = []
+        self.heuristic = make_heuristic(heuristic, self)
+        self.restart_policy = make_restart(restart)
+        if phase_saving:
+            self.save_phases()
+
+    def resize(self, num_vars):
+        old = self.num_vars
+        super().resize(num_vars)
+        if num_vars > old:
+            self.seen += [False] * (num_vars - old)
+            self.heuristic.resize(num_vars)
+
+    def analyze(self, conflict):
+        """Returns the first UIP clause of the conflict, with the UIP first, and its backjump level"""
+        seen, level, reason, trail = self.seen, self.level, self.reason, self.trail
+        current = self.decision_level()
+        learnt = [None]
+        pending = 0
+        index = len(trail) - 1
+        ref = conflict
+        literal = None
+        bump, learnts = self.heuristic.bump, self.learnts
+        while True:
+            clause = self.clauses[ref]
+            bump(clause)
+            if ref in learnts:
+                learnts.bump(ref)
+            for q in (clause if literal is None else clause[1:]):  # Implied literal is clause[0]
+                var = abs(q)
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    if level[var] >= current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while not seen[abs(trail[index])]:
+                index -= 1
+            literal = trail[index]
+            index -= 1
+            seen[abs(literal)] = False
+            pending -= 1
+            if pending == 0:
+                break
+            ref = reason[abs(literal)]
+        learnt[0] = -literal
+        self.heuristic.decay()
+        learnts.decay()
+
+        self.marked = []
+        minimized = self.minimize(learnt)
+        for q in learnt:
+            seen[abs(q)] = False
+        for var in self.marked:
+            seen[var] = False
+        if len(minimized) == 1:
+            return minimized, 0
+        high = max(range(1, len(minimized)), key=lambda i: level[abs(minimized[i])])
+        minimized[1], minimized[high] = minimized[high], minimized[1]  # Second watch on the backjump level
+        return minimized, level[abs(minimized[1])]
+
+    def minimize(self, learnt):
+        """Drops the literals implied by other literals of the learnt clause"""
+        levels = {self.level[abs(q)] for q in learnt[1:]}
+        return [learnt[0]] + [q for q in learnt[1:]
+                              if self.reason[abs(q)] is None or not self.redundant(q, levels)]
+
+    def redundant(self, literal, levels):
+        """Checks whether the reasons of the literal lead back to literals of the learnt clause"""
+        seen, level, reason, clauses = self.seen, self.level, self.reason, self.clauses
+        stack = [literal]
+        marked = []
+        while stack:
+            var = abs(stack.pop())
+            for q in clauses[reason[var]][1:]:
+                v = abs(q)
+                if seen[v] or level[v] == 0:
+                    continue
+                if reason[v] is None or level[v] not in levels:
+                    for m in marked:
+                        seen[m] = False
+                    return False
+                seen[v] = True
+                marked.append(v)
+                stack.append(q)
+        self.marked.extend(marked)
+        return True
+
+    def analyze_final(self, literal):
+        """Assumptions that imply the negation of the assumption literal, literal included"""
+        failed = [literal]
+        if self.decision_level() == 0:
+            return failed
+        seen, reason, trail = self.seen, self.reason, self.trail
+        seen[abs(literal)] = True
+        for q in reversed(trail[self.trail_lim[0]:]):
+            var = abs(q)
+            if not seen[var]:
+                continue
+            if reason[var] is None:  # Decisions below the assumption levels are assumptions
+                failed.append(q)
+            else:
+                for r in self.clauses[reason[var]][1:]:
+                    if self.level[abs(r)] > 0:
+                        seen[abs(r)] = True
+            seen[var] = False
+        seen[abs(literal)] = False
+        return failed
+
+    def pick_branch(self):
+        var = self.heuristic.pick()
+        if var is None:
+            return None
+        return self.heuristic.polarity(var) or self.polarity(var, positive=False)
+
+    def learn(self, learnt, lbd):
+        """Adds the learnt clause and asserts its UIP literal"""
+        if len(learnt) == 1:
+            self.assign(learnt[0])
+        else:
+            ref = self.attach(learnt)
+            self.learnts.add(ref, lbd)
+            self.assign(learnt[0], ref)
+
+    def solve(self, assumptions=(), deadline=None):
+        """Searches for a model where the assumptions hold, keeping the learnt clauses for later calls.
+        Returns None when the time.perf_counter() deadline passes first"""
+        self.backtrack(0)
+        self.failed = []
+        if not self.ok:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if self.decision_level() == 0:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                lbd = self.lbd(learnt)
+                self.backtrack(level)
+                self.learn(learnt, lbd)
+                if self.restart_policy.conflict(lbd):
+                    self.restart()
+                if self.learnts.due():
+                    self.learnts.reduce()
+                if deadline is not None and self.conflicts % 64 == 0 and time.perf_counter() > deadline:
+                    return None
+            else:
+                literal = None
+                while self.decision_level() < len(assumptions):
+                    p = assumptions[self.decision_level()]
+                    if self.value[p] is True:  # Already implied, keep one level per assumption
+                        self.trail_lim.append(len(self.trail))
+                    elif self.value[p] is False:
+                        self.failed = self.analyze_final(p)
+                        return False
+                    else:
+                        literal = p
+                        break
+                if literal is None:
+                    literal = self.pick_branch()
+                    if literal is None:
+                        return True
+                self.decide(literal)
+
+
+def main():
+    args = parse_args(phase_saving=True, dpll=False, cdcl=True)
+    stats = Stats()
+    with stats.timer('parse'):
+        variables, clauses = parse(args.instance)
+    preprocessor = Preprocessor(variables, clauses) if args.preprocess else None
+    if preprocessor:
+        with stats.timer('preprocess'):
+            clauses = preprocessor.simplify()
+    solver = CDCL(variables, clauses, args.heuristic, args.restart, args.phase_saving, args.learnt_budget,
+                  report=lambda line: print('c ' + line))
+    if args.stats:
+        stats.instrument(solver, solver.heuristic)
+    with stats.timer('search'):
+        sat = solver.solve()
+    if sat:
+        solution = solver.model()
+        if preprocessor:
+            solution = preprocessor.extend(solution)
+        print('s SATISFIABLE' + '\n' + 'v ' + ' '.join(str(x) for x in solution) + ' 0')
+    else:
+        print('s UNSATISFIABLE')
+    if args.stats:
+        stats.report(solver)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+'''
+    Cube-and-conquer solver
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    A lookahead phase splits the formula into cubes, the partial
+    assignments of the leaves of a shallow search tree. At each node it
+    propagates both polarities of the most frequent free variables and
+    branches on the one whose two sides imply the most assignments. A
+    polarity that fails fixes the opposite literal, and a node where both
+    fail is refuted. A pool of workers then solves the cubes as
+    assumptions of an incremental Solver (see sat.api), so each worker
+    keeps its learnt clauses from one cube to the next. The first SAT cube
+    gives the model, and the formula is UNSAT once every cube is refuted.
+    A worker that spends more than the time slice on a cube splits it in
+    two with the same lookahead and sends both halves back to the queue.
+    Use: python sat/cube.py <cnf_instance> [heuristic] [--workers N] [--cubes N] [--time-slice SECONDS] [--stats]
+'''
+
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.api import Solver
+from sat.dimacs import Formula, read_dimacs
+from sat.heuristics import CANDIDATES, balance, probe
+from sat.options import parse_args
+from sat.portfolio import share, shared_formula
+from sat.preprocess import Preprocessor
+from sat.propagate import Propagator
+from sat.stats import COUNTERS, Stats
+from sat.verify import check_model
+
+
+def occurrence_order(formula):
+    """Variables by decreasing number of occurrences, the lookahead candidates come first in it"""
+    counts = [0] * (formula.num_vars + 1)
+    for literal in formula.lits:
+        counts[abs(literal)] += 1
+    return sorted(range(1, formula.num_vars + 1), key=lambda v: -counts[v])
+
+
+def place(engine, cube):
+    """Decides the literals of the cube from level 0, returns False if they lead to a conflict"""
+    engine.backtrack(0)
+    value = engine.value
+    for literal in cube:
+        if value[literal] is False:
+            return False
+        if value[literal] is None:
+            engine.decide(literal)
+            if engine.propagate() is not None:
+                return False
+    return True
+
+
+def branch(engine, cube, order, candidates=CANDIDATES):
+    """Lookahead at the node of the cube: returns ('unsat', cube, None), ('sat', cube, None) with the model
+    in the engine, or ('split', cube, var), the cube grown with the failed literals found on the way"""
+    cube = list(cube)
+    if not place(engine, cube):
+        return 'unsat', cube, None
+    value = engine.value
+    while True:
+        free = [v for v in order if value[v] is None][:candidates]
+        if not free:
+            return 'sat', cube, None
+        best, best_score, failed = None, -1, None
+        for var in free:
+            positive, negative = probe(engine, var), probe(engine, -var)
+            if positive is None or negative is None:
+                failed = -var if positive is None else var
+                if positive is None and negative is None:
+                    return 'unsat', cube, None
+                break
+            score = balance(positive, negative)
+            if score > best_score:
+                best, best_score = var, score
+        if failed is None:
+            return 'split', cube, best
+        cube.append(failed)  # Implied by the cube, fixed on a level of its own
+        engine.decide(failed)
+        if engine.propagate() is not None:
+            return 'unsat', cube, None
+
+
+def make_cubes(formula, count, candidates=CANDIDATES):
+    """Splits the formula breadth first until there are count cubes, returns (model, cubes):
+    model is a model found by the lookahead itself (then cubes is empty), cubes [] means UNSAT"""
+    engine = Propagator(formula.num_vars, formula)
+    if not engine.ok or engine.propagate() is not None:
+        return None, []
+    order = occurrence_order(formula)
+    nodes = deque([[]])
+    while nodes and len(nodes) < count:
+        status, cube, var = branch(engine, nodes.popleft(), order, candidates)
+        if status == 'sat':
+            return engine.model(), []
+        if status == 'split':
+            nodes.extend((cube + [var], cube + [-var]))
+    return None, list(nodes)
+
+
+def worker(name, index, tasks, results, heuristic, options, time_slice):
+    """Solves the cubes of its own tasks queue over the formula of the shared memory block name, until a None
+    task. Puts (index, kind, cube, data, counters) in results: ('sat', cube, model), ('unsat', cube, None),
+    ('refuted', cube, None) when the formula itself is UNSAT, ('split', cube, halves) or ('error', cube,
+    message), counters being the COUNTERS of its engine so far"""
+    sys.stdout = open(os.devnull, 'w')  # Only the coordinator writes the answer
+    shm = shared_memory.SharedMemory(name)
+    formula = shared_formula(shm)
+    cube, solver = None, None
+
+    def put(kind, data):
+        counters = tuple(getattr(solver.engine, c) for c in COUNTERS) if solver else (0,) * len(COUNTERS)
+        results.put((index, kind, cube, data, counters))
+    try:
+        solver = Solver(formula, formula.num_vars, heuristic, **options)
+        order = occurrence_order(formula)
+        formula.lits.release()
+        formula.offsets.release()
+        shm.close()
+        while True:
+            cube = tasks.get()
+            if cube is None:
+                return
+            deadline = time.perf_counter() + time_slice if time_slice else None
+            sat = solver.solve(cube, deadline)
+            if sat:
+                put('sat', solver.model())
+            elif sat is False:
+                put('unsat' if solver.failed() else 'refuted', None)
+            else:  # Past the time slice: split the cube in two
+                status, grown, var = branch(solver.engine, cube, order)
+                if status == 'sat':
+                    put('sat', solver.engine.model())
+                elif status == 'unsat':
+                    put('unsat', None)
+                else:
+                    put('split', [grown + [var], grown + [-var]])
+                solver.engine.backtrack(0)
+    except Exception as e:  # Reported instead of hanging the coordinator
+        put('error', repr(e))
+
+
+def conquer(formula, cubes, workers=None, heuristic='vsids', time_slice=None, options=None, report=None,
+            counters=None, target=worker):
+    """Solves the cubes in a pool of workers, returns True with a model, False with None, or (None, None)
+    when a worker failed or every worker died. Each worker gets one cube at a time, so the cube of a worker
+    that dies without an answer goes back to the queue. report is an optional callable receiving a summary
+    line at the end, counters an optional dict receiving the COUNTERS of the workers summed. target is the
+    function run by each worker process, with the arguments of worker"""
+    workers = workers or os.cpu_count()
+    shm = share(formula)
+    queued, results = deque(cubes), multiprocessing.Queue()
+    solved, splits, requeued = 0, 0, 0
+    count = min(workers, max(len(queued), 1))
+    tasks = [multiprocessing.Queue() for _ in range(count)]
+    holding = [None] * count  # Cube each worker is on
+    totals = [(0,) * len(COUNTERS)] * count  # Counters of each worker at its last answer
+    pool = [multiprocessing.Process(target=target, daemon=True,
+                                    args=(shm.name, i, tasks[i], results, heuristic, options or {}, time_slice))
+            for i in range(count)]
+
+    def dispatch():
+        for i, p in enumerate(pool):
+            if queued and holding[i] is None and p.is_alive():
+                holding[i] = queued.popleft()
+                tasks[i].put(holding[i])
+    try:
+        for p in pool:
+            p.start()
+        dispatch()
+        while queued or any(cube is not None for cube in holding):
+            try:
+                index, kind, cube, data, totals[index] = results.get(timeout=0.1)
+            except queue.Empty:
+                for i, p in enumerate(pool):
+                    if holding[i] is not None and not p.is_alive():  # Died without an answer
+                        queued.append(holding[i])
+                        holding[i] = None
+                        requeued += 1
+                if not any(p.is_alive() for p in pool) and results.empty():
+                    return None, None
+                dispatch()
+                continue
+            if holding[index] != cube:  # Late answer of a cube taken back
+                continue
+            holding[index] = None
+            if kind == 'sat':
+                return (True, data) if check_model(formula, data) else (None, None)
+            if kind == 'refuted':
+                return False, None
+            if kind == 'error':
+                return None, None
+            if kind == 'split':
+                splits += 1
+                queued.extend(data)
+            else:
+                solved += 1
+            dispatch()
+        return False, None
+    finally:
+        if counters is not None:
+            counters.update(zip(COUNTERS, map(sum, zip(*totals))))
+        if report is not None:
+            report('%d cubes, %d refuted, %d split after the time slice, %d re-queued from dead workers' % (
+                len(cubes), solved, splits, requeued))
+        for p in pool:
+            if p.is_alive():
+                p.terminate()
+        for p in pool:
+            p.join()
+        shm.close()
+        shm.unlink()
+
+
+def solve(formula, workers=None, cubes=None, heuristic='vsids', time_slice=5.0, options=None, report=None):
+    """Cube and conquer, returns (satisfiable, model) or (None, None) when a worker failed"""
+    workers = workers or os.cpu_count()
+    model, leaves = make_cubes(formula, cubes or 8 * workers)
+    if model is not None:
+        return True, model
+    if not leaves:
+        return False, None
+    return conquer(formula, leaves, workers, heuristic, time_slice, options, report)
+
+
+def add_cube_arguments(parser):
+    parser.add_argument('--workers', type=int, default=0, help='processes solving cubes (default: one per CPU)')
+    parser.add_argument('--cubes', type=int, default=None, help='cubes of the lookahead (default: 8 per worker)')
+    parser.add_argument('--time-slice', dest='time_slice', type=float, default=5.0,
+                        help='seconds on a cube before splitting it (default: %(default)s, 0: never)')
+
+
+def main():
+    args = parse_args('Cube and conquer', phase_saving=True, dpll=False, cdcl=True, arguments=add_cube_arguments)
+    stats = Stats()
+    with stats.timer('parse'):
+        formula = read_dimacs(args.instance)
+    preprocessor = Preprocessor(formula.num_vars, formula) if args.preprocess else None
+    if preprocessor:
+        with stats.timer('preprocess'):
+            formula = Formula.from_clauses(formula.num_vars, preprocessor.simplify())
+    options = {'restart': args.restart, 'phase_saving': args.phase_saving, 'learnt_budget': args.learnt_budget}
+    workers = args.workers or os.cpu_count()
+    with stats.timer('cube'):
+        model, leaves = make_cubes(formula, args.cubes or 8 * workers)
+    sat, counters = model is not None, {}
+    if leaves:
+        with stats.timer('conquer'):
+            sat, model = conquer(formula, leaves, workers, args.heuristic, args.time_slice, options,
+                                 report=lambda line: print('c ' + line), counters=counters)
+    if sat is None:
+        print('s UNKNOWN')
+    elif sat:
+        if preprocessor:
+            model = preprocessor.extend(model)
+        print('s SATISFIABLE' + '\n' + 'v ' + ' '.join(str(x) for x in model) + ' 0')
+    else:
+        print('s UNSATISFIABLE')
+    if args.stats:  # Counters summed over the workers, the lookahead of the cube phase is not counted
+        stats.report(SimpleNamespace(**counters) if counters else None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+'''
+    DIMACS CNF reader shared by every solver of the package
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    The file is memory mapped and tokenized in large chunks (with NumPy when
+    it is installed) instead of line by line. Compressed files (.gz, .xz,
+    .bz2) and stdin ('-') are decompressed and parsed chunk by chunk, so
+    their whole text is never held in memory. Clauses may span several
+    lines: only the 0 terminators delimit them. The result is a Formula, a
+    flat array of literals plus the offset where every clause starts.
+    When the SAT_CACHE environment variable is set, read_dimacs() maps the
+    formula from the binary cache of sat.cache instead of parsing it again.
+'''
+
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+import re
+import sys
+from array import array
+
+CHUNK = 1 << 22  # Bytes tokenized at once
+NUMPY_MIN_SIZE = 1 << 20  # Below this size importing NumPy costs more than it saves
+
+_HEADER = re.compile(rb'^[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+)', re.M)
+_END = re.compile(rb'^[ \t]*%', re.M)  # SATLIB end of formula mark
+
+STDIN = '-'
+COMPRESSED = {'.gz': gzip.open, '.xz': lzma.open, '.bz2': bz2.open}  # Extension -> opener
+
+
+class Formula():
+    """A CNF formula stored as a flat literal array plus clause offsets"""
+
+    def __init__(self, num_vars=0, lits=None, offsets=None):
+        """
+        Initialization
+        num_vars: Number of variables
+        lits: Literals of all the clauses, one after the other (array of int32)
+        offsets: Start of each clause in lits, plus the end of the last one
+        """
+        self.num_vars = num_vars
+        self.lits = lits if lits is not None else array('i')
+        self.offsets = offsets if offsets is not None else array('q', [0])
+
+    @classmethod
+    def from_clauses(cls, num_vars, clauses):
+        formula = cls(num_vars)
+        lits, offsets = formula.lits, formula.offsets
+        for clause in clauses:
+            lits.extend(clause)
+            offsets.append(len(lits))
+        return formula
+
+    @property
+    def num_clauses(self):
+        return len(self.offsets) - 1
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def clause(self, i):
+        return self.lits[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    def __iter__(self):
+        lits, offsets = self.lits, self.offsets
+        for i in range(len(offsets) - 1):
+            yield lits[offsets[i]:offsets[i + 1]].tolist()
+
+
+def strip_comments(chunk):
+    """Removes the comment lines and the problem line of a chunk"""
+    marks = [i for i in (chunk.find(b'c'), chunk.find(b'p')) if i >= 0]
+    if not marks:
+        return chunk
+    parts, pos = [], 0
+    while marks:
+        mark = min(marks)
+        parts.append(chunk[pos:chunk.rfind(b'\n', pos, mark) + 1])
+        pos = chunk.find(b'\n', mark)
+        if pos < 0:
+            return b''.join(parts)
+        marks = [i for i in (chunk.find(b'c', pos), chunk.find(b'p', pos)) if i >= 0]
+    parts.append(chunk[pos:])
+    return b''.join(parts)
+
+
+def load_numpy():
+    try:
+        import numpy
+    except ImportError:  # Pure Python tokenizer
+        return None
+    return numpy
+
+
+def tokenize(chunk, numpy=None):
+    """Integers of a chunk of clause text, as an array('i')"""
+    if not chunk or chunk.isspace():
+        return array('i')
+    if numpy is not None:
+        return array('i', numpy.fromstring(chunk, dtype=numpy.int32, sep=' ').tobytes())
+    return array('i', list(map(int, chunk.split())))
+
+
+def split_clauses(tokens, formula, numpy=None):
+    """Moves the 0 terminated clauses of tokens into the formula, returns the unterminated tail"""
+    lits, offsets = formula.lits, formula.offsets
+    if numpy is not None:
+        raw = numpy.frombuffer(tokens, dtype=numpy.int32)
+        zeros = numpy.flatnonzero(raw == 0)
+        if len(zeros):
+            body = raw[:zeros[-1]]
+            lits.frombytes(body[body != 0].tobytes())
+            ends = zeros - numpy.arange(len(zeros)) + offsets[-1]
+            offsets.frombytes(ends.astype(numpy.int64).tobytes())
+            return tokens[zeros[-1] + 1:]
+        return tokens
+    start = 0
+    while True:
+        try:
+            end = tokens.index(0, start)
+        except ValueError:
+            return tokens[start:]
+        lits.extend(tokens[start:end])
+        offsets.append(len(lits))
+        start = end + 1
+
+
+def read_dimacs(filename):
+    """Reads a DIMACS CNF file into a Formula, through the formula cache when it is enabled"""
+    from sat.cache import from_environment
+    cache = from_environment() if filename != STDIN else None
+    if cache is not None:
+        return cache.load(filename)
+    return parse_dimacs(filename)
+
+
+def open_dimacs(filename):
+    """Binary stream of a compressed file or of stdin, decompressed on the fly"""
+    if filename == STDIN:
+        return sys.stdin.buffer
+    return COMPRESSED[os.path.splitext(filename)[1]](filename, 'rb')
+
+
+def map_chunks(data):
+    """Chunks of about CHUNK bytes of a mapped file, cut after a newline"""
+    pos, size = 0, len(data)
+    while pos < size:
+        cut = data.find(b'\n', min(pos + CHUNK, size))
+        cut = size if cut < 0 else cut + 1
+        yield data[pos:cut]
+        pos = cut
+
+
+def stream_chunks(stream):
+    """Chunks of about CHUNK bytes read from a stream, cut after a newline"""
+    tail = b''
+    while True:
+        block = stream.read(CHUNK)
+        if not block:
+            if tail:
+                yield tail
+            return
+        cut = block.rfind(b'\n') + 1
+        if cut:
+            yield tail + block[:cut]
+            tail = block[cut:]
+        else:  # A line longer than the chunk
+            tail += block
+
+
+def parse_chunks(chunks):
+    """Parses the chunks of a DIMACS text one at a time, returns the Formula"""
+    formula = Formula()
+    header = numpy = None
+    pending = array('i')
+    for chunk in chunks:
+        if header is None:
+            header = _HEADER.search(chunk)
+        end = _END.search(chunk) if b'%' in chunk else None
+        if end:
+            chunk = chunk[:end.start()]
+        if numpy is None and len(chunk) >= NUMPY_MIN_SIZE:
+            numpy = load_numpy()
+        pending.extend(tokenize(strip_comments(chunk), numpy))
+        pending = split_clauses(pending, formula, numpy)
+        if end:
+            break
+    if pending:  # Last clause without its 0
+        formula.lits.extend(pending)
+        formula.offsets.append(len(formula.lits))
+    if header is None:  # Without header the variables are the ones that appear
+        formula.num_vars = max(max(formula.lits, default=0), -min(formula.lits, default=0))
+    else:
+        formula.num_vars = int(header.group(1))
+    return formula
+
+
+def parse_dimacs(filename):
+    """Parses a DIMACS CNF file into a Formula, plain files are memory mapped and the others streamed"""
+    if filename == STDIN or os.path.splitext(filename)[1] in COMPRESSED:
+        stream = open_dimacs(filename)
+        try:
+            return parse_chunks(stream_chunks(stream))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+    with open(filename, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return parse_chunks(())
+        try:
+            return parse_chunks(map_chunks(data))
+        finally:
+            data.close()
@@ -0,0 +1,41 @@
+'''
+    Iterative DPLL search driver
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    Chronological backtracking over a Propagator without recursion: the
+    engine trail holds the assignment, and one flag per decision level
+    tells whether its decision was already flipped. A conflict undoes the
+    levels whose both branches failed and flips the deepest decision left,
+    so memory stays linear in the formula whatever the search depth.
+    An optional restart policy sends the search back to level 0.
+'''
+
+
+def search(engine, heuristic, restart=None):
+    """Returns True with the model in the engine, or False when the formula is unsatisfiable"""
+    flipped = []  # Per decision level, whether its decision is the second branch
+    while True:
+        conflict = engine.propagate()
+        if conflict is not None:
+            clause = engine.clauses[conflict]
+            heuristic.bump(clause)
+            heuristic.decay()
+            if restart is not None and flipped and restart.conflict(engine.lbd(clause)):
+                engine.restart()
+                flipped.clear()
+                continue
+            while flipped and flipped[-1]:  # Both branches failed
+                flipped.pop()
+            if not flipped:
+                return False
+            level = len(flipped) - 1
+            literal = engine.trail[engine.trail_lim[level]]
+            engine.backtrack(level)
+            flipped[-1] = True
+            engine.decide(-literal)
+            continue
+        variable = heuristic.pick()
+        if variable is None:
+            return True
+        flipped.append(False)
+        engine.decide(heuristic.polarity(variable) or engine.polarity(variable))
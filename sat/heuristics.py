@@ -0,0 +1,336 @@
+'''
+    Decision heuristics for the propagation based solvers
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    A heuristic is bound to a Propagator and answers pick() with the next
+    variable to branch on, or None when every variable is assigned. The
+    solvers report conflicts with bump() and decay(), and the engine reports
+    the variables undone by a backtrack through its on_backtrack hook.
+    The lookahead heuristic probes the candidate variables on the engine
+    itself: each polarity is propagated on a level of its own and undone.
+'''
+
+from functools import lru_cache
+
+from sat.propagate import grow_by_literal
+
+CANDIDATES = 20  # Free variables probed by each lookahead decision
+
+
+@lru_cache(maxsize=512)
+def acc_weight(weight, len_clause):
+    return weight ** -len_clause
+
+
+def jeroslow_wang(clauses, num_vars, weight=2):
+    """Two sided Jeroslow-Wang score of every variable"""
+    score = [0.0] * (num_vars + 1)
+    for clause in clauses:
+        w = acc_weight(weight, len(clause))
+        for literal in clause:
+            score[abs(literal)] += w
+    return score
+
+
+def probe(engine, literal, measure=len):
+    """Propagates literal on a new level of the engine and undoes it. Returns measure of the literals it
+    implies (literal first, measured while they hold), or None if it leads to a conflict. The decision
+    counter, the saved phases and the backtrack hook of the engine are left untouched"""
+    trail = engine.trail
+    start = len(trail)
+    phase, on_backtrack = engine.phase, engine.on_backtrack
+    engine.phase = engine.on_backtrack = None
+    engine.trail_lim.append(start)
+    engine.assign(literal)
+    try:
+        result = measure(trail[start:]) if engine.propagate() is None else None
+    finally:
+        engine.backtrack(engine.decision_level() - 1)
+        engine.phase, engine.on_backtrack = phase, on_backtrack
+    return result
+
+
+def balance(positive, negative):
+    """Lookahead score of a variable from the scores of its two polarities, balanced splits first"""
+    return positive * negative * 1024 + positive + negative
+
+
+class VarHeap():
+    """Binary max-heap of variables ordered by activity that knows the position of every variable"""
+
+    def __init__(self, activity):
+        """
+        Initialization
+        activity: Score per variable, shared with the owner of the heap
+        heap: Variables in heap order
+        indices: Position of each variable in the heap, -1 when absent
+        """
+        self.activity = activity
+        self.heap = []
+        self.indices = [-1] * len(activity)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, var):
+        return self.indices[var] >= 0
+
+    def push(self, var):
+        if self.indices[var] < 0:
+            self.indices[var] = len(self.heap)
+            self.heap.append(var)
+            self.sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        heap, indices = self.heap, self.indices
+        top = heap[0]
+        last = heap.pop()
+        indices[top] = -1
+        if heap:
+            heap[0] = last
+            indices[last] = 0
+            self.sift_down(0)
+        return top
+
+    def increased(self, var):
+        """Restores the heap order after the activity of the variable grew"""
+        if self.indices[var] >= 0:
+            self.sift_up(self.indices[var])
+
+    def sift_up(self, i):
+        heap, indices, activity = self.heap, self.indices, self.activity
+        var = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if activity[heap[parent]] >= activity[var]:
+                break
+            heap[i] = heap[parent]
+            indices[heap[i]] = i
+            i = parent
+        heap[i] = var
+        indices[var] = i
+
+    def sift_down(self, i):
+        heap, indices, activity = self.heap, self.indices, self.activity
+        var = heap[i]
+        size = len(heap)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and activity[heap[child + 1]] > activity[heap[child]]:
+                child += 1
+            if activity[heap[child]] <= activity[var]:
+                break
+            heap[i] = heap[child]
+            indices[heap[i]] = i
+            i = child
+        heap[i] = var
+        indices[var] = i
+
+
+class Heuristic():
+    """Base class of the decision heuristics"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def pick(self):
+        raise NotImplementedError
+
+    def polarity(self, var):
+        """Literal of the picked variable to branch on, None to leave the choice to the engine"""
+        return None
+
+    def bump(self, clause):
+        """Rewards the variables of a clause involved in a conflict"""
+
+    def decay(self):
+        """Ages the rewards, once per conflict"""
+
+    def unassigned(self, literals):
+        """Called with the literals undone by a backtrack"""
+
+    def resize(self, num_vars):
+        """Called after the engine grew to num_vars variables"""
+
+
+class JeroslowWang(Heuristic):
+    """Recounts the Jeroslow-Wang score over the unresolved clauses at every decision"""
+
+    def __init__(self, engine, weight=2):
+        super().__init__(engine)
+        self.weight = weight
+
+    def pick(self):
+        score = jeroslow_wang(self.engine.unresolved(), self.engine.num_vars, self.weight)
+        var = max(range(1, len(score)), key=score.__getitem__, default=None)
+        return var if var is not None and score[var] > 0 else None
+
+
+class OrderHeap(Heuristic):
+    """Picks the unassigned variable with the highest activity from a heap"""
+
+    def __init__(self, engine, activity):
+        super().__init__(engine)
+        self.activity = activity
+        self.order = VarHeap(activity)
+        for var in range(1, engine.num_vars + 1):
+            self.order.push(var)
+        engine.on_backtrack = self.unassigned
+
+    def pick(self):
+        value, order = self.engine.value, self.order
+        while order:
+            var = order.pop()
+            if value[var] is None:
+                return var
+        return None
+
+    def unassigned(self, literals):
+        push = self.order.push
+        for literal in literals:
+            push(abs(literal))
+
+    def resize(self, num_vars):
+        old = len(self.activity) - 1
+        self.activity += [0.0] * (num_vars - old)
+        self.order.indices += [-1] * (num_vars - old)
+        for var in range(old + 1, num_vars + 1):
+            self.order.push(var)
+
+
+class StaticOrder(OrderHeap):
+    """Branches on the variables in a fixed order, by default 1..n"""
+
+    def __init__(self, engine, order=None):
+        order = order or range(1, engine.num_vars + 1)
+        activity = [0.0] * (engine.num_vars + 1)
+        for rank, var in enumerate(order):
+            activity[var] = float(len(activity) - rank)
+        super().__init__(engine, activity)
+
+
+class VSIDS(OrderHeap):
+    """Exponential VSIDS: conflict activity starting from the Jeroslow-Wang score"""
+
+    def __init__(self, engine, weight=2, decay=0.95):
+        """
+        Initialization
+        weight: Jeroslow-Wang weight of the initial activity
+        inc: Current bump amount, grows by 1/decay at every conflict
+        """
+        super().__init__(engine, jeroslow_wang(engine.unresolved(), engine.num_vars, weight))
+        self.inc = 1.0
+        self.factor = 1.0 / decay
+
+    def bump(self, clause):
+        activity, order, inc = self.activity, self.order, self.inc
+        for literal in clause:
+            var = abs(literal)
+            activity[var] += inc
+            if activity[var] > 1e100:  # Rescale every activity to avoid overflow
+                for v in range(len(activity)):
+                    activity[v] *= 1e-100
+                inc = self.inc = self.inc * 1e-100
+            order.increased(var)
+
+    def decay(self):
+        self.inc *= self.factor
+
+
+class Lookahead(OrderHeap):
+    """Probes both polarities of the candidate variables and branches on the one that shortens the most
+    clauses. The candidates are the free variables with the highest Jeroslow-Wang score, taken from the
+    heap, so a decision costs at most 2 * candidates propagations on the engine. A failed literal is
+    picked with its failing polarity: its conflict makes the search assert the negation at once"""
+
+    def __init__(self, engine, weight=2, candidates=CANDIDATES):
+        """
+        Initialization
+        candidates: Free variables probed at each decision
+        clauses: Free literals of the clauses of the engine when the heuristic was created
+        occurs: Indices of the clauses containing each literal, indexed by literal
+        stamp: Last probe that counted each clause, so a clause counts once per probe
+        failed: Failed literal returned by the last pick, None if there was none
+        """
+        self.clauses = list(engine.unresolved())
+        super().__init__(engine, jeroslow_wang(self.clauses, engine.num_vars, weight))
+        self.weight = weight
+        self.candidates = candidates
+        self.occurs = [[] for _ in range(2 * engine.num_vars + 1)]
+        for i, clause in enumerate(self.clauses):
+            for literal in clause:
+                self.occurs[literal].append(i)
+        self.stamp = [0] * len(self.clauses)
+        self.probes = 0
+        self.failed = None
+        self.failed_literals = 0
+
+    def pick(self):
+        value, order = self.engine.value, self.order
+        free = []
+        while order and len(free) < self.candidates:
+            var = order.pop()
+            if value[var] is None:
+                free.append(var)
+        for var in free:  # Candidates stay in the heap until they are assigned
+            order.push(var)
+        self.failed = None
+        best, best_score = None, -1.0
+        for var in free:
+            positive = probe(self.engine, var, self.reduction)
+            negative = probe(self.engine, -var, self.reduction) if positive is not None else None
+            if positive is None or negative is None:
+                self.failed = var if positive is None else -var
+                self.failed_literals += 1
+                return var
+            score = balance(positive, negative)
+            if score > best_score:
+                best, best_score = var, score
+        return best
+
+    def polarity(self, var):
+        failed = self.failed
+        return failed if failed is not None and abs(failed) == var else None
+
+    def reduction(self, implied):
+        """Jeroslow-Wang weight of the clauses shortened but not satisfied by the implied literals"""
+        value, occurs, clauses, stamp, weight = self.engine.value, self.occurs, self.clauses, self.stamp, self.weight
+        self.probes += 1
+        mark = self.probes
+        score = 0.0
+        for literal in implied:
+            for i in occurs[-literal]:
+                if stamp[i] == mark:
+                    continue
+                stamp[i] = mark
+                free = 0
+                for q in clauses[i]:
+                    if value[q] is True:
+                        break
+                    if value[q] is None:
+                        free += 1
+                else:
+                    score += acc_weight(weight, free)
+        return score
+
+    def resize(self, num_vars):
+        old = len(self.activity) - 1
+        super().resize(num_vars)
+        self.occurs = grow_by_literal(self.occurs, old, num_vars - old, list)
+
+
+HEURISTICS = {
+    'jw': JeroslowWang,
+    'vsids': VSIDS,
+    'static': StaticOrder,
+    'lookahead': Lookahead,
+}
+
+
+def make_heuristic(name, engine, weight=2):
+    """Binds the heuristic called name to the engine, weight sets the Jeroslow-Wang scores"""
+    if name == 'static':
+        return StaticOrder(engine)
+    return HEURISTICS[name](engine, weight=weight)
@@ -0,0 +1,128 @@
+'''
+    Learnt clause database of the CDCL engine
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    Every learnt clause gets its LBD (number of distinct decision levels
+    when it was learnt, lowered if it later takes part in a conflict with
+    fewer) and an activity bumped at each conflict it takes part in. Every
+    few thousand conflicts the database drops the worst half of the clauses
+    that are neither glue clauses nor reasons of the current assignment,
+    and it drops more whenever the learnt literals exceed the budget.
+'''
+
+import time
+
+
+class LearntClauses():
+    """Scores and periodically reduces the learnt clauses of an engine"""
+
+    def __init__(self, engine, first=2000, increment=300, glue=2, budget=None, decay=0.999, report=None):
+        """
+        Initialization
+        engine: Propagator holding the clauses (see sat.propagate)
+        lbd: LBD of each learnt clause, by arena reference
+        activity: Activity of each learnt clause, by arena reference
+        first: Conflicts before the first reduction, increment: growth of the interval after each one
+        glue: Clauses with at most this LBD are never deleted
+        budget: Maximum number of learnt literals (None: no limit)
+        report: Optional callable receiving a line of text after each reduction
+        """
+        self.engine = engine
+        self.lbd = {}
+        self.activity = {}
+        self.literals = 0
+        self.inc = 1.0
+        self.factor = 1.0 / decay
+        self.glue = glue
+        self.budget = budget
+        self.interval = first
+        self.increment = increment
+        self.next_reduce = first
+        self.report = report
+        self.reductions = 0
+        self.deleted = 0
+        self.last_time = time.process_time()
+        self.last_propagations = 0
+
+    def __len__(self):
+        return len(self.lbd)
+
+    def __iter__(self):
+        return iter(self.lbd)
+
+    def __contains__(self, ref):
+        return ref in self.lbd
+
+    def add(self, ref, lbd):
+        self.lbd[ref] = lbd
+        self.activity[ref] = self.inc
+        self.literals += self.engine.clauses.size(ref)
+
+    def bump(self, ref):
+        """Called for every learnt clause taking part in a conflict analysis"""
+        activity = self.activity
+        activity[ref] += self.inc
+        if activity[ref] > 1e20:  # Rescale every activity to avoid overflow
+            for r in activity:
+                activity[r] *= 1e-20
+            self.inc *= 1e-20
+        lbd = self.engine.lbd(self.engine.clauses[ref])
+        if lbd < self.lbd[ref]:
+            self.lbd[ref] = lbd
+
+    def decay(self):
+        self.inc *= self.factor
+
+    def over_budget(self):
+        return self.budget is not None and self.literals > self.budget
+
+    def due(self):
+        """Whether the engine should call reduce() now"""
+        return self.engine.conflicts >= self.next_reduce or self.over_budget()
+
+    def locked(self, ref):
+        """A learnt clause is locked while it is the reason of its first literal"""
+        engine = self.engine
+        literal = engine.clauses.lits[ref]
+        return engine.value[literal] is True and engine.reason[abs(literal)] == ref
+
+    def remove(self, ref):
+        self.literals -= self.engine.clauses.size(ref)
+        del self.lbd[ref]
+        del self.activity[ref]
+        self.engine.detach(ref)
+        self.deleted += 1
+
+    def reduce(self):
+        """Deletes the worst half of the deletable clauses, then more until the budget is met"""
+        engine, lbd, activity = self.engine, self.lbd, self.activity
+        clauses_before, literals_before, memory_before = len(lbd), self.literals, engine.clauses.memory()
+        candidates = [ref for ref in lbd if lbd[ref] > self.glue and not self.locked(ref)]
+        candidates.sort(key=lambda ref: (-lbd[ref], activity[ref]))  # Worst first
+        for ref in candidates[:len(candidates) // 2]:
+            self.remove(ref)
+        if self.over_budget():  # The rest of the candidates, then the glue clauses
+            glue = sorted((ref for ref in lbd if lbd[ref] <= self.glue and not self.locked(ref)),
+                          key=lambda ref: (-lbd[ref], activity[ref]))
+            for ref in candidates[len(candidates) // 2:] + glue:
+                if not self.over_budget():
+                    break
+                self.remove(ref)
+        if 4 * engine.clauses.wasted > len(engine.clauses.lits):
+            self.remap(engine.compact())
+        self.reductions += 1
+        self.interval += self.increment
+        self.next_reduce = engine.conflicts + self.interval
+        now = time.process_time()
+        if self.report is not None:
+            self.report('reduce %d: %d -> %d learnts, %d -> %d literals, arena %d -> %d KB, '
+                        '%.0f propagations/s since the previous one' % (
+                            self.reductions, clauses_before, len(self.lbd), literals_before, self.literals,
+                            memory_before // 1024, engine.clauses.memory() // 1024,
+                            (engine.propagations - self.last_propagations) / max(now - self.last_time, 1e-9)))
+        self.last_time, self.last_propagations = now, engine.propagations
+
+    def remap(self, remap):
+        """Follows a compaction of the arena"""
+        self.lbd = {remap[ref]: lbd for ref, lbd in self.lbd.items()}
+        self.activity = {remap[ref]: activity for ref, activity in self.activity.items()}
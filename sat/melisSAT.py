@@ -4,100 +4,62 @@
 	Course in Advanced Programming in Artificial Intelligence - UdL
 '''
 
+import os
 import random
 import sys
 
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import read_dimacs
+from sat.dpll import search
+from sat.heuristics import make_heuristic
+from sat.options import parse_args
+from sat.preprocess import Preprocessor
+from sat.propagate import Propagator, PureLiteralPropagator
+from sat.restarts import make_restart
+from sat.stats import Stats
 
-def parse(filename):
-    clauses = []
-    for line in open(filename):
-        if line.startswith('c'):
-            continue
-        if line.startswith('p'):
-            n_vars = line.split()[2]
-            continue
-        clause = [int(x) for x in line[:-2].split()]
-        clauses.append(clause)
-    return clauses, int(n_vars)
-
-
-def bcp(formula, unit):
-    modified = []
-    for clause in formula:
-        if unit in clause:
-            continue
-        if -unit in clause:
-            new_clause = [x for x in clause if x != -unit]
-            if not new_clause:
-                return -1
-            modified.append(new_clause)
-        else:
-            modified.append(clause)
-    return modified
-
-
-def get_weighted_abs_counter(formula, weight=2):
-    counter = {}
-    for clause in formula:
-        for literal in clause:
-            if abs(literal) in counter:
-                counter[abs(literal)] += weight ** -len(clause)
-            else:
-                counter[abs(literal)] = weight ** -len(clause)
-    return counter
-
-
-def unit_propagation(formula):
-    assignment = []
-    unit_clauses = [c for c in formula if len(c) == 1]
-    while unit_clauses:
-        unit = unit_clauses[0]
-        formula = bcp(formula, unit[0])
-        assignment += [unit[0]]
-        if formula == -1:
-            return -1, []
-        if not formula:
-            return formula, assignment
-        unit_clauses = [c for c in formula if len(c) == 1]
-    return formula, assignment
 
-
-def backtracking(formula, assignment):
-    formula, unit_assignment = unit_propagation(formula)
-    assignment = assignment + unit_assignment
-    if formula == - 1:
-        return []
-    if not formula:
-        return assignment
-
-    variable = jeroslow_wang_2_sided(formula)
-    print(variable)
-    solution = backtracking(bcp(formula, variable), assignment + [variable])
-    if not solution:
-        solution = backtracking(bcp(formula, -variable), assignment + [-variable])
-
-    return solution
+def parse(filename):
+    formula = read_dimacs(filename)
+    return formula, formula.num_vars
 
 
-def jeroslow_wang_2_sided(formula):
-    counter = get_weighted_abs_counter(formula)
-    return max(counter, key=counter.get)
+def backtracking(engine, heuristic, restart=None):
+    return search(engine, heuristic, restart=restart)
 
 
 # Main
 
 def main():
-    clauses, n_vars = parse(sys.argv[1])
-
-    solution = backtracking(clauses, [])
-
-    if solution:
-        solution += [x for x in range(1, n_vars + 1) if x not in solution and -x not in solution]
-        solution.sort(key=abs)
+    args = parse_args()
+    stats = Stats()
+    with stats.timer('parse'):
+        clauses, n_vars = parse(args.instance)
+    preprocessor = Preprocessor(n_vars, clauses) if args.preprocess else None
+    if preprocessor:
+        with stats.timer('preprocess'):
+            clauses = preprocessor.simplify()
+
+    engine = (PureLiteralPropagator if args.pure_literals else Propagator)(n_vars, clauses)
+    heuristic = make_heuristic(args.heuristic, engine, weight=2)
+    if args.phase_saving:
+        engine.save_phases()
+    if args.stats:
+        stats.instrument(engine, heuristic)
+
+    with stats.timer('search'):
+        sat = engine.ok and backtracking(engine, heuristic, make_restart(args.restart, learning=False))
+    if sat:
+        solution = engine.model()
+        if preprocessor:
+            solution = preprocessor.extend(solution)
         print('s SATISFIABLE')
         print('v ' + ' '.join([str(x) for x in solution]) + ' 0')
     else:
         print('s UNSATISFIABLE')
+    if args.stats:
+        stats.report(engine)
 
 
 if __name__ == '__main__':
@@ -1,8 +1,81 @@
+#!/usr/bin/env python
+'''
+    Entry point that runs any of the solvers of the package
+    Use: python -m sat [--engine <name>] [--heuristic <name>] [--restart <policy>] [--phase-saving] <cnf_instance>
+'''
+
+import argparse
+import importlib
+import os
+import sys
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.heuristics import HEURISTICS
+from sat.options import add_search_arguments, search_argv
+
+# Engine name -> module with a main() that reads the instance from sys.argv[1]
+# (and the decision heuristic from sys.argv[2] when it supports them)
+ENGINES = {
+    'cdcl': 'sat.cdcl',
+    'musk': 'sat.musk',
+    'muskVerbose': 'sat.muskVerbose',
+    'melisSAT': 'sat.melisSAT',
+    'SATanas': 'sat.SATanas',
+    'SATanas2': 'sat.SATanas2',
+    'sat': 'sat.sat',
+    'portfolio': 'sat.portfolio',
+    'cube': 'sat.cube',
+}
+
+DPLL_OPTIONS = ('heuristic', 'restart', 'phase_saving', 'preprocess', 'stats', 'profile', 'pure_literals')
+CDCL_OPTIONS = ('heuristic', 'restart', 'phase_saving', 'preprocess', 'stats', 'profile', 'learnt_budget')
+
+# Engine name -> options of this entry point that its script accepts
+OPTIONS = {
+    'cdcl': CDCL_OPTIONS,
+    'musk': DPLL_OPTIONS,
+    'muskVerbose': DPLL_OPTIONS,
+    'melisSAT': DPLL_OPTIONS,
+    'SATanas': DPLL_OPTIONS,
+    'SATanas2': DPLL_OPTIONS,
+    'sat': (),
+    'portfolio': ('heuristic', 'preprocess', 'stats', 'profile'),
+    'cube': CDCL_OPTIONS,
+}
+
+
+def given_options(args):
+    """Options set on the command line, the ones search_argv() forwards plus the heuristic"""
+    given = [name for name in ('heuristic', 'restart', 'phase_saving', 'learnt_budget')
+             if getattr(args, name) is not None]
+    return given + [name for name in ('preprocess', 'stats', 'profile', 'pure_literals') if getattr(args, name)]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='sat', description='Complete SAT solvers')
+    parser.add_argument('instance', help='CNF instance in DIMACS format')
+    parser.add_argument('-e', '--engine', choices=sorted(ENGINES), default='cdcl',
+                        help='solver to run (default: cdcl)')
+    parser.add_argument('--heuristic', choices=sorted(HEURISTICS), default=None,
+                        help='decision heuristic of the propagation based engines (default: vsids)')
+    add_search_arguments(parser, restart=None, phase_saving=None, cdcl=True)
+    args = parser.parse_args(argv)
+    for name in given_options(args):
+        if name not in OPTIONS[args.engine]:
+            parser.error('the %s engine does not take --%s' % (args.engine, name.replace('_', '-')))
+    return args
 
 
 def main():
-    pass
+    args = parse_args()
+    module = importlib.import_module(ENGINES[args.engine])
+    sys.argv = [module.__file__, args.instance]
+    if args.heuristic:
+        sys.argv.append(args.heuristic)
+    sys.argv += search_argv(args)
+    module.main()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,72 @@
+'''
+    Command line of the solver scripts of the package
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    Every script takes the instance and an optional heuristic name as
+    positional arguments (as race-complete.py runs them), plus the search
+    options below. sat.newsat forwards its own options with search_argv().
+    With --profile the rest of the run, from the argument parsing on, is
+    profiled (see sat.profiling).
+'''
+
+import argparse
+
+from sat.heuristics import HEURISTICS
+from sat.profiling import profile_until_exit
+from sat.restarts import RESTARTS
+
+
+def add_search_arguments(parser, restart='none', phase_saving=False, preprocess=False, dpll=True, cdcl=False):
+    parser.add_argument('--restart', choices=sorted(RESTARTS), default=restart,
+                        help='restart policy (default: %(default)s)')
+    parser.add_argument('--phase-saving', dest='phase_saving', action='store_true', default=phase_saving,
+                        help='branch first on the last polarity of each variable')
+    parser.add_argument('--no-phase-saving', dest='phase_saving', action='store_false')
+    parser.add_argument('--preprocess', action='store_true', default=preprocess,
+                        help='simplify the formula first (see sat.preprocess)')
+    parser.add_argument('--stats', action='store_true', help='print search statistics as comment lines')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='profile the run into FILE (cProfile, or sampled collapsed stacks for a .folded FILE)')
+    if dpll:  # Options that need chronological backtracking without learning
+        parser.add_argument('--pure-literals', dest='pure_literals', action='store_true',
+                            help='assign the literals that become pure during the search')
+    if cdcl:  # Options of the clause learning engine
+        parser.add_argument('--learnt-budget', dest='learnt_budget', type=int, default=None, metavar='LITERALS',
+                            help='maximum number of literals kept in learnt clauses')
+
+
+def parse_args(description=None, restart='none', phase_saving=False, dpll=True, cdcl=False, argv=None,
+               arguments=None):
+    """Arguments of a solver script, the defaults of the search options depend on the engine.
+    arguments is an optional function adding the options of the script to the parser"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('instance', help='CNF instance in DIMACS format (.gz, .xz or .bz2 too, - for stdin)')
+    parser.add_argument('heuristic', nargs='?', choices=sorted(HEURISTICS), default='vsids',
+                        help='decision heuristic (default: %(default)s)')
+    add_search_arguments(parser, restart, phase_saving, dpll=dpll, cdcl=cdcl)
+    if arguments is not None:
+        arguments(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        profile_until_exit(args.profile)
+    return args
+
+
+def search_argv(args):
+    """Search options of args as command line arguments, omitting the ones left unset"""
+    argv = []
+    if args.restart is not None:
+        argv += ['--restart', args.restart]
+    if args.phase_saving is not None:
+        argv.append('--phase-saving' if args.phase_saving else '--no-phase-saving')
+    if args.preprocess:
+        argv.append('--preprocess')
+    if args.stats:
+        argv.append('--stats')
+    if args.profile:
+        argv += ['--profile', args.profile]
+    if args.pure_literals:
+        argv.append('--pure-literals')
+    if args.learnt_budget is not None:
+        argv += ['--learnt-budget', str(args.learnt_budget)]
+    return argv
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+'''
+    Portfolio that races several solvers of the package on one instance
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    The instance is parsed once and its literal and offset arrays are
+    copied into a shared memory block that every worker process maps
+    instead of reading the file again. The first answer wins: SAT models
+    are checked against the formula before being accepted, and the
+    remaining workers are terminated as soon as there is a winner. With
+    --preprocess the formula is simplified once, before it is shared.
+    The members differ: musk and cdcl use the heuristic of the command
+    line, melisSAT Jeroslow-Wang with geometric restarts, SATanas VSIDS
+    with Luby restarts and phase saving, SATanas2 the lookahead, and
+    paia_sat its own chronological backtracking.
+    Use: python sat/portfolio.py <cnf_instance> [heuristic] [--engines musk,cdcl,...] [--preprocess] [--stats]
+                                 [--profile FILE]
+'''
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+from array import array
+from multiprocessing import shared_memory
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat import SATanas, SATanas2, melisSAT, musk
+from sat.cdcl import CDCL
+from sat.dimacs import Formula, read_dimacs
+from sat.heuristics import HEURISTICS, make_heuristic
+from sat.preprocess import Preprocessor
+from sat.profiling import profile_until_exit
+from sat.propagate import Propagator
+from sat.restarts import make_restart
+from sat.stats import Stats
+from sat.verify import check_model
+
+_HEADER = 3  # num_vars, number of offsets and number of literals, as int64
+
+
+def share(formula):
+    """Copies a Formula into a new shared memory block"""
+    header = array('q', [formula.num_vars, len(formula.offsets), len(formula.lits)])
+    offsets = array('q', formula.offsets)
+    lits = array('i', formula.lits)
+    size = 8 * _HEADER + offsets.itemsize * len(offsets) + lits.itemsize * len(lits)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    pos = 0
+    for data in (header, offsets, lits):
+        raw = data.tobytes()
+        shm.buf[pos:pos + len(raw)] = raw
+        pos += len(raw)
+    return shm
+
+
+def shared_formula(shm):
+    """Formula whose arrays are views on a block filled by share(), release() them before closing it"""
+    header = shm.buf[:8 * _HEADER].cast('q')
+    num_vars, num_offsets, num_lits = header
+    header.release()
+    start = 8 * _HEADER
+    end = start + 8 * num_offsets
+    offsets = shm.buf[start:end].cast('q')
+    lits = shm.buf[end:end + 4 * num_lits].cast('i')
+    return Formula(num_vars, lits, offsets)
+
+
+def dpll(solve, weight, heuristic=None, restart=None, phase_saving=False):
+    """Runner of a DPLL solver of the package (see musk.solve). heuristic, when given, replaces the one of
+    the race, so that the members of the portfolio search differently"""
+    def run(formula, default):
+        engine = Propagator(formula.num_vars, formula)
+        if phase_saving:
+            engine.save_phases()
+        policy = make_restart(restart, learning=False) if restart else None
+        if engine.ok and solve(engine, make_heuristic(heuristic or default, engine, weight=weight), policy):
+            return True, engine.model(), engine
+        return False, None, engine
+    return run
+
+
+def cdcl(formula, heuristic):
+    solver = CDCL(formula.num_vars, formula, heuristic)
+    if solver.solve():
+        return True, solver.model(), solver
+    return False, None, solver
+
+
+def paia_sat(formula, heuristic):
+    """Chronological backtracking of paia_sat.py (it has no heuristics and keeps no counters)"""
+    import paia_sat
+    cnf = paia_sat.CNF()
+    cnf.load_formula(formula)
+    sol = paia_sat.Solver(cnf).solve()
+    if sol.vars[cnf.num_vars] is None:
+        return False, None, None
+    return True, [v if sol.vars[v] else -v for v in range(1, cnf.num_vars + 1)], None
+
+
+# Engine name -> function(formula, heuristic) returning (satisfiable, model, engine with counters or None).
+# The DPLL engines share one search, so each one gets its own heuristic, restarts and phases
+ENGINES = {
+    'musk': dpll(musk.solve, 3),
+    'melisSAT': dpll(melisSAT.backtracking, 2, 'jw', restart='geometric'),
+    'SATanas': dpll(SATanas.solve, 3, 'vsids', restart='luby', phase_saving=True),
+    'SATanas2': dpll(SATanas2.solve, 3, 'lookahead'),
+    'paia_sat': paia_sat,
+    'cdcl': cdcl,
+}
+
+
+def worker(name, engine, heuristic, results):
+    """Solves the formula of the shared memory block called name and puts (engine, sat, model) in results"""
+    sys.stdout = open(os.devnull, 'w')  # Only the coordinator writes the answer
+    shm = shared_memory.SharedMemory(name)
+    formula = shared_formula(shm)
+    try:
+        sat, model, _ = ENGINES[engine](formula, heuristic)
+    except Exception as e:  # A failing engine does not stop the race
+        results.put((engine, None, repr(e)))
+    else:
+        results.put((engine, sat, model))
+    finally:
+        formula.lits.release()
+        formula.offsets.release()
+        shm.close()
+
+
+def race(formula, engines=tuple(ENGINES), heuristic='vsids'):
+    """Runs the engines in parallel, returns (engine, sat, model) of the first valid answer or None"""
+    shm = share(formula)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=worker, args=(shm.name, engine, heuristic, results), daemon=True)
+               for engine in engines]
+    try:
+        for w in workers:
+            w.start()
+        pending = len(workers)
+        while pending:
+            try:
+                engine, sat, model = results.get(timeout=0.1)
+            except queue.Empty:
+                if not any(w.is_alive() for w in workers) and results.empty():  # Crashed without answer
+                    return None
+                continue
+            pending -= 1
+            if sat is None or (sat and not check_model(formula, model)):  # Failed or wrong model
+                continue
+            return engine, sat, model
+        return None
+    finally:
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+        for w in workers:
+            w.join()
+        shm.close()
+        shm.unlink()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Races several solvers on an instance')
+    parser.add_argument('instance', help='CNF instance in DIMACS format (.gz, .xz or .bz2 too, - for stdin)')
+    parser.add_argument('heuristic', nargs='?', choices=sorted(HEURISTICS), default='vsids',
+                        help='decision heuristic of musk and cdcl (default: vsids)')
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help='comma separated engines to race (default: %(default)s)')
+    parser.add_argument('--preprocess', action='store_true', help='simplify the formula first (see sat.preprocess)')
+    parser.add_argument('--stats', action='store_true', help='print the time of each phase as comment lines')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='profile the coordinator process into FILE (cProfile, or sampled collapsed stacks '
+                             'for a .folded FILE)')
+    args = parser.parse_args(argv)
+    if args.profile:
+        profile_until_exit(args.profile)
+    args.engines = args.engines.split(',')
+    for engine in args.engines:
+        if engine not in ENGINES:
+            parser.error('unknown engine %s (choose from %s)' % (engine, ', '.join(ENGINES)))
+    return args
+
+
+def main():
+    args = parse_args()
+    stats = Stats()
+    with stats.timer('parse'):
+        formula = read_dimacs(args.instance)
+    preprocessor = Preprocessor(formula.num_vars, formula) if args.preprocess else None
+    if preprocessor:
+        with stats.timer('preprocess'):
+            formula = Formula.from_clauses(formula.num_vars, preprocessor.simplify())
+    with stats.timer('search'):  # The counters of the engines stay in their worker processes
+        winner = race(formula, args.engines, args.heuristic)
+    if winner is None:
+        print('s UNKNOWN')
+    else:
+        report(winner, preprocessor)
+    if args.stats:
+        stats.report()
+
+
+def report(winner, preprocessor):
+    """Prints the answer of the winner (engine, sat, model), its model extended by the preprocessor"""
+    engine, sat, model = winner
+    if sat and preprocessor:
+        model = preprocessor.extend(model)
+    print('c solved by ' + engine)
+    if sat:
+        print('s SATISFIABLE' + '\n' + 'v ' + ' '.join(str(x) for x in model) + ' 0')
+    else:
+        print('s UNSATISFIABLE')
+
+
+if __name__ == '__main__':
+    main()
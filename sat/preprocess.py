@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+'''
+    SatELite style preprocessing of a CNF formula
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    Runs before any engine: drops tautologies and duplicate clauses,
+    propagates the units, removes subsumed clauses and strengthens clauses
+    by self-subsuming resolution (both through occurrence lists and clause
+    signatures), and eliminates variables by clause distribution when that
+    does not increase the number of clauses. The binary clauses form an
+    implication graph: the literals of each strongly connected component
+    are equivalent and are replaced by one representative, and the roots
+    of the graph are probed to find failed literals and to learn
+    hyper-binary resolvents. Every clause removed by an elimination or a
+    substitution is kept on a reconstruction stack, so a model of the
+    simplified formula can be extended to a model of the original one.
+    Use: python sat/preprocess.py <cnf_instance> (writes the simplified formula)
+'''
+
+import os
+import sys
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import read_dimacs
+
+
+def strongly_connected_components(graph, nodes):
+    """Tarjan's algorithm without recursion over the successor lists of graph (indexed by node), returns the
+    components of the nodes reachable from nodes in reverse topological order"""
+    index, low, on_stack = {}, {}, set()
+    stack, components = [], []
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, 0)]
+        while work:
+            node, i = work[-1]
+            successors = graph[node]
+            if i < len(successors):
+                work[-1] = (node, i + 1)
+                successor = successors[i]
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, 0))
+                elif successor in on_stack and index[successor] < low[node]:
+                    low[node] = index[successor]
+                continue
+            work.pop()
+            if work and low[node] < low[work[-1][0]]:
+                low[work[-1][0]] = low[node]
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def signature(clause):
+    """64 bit mask of the variables of a clause, a subset test that never gives false negatives"""
+    sig = 0
+    for literal in clause:
+        sig |= 1 << (abs(literal) & 63)
+    return sig
+
+
+class Preprocessor():
+    """Simplifies a clause set and keeps what is needed to rebuild the models"""
+
+    def __init__(self, num_vars, clauses, frozen=(), occurrence_limit=10, resolvent_limit=20,
+                 subsumption_limit=1000, probe_limit=1000000):
+        """
+        Initialization
+        clauses: Live clauses as sets of literals, None once removed
+        occurs: Indices of the live clauses where each literal appears, indexed by literal
+        value: Truth value of the literals fixed by units, indexed by literal
+        queue: Clauses to subsume with, the new and changed ones
+        forward: Clauses of the queue added or shortened after the input, checked by forward subsumption too
+        stack: (pivot literal, clause) pairs removed by variable elimination, in elimination order
+        frozen: Variables that must not be eliminated (for instance, assumptions)
+        occurrence_limit: Variables with more occurrences than this in both signs are not eliminated
+        resolvent_limit: Eliminations producing longer resolvents are not done
+        subsumption_limit: Clauses whose best variable occurs more than this are not used to subsume
+        probe_limit: Clause visits allowed to the probing of the roots of the binary implication graph
+        """
+        self.num_vars = num_vars
+        self.clauses = []
+        self.sigs = []
+        self.occurs = [set() for _ in range(2 * num_vars + 1)]
+        self.value = [None] * (2 * num_vars + 1)
+        self.fixed = []
+        self.units = []
+        self.queue = set()
+        self.forward = set()
+        self.stack = []
+        self.frozen = set(frozen)
+        self.eliminated = set()
+        self.occurrence_limit = occurrence_limit
+        self.resolvent_limit = resolvent_limit
+        self.subsumption_limit = subsumption_limit
+        self.probe_limit = probe_limit
+        self.ok = True
+        self.tautologies = 0
+        self.duplicates = 0
+        self.subsumed = 0
+        self.strengthened = 0
+        self.substituted = 0
+        self.failed = 0
+        self.hyper_binary = 0
+        seen = set()
+        for clause in clauses:
+            clause = set(clause)
+            if any(-l in clause for l in clause):
+                self.tautologies += 1
+                continue
+            key = frozenset(clause)
+            if key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+            self.add(clause, forward=False)
+
+    def add(self, clause, forward=True):
+        """Adds a set of literals, units are fixed instead of stored. The input clauses need no forward
+        subsumption: backward subsumption already compares each pair of them"""
+        if not clause:
+            self.ok = False
+            return
+        if len(clause) == 1:
+            self.units.extend(clause)
+            return
+        i = len(self.clauses)
+        self.clauses.append(clause)
+        self.sigs.append(signature(clause))
+        for literal in clause:
+            self.occurs[literal].add(i)
+        self.queue.add(i)
+        if forward:
+            self.forward.add(i)
+
+    def remove(self, i):
+        for literal in self.clauses[i]:
+            self.occurs[literal].discard(i)
+        self.clauses[i] = None
+        self.queue.discard(i)
+        self.forward.discard(i)
+
+    def strengthen(self, i, literal):
+        """Removes a literal from clause i"""
+        clause = self.clauses[i]
+        clause.discard(literal)
+        self.occurs[literal].discard(i)
+        if len(clause) == 1:
+            self.units.extend(clause)
+            self.remove(i)
+        else:
+            self.sigs[i] = signature(clause)
+            self.queue.add(i)
+            self.forward.add(i)
+
+    def propagate(self):
+        """Fixes the pending units, returns False on a contradiction"""
+        value = self.value
+        while self.units and self.ok:
+            literal = self.units.pop()
+            if value[literal] is not None:
+                self.ok = value[literal]
+                continue
+            value[literal], value[-literal] = True, False
+            self.fixed.append(literal)
+            for i in list(self.occurs[literal]):
+                self.remove(i)
+            for i in list(self.occurs[-literal]):
+                self.strengthen(i, -literal)
+        return self.ok
+
+    def subsumed_by(self, i):
+        """Index of a live clause that subsumes clause i (forward subsumption), None if there is none"""
+        clause, sig, clauses, sigs, occurs = self.clauses[i], self.sigs[i], self.clauses, self.sigs, self.occurs
+        for literal in clause:  # A subsuming clause contains at least one literal of clause i
+            if len(occurs[literal]) > self.subsumption_limit:
+                continue
+            for j in occurs[literal]:
+                if j != i and len(clauses[j]) <= len(clause) and not sigs[j] & ~sig and clauses[j] <= clause:
+                    return j
+        return None
+
+    def subsume(self, i):
+        """Forward and backward subsumption and self-subsuming strengthening with clause i"""
+        if i in self.forward:
+            self.forward.discard(i)
+            if self.subsumed_by(i) is not None:
+                self.remove(i)
+                self.subsumed += 1
+                return
+        clause, sig, clauses, sigs, occurs = self.clauses[i], self.sigs[i], self.clauses, self.sigs, self.occurs
+        first, second = sorted(clause, key=lambda l: len(occurs[l]) + len(occurs[-l]))[:2]
+        if len(occurs[first]) + len(occurs[-first]) > self.subsumption_limit:
+            return
+        # Every candidate contains the two rarest variables of the clause, in either sign
+        candidates = set().union(*(occurs[a] & occurs[b] for a in (first, -first) for b in (second, -second)))
+        for j in candidates:
+            other = clauses[j]
+            if j == i or other is None or len(other) < len(clause) or sig & ~sigs[j]:
+                continue
+            missing = clause - other
+            if not missing:
+                self.remove(j)
+                self.subsumed += 1
+            elif len(missing) == 1:
+                literal = next(iter(missing))
+                if -literal in other:  # Resolving on literal gives other without -literal
+                    self.strengthen(j, -literal)
+                    self.strengthened += 1
+
+    def simplify_clauses(self):
+        """Subsumes and strengthens until the queue of new or changed clauses is empty"""
+        while self.propagate() and self.queue:
+            i = self.queue.pop()
+            if self.clauses[i] is not None:
+                self.subsume(i)
+        return self.ok
+
+    def resolvents(self, var):
+        """Non tautological resolvents on var, or None when eliminating var would grow the formula"""
+        pos = [self.clauses[i] for i in self.occurs[var]]
+        neg = [self.clauses[i] for i in self.occurs[-var]]
+        budget = len(pos) + len(neg)
+        result = []
+        for p in pos:
+            for n in neg:
+                resolvent = (p | n) - {var, -var}
+                if any(-l in resolvent for l in p if l != var):
+                    continue
+                if len(resolvent) > self.resolvent_limit or len(result) == budget:
+                    return None
+                result.append(resolvent)
+        return result
+
+    def eliminate(self, var):
+        """Replaces the clauses of var by their resolvents if that does not add clauses"""
+        pos, neg = self.occurs[var], self.occurs[-var]
+        if min(len(pos), len(neg)) > self.occurrence_limit:
+            return False
+        resolvents = self.resolvents(var)
+        if resolvents is None:
+            return False
+        for literal in (var, -var):
+            for i in list(self.occurs[literal]):
+                self.stack.append((literal, sorted(self.clauses[i], key=abs)))
+                self.remove(i)
+        self.eliminated.add(var)
+        for resolvent in resolvents:
+            self.add(resolvent)
+        return True
+
+    def eliminate_vars(self):
+        """Bounded variable elimination, cheapest variables first, until nothing more is eliminated"""
+        occurs, value = self.occurs, self.value
+        progress = True
+        while progress and self.ok:
+            progress = False
+            candidates = [v for v in range(1, self.num_vars + 1)
+                          if value[v] is None and v not in self.frozen and v not in self.eliminated
+                          and (occurs[v] or occurs[-v])]
+            candidates.sort(key=lambda v: len(occurs[v]) * len(occurs[-v]))
+            for var in candidates:
+                if value[var] is None and self.eliminate(var):
+                    progress = True
+                    if not self.simplify_clauses():
+                        break
+        return self.ok
+
+    def implication_graph(self):
+        """Successors of every literal in the binary implication graph: a clause {a, b} gives -a -> b, -b -> a"""
+        graph = [[] for _ in range(2 * self.num_vars + 1)]
+        for clause in self.clauses:
+            if clause is not None and len(clause) == 2:
+                a, b = clause
+                graph[-a].append(b)
+                graph[-b].append(a)
+        return graph
+
+    def substitute_equivalences(self):
+        """Replaces every literal of a strongly connected component of the implication graph by the
+        representative of the component (a frozen variable if there is one, else the lowest), returns
+        the number of substituted variables"""
+        graph = self.implication_graph()
+        nodes = [l for l in range(-self.num_vars, self.num_vars + 1) if graph[l]]
+        replace, done = {}, set()
+        for component in strongly_connected_components(graph, nodes):
+            if len(component) == 1 or abs(component[0]) in done:  # Trivial, or the mirror of a done one
+                continue
+            done.update(abs(l) for l in component)
+            members = set(component)
+            if any(-l in members for l in members):  # A literal equivalent to its negation
+                self.ok = False
+                return 0
+            representative = min(component, key=lambda l: (abs(l) not in self.frozen, abs(l)))
+            for literal in component:
+                if literal != representative and abs(literal) not in self.frozen:
+                    replace[abs(literal)] = representative if literal > 0 else -representative
+        for var, literal in replace.items():
+            # var takes the value of literal: the clauses var <-> literal rebuild it
+            self.stack.append((var, [var, -literal]))
+            self.stack.append((-var, [-var, literal]))
+            self.eliminated.add(var)
+            for old, new in ((var, literal), (-var, -literal)):
+                for i in list(self.occurs[old]):
+                    clause = self.clauses[i] - {old}
+                    self.remove(i)
+                    if -new in clause:
+                        self.tautologies += 1
+                    else:
+                        clause.add(new)
+                        self.add(clause)
+        # Pending units of substituted variables, from the input or from the clauses rewritten above
+        self.units = [l if abs(l) not in replace else (replace[l] if l > 0 else -replace[-l]) for l in self.units]
+        self.substituted += len(replace)
+        return len(replace)
+
+    def probe(self, root, budget):
+        """Propagates root over the live clauses without fixing it. Returns (None, visits) when it leads to
+        a conflict, else (literals implied through clauses of three or more literals, visits)"""
+        clauses, occurs = self.clauses, self.occurs
+        true = {root}
+        pending = [root]
+        implied = []
+        visits = 0
+        while pending:
+            literal = pending.pop()
+            for i in occurs[-literal]:
+                visits += 1
+                unit = None
+                for q in clauses[i]:
+                    if q in true:
+                        break
+                    if -q not in true:
+                        if unit is not None:
+                            break
+                        unit = q
+                else:
+                    if unit is None:
+                        return None, visits
+                    true.add(unit)
+                    pending.append(unit)
+                    if len(clauses[i]) > 2:
+                        implied.append(unit)
+            if visits > budget:
+                break
+        return implied, visits
+
+    def probe_roots(self):
+        """Probes the roots of the implication graph: a failed root gives a unit, and the literals a root
+        implies through longer clauses give the hyper-binary resolvents -root v literal"""
+        graph = self.implication_graph()
+        targets = {l for successors in graph for l in successors}
+        budget = self.probe_limit
+        for root in range(-self.num_vars, self.num_vars + 1):
+            if not graph[root] or root in targets or self.value[root] is not None or budget <= 0:
+                continue
+            implied, visits = self.probe(root, budget)
+            budget -= visits
+            if implied is None:
+                self.failed += 1
+                self.units.append(-root)
+                if not self.propagate():
+                    return False
+                continue
+            for literal in implied:
+                if self.value[literal] is None and not self.occurs[-root] & self.occurs[literal]:
+                    self.hyper_binary += 1
+                    self.add({-root, literal})
+        return self.ok
+
+    def probe_binaries(self):
+        """Equivalent literal substitution, then failed literals and hyper-binary resolvents, then the
+        substitution of the equivalences these resolvents reveal"""
+        self.substitute_equivalences()
+        if not self.simplify_clauses() or not self.probe_roots() or not self.simplify_clauses():
+            return False
+        if self.hyper_binary and self.substitute_equivalences():
+            return self.simplify_clauses()
+        return self.ok
+
+    def simplify(self):
+        """Runs the whole pipeline, returns the simplified clauses (the fixed units included)"""
+        if self.simplify_clauses() and self.probe_binaries():
+            self.eliminate_vars()
+        if not self.ok:
+            return [[]]
+        return [[l] for l in self.fixed] + [sorted(c, key=abs) for c in self.clauses if c is not None]
+
+    def extend(self, model):
+        """Extends a model of the simplified formula (literals of vars 1..n) to the original formula"""
+        model = list(model)
+        for pivot, clause in reversed(self.stack):
+            if not any(model[abs(l) - 1] == l for l in clause):
+                model[abs(pivot) - 1] = pivot
+        return model
+
+
+def main():
+    formula = read_dimacs(sys.argv[1])
+    preprocessor = Preprocessor(formula.num_vars, formula)
+    clauses = preprocessor.simplify()
+    print('c %d tautologies, %d duplicates, %d subsumed, %d strengthened, %d vars eliminated' % (
+        preprocessor.tautologies, preprocessor.duplicates, preprocessor.subsumed, preprocessor.strengthened,
+        len(preprocessor.eliminated)))
+    print('c %d equivalent vars substituted, %d failed literals, %d hyper-binary resolvents' % (
+        preprocessor.substituted, preprocessor.failed, preprocessor.hyper_binary))
+    print('p cnf %d %d' % (formula.num_vars, len(clauses)))
+    print('\n'.join(' '.join(map(str, c + [0])) for c in clauses))
+
+
+if __name__ == '__main__':
+    main()
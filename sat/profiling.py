@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+'''
+    Profiling of the solvers of the package
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    A run is profiled with cProfile (the profile is saved as a pstats
+    .prof file) or with a sampling profiler that records the Python stack
+    on every SIGPROF tick (saved as collapsed stacks, a .folded file with
+    one 'frame;frame;frame count' line per distinct stack, the input of
+    flamegraph.pl and speedscope). The file extension selects the profiler.
+    merge() sums every profile of a folder into one collapsed stack file
+    and ranks the functions by their total time over the whole folder.
+    Use: python sat/profiling.py run -o <file.prof|file.folded> <script> [args...]
+         python sat/profiling.py merge <folder> [-o merged.folded] [--top 20]
+'''
+
+import argparse
+import atexit
+import cProfile
+import glob
+import os
+import pstats
+import runpy
+import signal
+import sys
+from collections import Counter
+
+FOLDED = '.folded'
+MERGED = 'merged' + FOLDED  # Output of merge(), never read back as a profile
+INTERVAL = 0.001  # Seconds of CPU time between samples
+
+
+def label(code):
+    """Frame name of a code object, as 'file.py:Class.function'"""
+    return '%s:%s' % (os.path.basename(code.co_filename), getattr(code, 'co_qualname', code.co_name))
+
+
+class Sampler():
+    """Statistical profiler that counts the stacks seen on SIGPROF ticks"""
+
+    def __init__(self, interval=INTERVAL):
+        """
+        Initialization
+        interval: CPU seconds between samples
+        stacks: Number of samples of each stack, as 'outermost;...;innermost' frame names
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.labels = {}
+
+    def sample(self, signum, frame):
+        labels, stack = self.labels, []
+        while frame is not None:
+            code = frame.f_code
+            name = labels.get(code)
+            if name is None:
+                name = labels[code] = label(code)
+            stack.append(name)
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(stack))] += 1
+
+    def enable(self):
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def disable(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def dump_stats(self, path):
+        write_folded(path, self.stacks)
+
+
+class Profiler():
+    """cProfile or the Sampler, depending on the extension of the output file"""
+
+    def __init__(self, path, interval=INTERVAL):
+        self.path = path
+        self.profiler = Sampler(interval) if path.endswith(FOLDED) else cProfile.Profile()
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.profiler.enable()
+
+    def stop(self):
+        """Stops and saves the profile (once)"""
+        if self.running:
+            self.running = False
+            self.profiler.disable()
+            self.profiler.dump_stats(self.path)
+
+    def discard(self):
+        """Stops without saving, in a forked child that must not overwrite the profile of its parent"""
+        if self.running:
+            self.running = False
+            self.profiler.disable()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def profile_until_exit(path):
+    """Profiles the rest of the process, the profile is saved at exit or when the CPU limit is reached"""
+    profiler = Profiler(path)
+    atexit.register(profiler.stop)
+    os.register_at_fork(after_in_child=profiler.discard)  # Workers (see sat.portfolio) run unprofiled
+    if hasattr(signal, 'SIGXCPU'):
+        signal.signal(signal.SIGXCPU, cpu_limit)
+    profiler.start()
+    return profiler
+
+
+def cpu_limit(signum, frame):
+    """The soft RLIMIT_CPU was reached: exit cleanly to save the profile before the hard limit"""
+    raise SystemExit('CPU time limit reached')
+
+
+def run_script(path, argv, output):
+    """Runs a Python script as __main__ with argv under a profiler writing to output"""
+    sys.argv = [path] + list(argv)
+    sys.path[0] = os.path.dirname(os.path.abspath(path))
+    profile_until_exit(output)
+    runpy.run_path(path, run_name='__main__')
+
+
+def write_folded(path, stacks):
+    with open(path, 'w') as f:
+        for stack, count in sorted(stacks.items()):
+            f.write('%s %d\n' % (stack, count))
+
+
+def read_folded(path):
+    stacks = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack:
+                stacks[stack] += int(count)
+    return stacks
+
+
+def function_label(function):
+    filename, _, name = function
+    return '%s:%s' % (os.path.basename(filename), name)
+
+
+def pstats_stacks(stats, unit=1e-6):
+    """Collapsed 'caller;callee' stacks of a pstats.Stats, weighted by the callee own time in units
+    (cProfile only keeps the edges of the call graph, not whole stacks)"""
+    stacks = Counter()
+    for function, (_, _, own, _, callers) in stats.stats.items():
+        callee = function_label(function)
+        edges = [(function_label(caller) + ';' + callee, timing[2]) for caller, timing in callers.items()]
+        for stack, seconds in edges or [(callee, own)]:
+            weight = int(round(seconds / unit))
+            if weight:
+                stacks[stack] += weight
+    return stacks
+
+
+def ranked(stacks, top=None):
+    """[(function, self count, total count)] of collapsed stacks, by decreasing self count"""
+    own, total = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return [(name, count, total[name]) for name, count in own.most_common(top)]
+
+
+def folded_profiles(folder):
+    return [path for path in sorted(glob.glob(os.path.join(folder, '*' + FOLDED)))
+            if os.path.basename(path) != MERGED]
+
+
+def merge(folder, output=None):
+    """Collapsed stacks of every profile of a folder (.folded samples and .prof microseconds are kept apart
+    by a first 'samples' or 'cprofile' frame), written to output when given"""
+    stacks = Counter()
+    for path in folded_profiles(folder):
+        for stack, count in read_folded(path).items():
+            stacks['samples;' + stack] += count
+    for path in sorted(glob.glob(os.path.join(folder, '*.prof'))):
+        for stack, count in pstats_stacks(pstats.Stats(path)).items():
+            stacks['cprofile;' + stack] += count
+    if output is not None:
+        write_folded(output, stacks)
+    return stacks
+
+
+def ranking(folder, top=20):
+    """Report lines of the functions with the most own time over every profile of a folder"""
+    lines = []
+    profiles = sorted(glob.glob(os.path.join(folder, '*.prof')))
+    if profiles:
+        stats = pstats.Stats(*profiles)
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:top]
+        lines.append('cProfile totals of %d runs (seconds): own, cumulative, calls' % len(profiles))
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows:
+            lines.append('%10.3f %10.3f %10d  %s:%d(%s)' % (own, cumulative, calls, os.path.basename(filename),
+                                                             line, name))
+    samples = Counter()
+    for path in folded_profiles(folder):
+        samples.update(read_folded(path))
+    if samples:
+        lines.append('sampled totals (samples): own, total')
+        for name, own, total in ranked(samples, top):
+            lines.append('%10d %10d  %s' % (own, total, name))
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Profiles the solvers of the package')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run a script under a profiler')
+    run.add_argument('-o', '--output', required=True, help='profile to write, a %s file selects sampling' % FOLDED)
+    run.add_argument('script')
+    run.add_argument('args', nargs=argparse.REMAINDER)
+    merged = commands.add_parser('merge', help='merge the profiles of a folder and rank the functions')
+    merged.add_argument('folder')
+    merged.add_argument('-o', '--output', help='collapsed stack file (default: <folder>/%s)' % MERGED)
+    merged.add_argument('--top', type=int, default=20, help='functions ranked (default: %(default)s)')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.command == 'run':
+        run_script(args.script, args.args, args.output)
+        return
+    output = args.output or os.path.join(args.folder, MERGED)
+    merge(args.folder, output)
+    print('\n'.join(ranking(args.folder, args.top)))
+    print('collapsed stacks in %s' % output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+'''
+    Propagation engine based on two watched literals
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    Every clause watches its first two literals. Assigning a literal only
+    visits the clauses watching its negation, and since watches never need
+    to be restored, backtracking just pops the trail. Clauses are stored in
+    a ClauseArena and referred to by their arena reference.
+'''
+
+from sat.arena import ClauseArena
+
+
+def grow_by_literal(values, num_vars, extra, fill):
+    """Grows a list indexed by literal (negative literals from the end) by extra variables"""
+    return values[:num_vars + 1] + [fill() for _ in range(2 * extra)] + values[num_vars + 1:]
+
+
+class Propagator():
+    """Assignment trail plus two-watched-literal unit propagation"""
+
+    def __init__(self, num_vars, clauses=()):
+        """
+        Initialization
+        num_vars: Number of variables
+        value: Truth value per literal (None, True or False), indexed by literal
+        level: Decision level per variable
+        reason: Reference of the clause that implied each variable (None for decisions)
+        trail: Assigned literals in assignment order
+        trail_lim: Trail size at the start of every decision level
+        clauses: ClauseArena holding the clauses of two or more literals
+        watches: References of the clauses watching each literal
+        ok: False once the formula is known to be unsatisfiable
+        on_backtrack: Optional callback receiving the literals undone by each backtrack
+        phase: Last polarity of each variable when phase saving is enabled, otherwise None
+        """
+        self.num_vars = num_vars
+        self.value = [None] * (2 * num_vars + 1)
+        self.level = [0] * (num_vars + 1)
+        self.reason = [None] * (num_vars + 1)
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.clauses = ClauseArena()
+        self.watches = [[] for _ in range(2 * num_vars + 1)]
+        self.ok = True
+        self.on_backtrack = None
+        self.phase = None
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.restarts = 0
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        """Adds a clause at decision level 0, returns False if it makes the formula UNSAT"""
+        value = self.value
+        lits = set(clause)
+        if any(-l in lits or value[l] is True for l in lits):  # Tautology or satisfied
+            return True
+        clause = [l for l in dict.fromkeys(clause) if value[l] is None]
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0])
+        else:
+            self.attach(clause)
+        return self.ok
+
+    def attach(self, clause):
+        """Stores a clause of two or more literals and watches its first two"""
+        ref = self.clauses.add(clause)
+        self.watches[clause[0]].append(ref)
+        self.watches[clause[1]].append(ref)
+        return ref
+
+    def detach(self, ref):
+        """Removes a clause from the watches and flags it as removed in the arena"""
+        lits = self.clauses.lits
+        for literal in (lits[ref], lits[ref + 1]):
+            self.watches[literal].remove(ref)
+        self.clauses.remove(ref)
+
+    def compact(self):
+        """Compacts the arena and renumbers the watches and reasons, returns the reference remap"""
+        remap = self.clauses.compact()
+        for watchers in self.watches:
+            watchers[:] = [remap[ref] for ref in watchers]
+        reason = self.reason
+        for literal in self.trail:
+            var = abs(literal)
+            if reason[var] is not None:
+                reason[var] = remap[reason[var]]
+        return remap
+
+    def resize(self, num_vars):
+        """Makes room for the variables up to num_vars"""
+        if num_vars <= self.num_vars:
+            return
+        old, extra = self.num_vars, num_vars - self.num_vars
+        self.value = grow_by_literal(self.value, old, extra, lambda: None)
+        self.watches = grow_by_literal(self.watches, old, extra, list)
+        self.level += [0] * extra
+        self.reason += [None] * extra
+        if self.phase is not None:
+            self.phase += [None] * extra
+        self.num_vars = num_vars
+
+    def decision_level(self):
+        return len(self.trail_lim)
+
+    def save_phases(self):
+        """Enables phase saving: backtracks remember the polarity of the undone variables"""
+        self.phase = [None] * (self.num_vars + 1)
+
+    def polarity(self, var, positive=True):
+        """Literal of var to branch on: its saved phase if there is one, else the default polarity"""
+        if self.phase is not None and self.phase[var] is not None:
+            positive = self.phase[var]
+        return var if positive else -var
+
+    def lbd(self, clause):
+        """Number of distinct decision levels among the literals of a clause"""
+        level = self.level
+        return len({level[abs(l)] for l in clause})
+
+    def restart(self):
+        self.restarts += 1
+        self.backtrack(0)
+
+    def decide(self, literal):
+        """Opens a new decision level and assigns the literal"""
+        self.trail_lim.append(len(self.trail))
+        self.decisions += 1
+        self.assign(literal)
+
+    def assign(self, literal, reason=None):
+        var = abs(literal)
+        self.value[literal] = True
+        self.value[-literal] = False
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Propagates the pending trail, returns the reference of a conflicting clause or None"""
+        value, watches, trail, lits = self.value, self.watches, self.trail, self.clauses.lits
+        while self.qhead < len(trail):
+            false_lit = -trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            watchers = watches[false_lit]
+            n = len(watchers)
+            i = j = 0
+            while i < n:
+                ref = watchers[i]
+                i += 1
+                first = lits[ref]
+                if first == false_lit:  # Keep the false watch at position 1
+                    first = lits[ref + 1]
+                    lits[ref] = first
+                    lits[ref + 1] = false_lit
+                if value[first] is True:  # Clause already satisfied
+                    watchers[j] = ref
+                    j += 1
+                    continue
+                for k in range(ref + 2, ref + lits[ref - 1]):  # Look for a new watch
+                    literal = lits[k]
+                    if value[literal] is not False:
+                        lits[ref + 1] = literal
+                        lits[k] = false_lit
+                        watches[literal].append(ref)
+                        break
+                else:
+                    watchers[j] = ref
+                    j += 1
+                    if value[first] is False:  # Conflict
+                        watchers[j:] = watchers[i:n]
+                        self.qhead = len(trail)
+                        self.conflicts += 1
+                        return ref
+                    self.assign(first, ref)  # Unit clause
+            del watchers[j:]
+        return None
+
+    def backtrack(self, level):
+        """Undoes every assignment above the given decision level"""
+        if len(self.trail_lim) <= level:
+            return
+        value, reason = self.value, self.reason
+        start = self.trail_lim[level]
+        undone = self.trail[start:]
+        for literal in undone:
+            value[literal] = value[-literal] = None
+            reason[abs(literal)] = None
+        if self.phase is not None:
+            phase = self.phase
+            for literal in undone:
+                phase[abs(literal)] = literal > 0
+        if self.on_backtrack is not None:
+            self.on_backtrack(undone)
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def unresolved(self):
+        """Yields the unassigned literals of every clause not yet satisfied"""
+        value = self.value
+        for clause in self.clauses:
+            free = []
+            for l in clause:
+                if value[l] is True:
+                    break
+                if value[l] is None:
+                    free.append(l)
+            else:
+                if free:
+                    yield free
+
+    def model(self):
+        """Returns the assignment as a sorted list of literals, unassigned vars positive"""
+        value = self.value
+        return [v if value[v] is not False else -v for v in range(1, self.num_vars + 1)]
+
+
+class PureLiteralPropagator(Propagator):
+    """Propagator that also assigns the literals that become pure in the clauses not yet satisfied
+
+    Each clause keeps its number of true literals and each literal its
+    number of occurrences in unsatisfied clauses, both updated on assign
+    and backtrack through full occurrence lists. A literal whose negation
+    no longer occurs is assigned without a reason once propagation stops.
+    Pure literals are only safe without learnt clauses: use it for DPLL.
+    """
+
+    def __init__(self, num_vars, clauses=()):
+        """
+        Initialization
+        occurs: Indices (in members) of the clauses containing each literal, indexed by literal
+        members: Literals of every clause, in attach order
+        refs: Arena reference of every clause of members
+        count: Occurrences of each literal in unsatisfied clauses, indexed by literal
+        true_count: Number of true literals of each clause, in attach order
+        candidates: Literals that may have become pure since the last check
+        """
+        self.occurs = [[] for _ in range(2 * num_vars + 1)]
+        self.members = []
+        self.refs = []
+        self.count = [0] * (2 * num_vars + 1)
+        self.true_count = []
+        self.candidates = []
+        self.pure_literals = 0
+        super().__init__(num_vars)
+        for clause in clauses:
+            self.add_clause(clause)
+        count = self.count
+        self.candidates = [l for v in range(1, num_vars + 1) for l in (v, -v) if count[l] and not count[-l]]
+
+    def attach(self, clause):
+        ref = super().attach(clause)
+        value, count, occurs = self.value, self.count, self.occurs
+        i = len(self.members)
+        clause = tuple(clause)
+        self.members.append(clause)
+        self.refs.append(ref)
+        self.true_count.append(sum(1 for l in clause if value[l] is True))
+        for literal in clause:
+            occurs[literal].append(i)
+            if not self.true_count[i]:
+                count[literal] += 1
+        return ref
+
+    def resize(self, num_vars):
+        old = self.num_vars
+        if num_vars > old:
+            self.occurs = grow_by_literal(self.occurs, old, num_vars - old, list)
+            self.count = grow_by_literal(self.count, old, num_vars - old, int)
+        super().resize(num_vars)
+
+    def detach(self, ref):
+        i = self.refs.index(ref)
+        for literal in self.members[i]:
+            self.occurs[literal].remove(i)
+            if not self.true_count[i]:
+                self.count[literal] -= 1
+        self.members[i] = ()
+        super().detach(ref)
+
+    def compact(self):
+        remap = super().compact()
+        self.refs = [remap.get(ref, -1) for ref in self.refs]
+        return remap
+
+    def assign(self, literal, reason=None):
+        Propagator.assign(self, literal, reason)
+        members, count, true_count, candidates = self.members, self.count, self.true_count, self.candidates
+        for i in self.occurs[literal]:
+            true_count[i] += 1
+            if true_count[i] == 1:  # Newly satisfied
+                for q in members[i]:
+                    count[q] -= 1
+                    if not count[q] and count[-q]:
+                        candidates.append(-q)
+
+    def backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        members, count, true_count, occurs = self.members, self.count, self.true_count, self.occurs
+        for literal in reversed(self.trail[self.trail_lim[level]:]):
+            for i in occurs[literal]:
+                true_count[i] -= 1
+                if not true_count[i]:
+                    for q in members[i]:
+                        count[q] += 1
+        self.candidates.clear()
+        super().backtrack(level)
+
+    def propagate(self):
+        """Unit propagation, then assigns the pure literals and propagates again until neither applies"""
+        value, count, candidates = self.value, self.count, self.candidates
+        while True:
+            conflict = super().propagate()
+            if conflict is not None or not candidates:
+                return conflict
+            while candidates:
+                literal = candidates.pop()
+                if value[literal] is None and count[literal] and not count[-literal]:
+                    self.pure_literals += 1
+                    self.assign(literal)
@@ -0,0 +1,137 @@
+'''
+    Restart policies for the search engines
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    A policy is told about every conflict, with the LBD (number of distinct
+    decision levels) of the conflict or learnt clause, and answers whether
+    the search should go back to decision level 0 now. Luby and geometric
+    policies restart after a growing number of conflicts, the glucose one
+    when the recent LBDs are worse than the average of the whole search.
+'''
+
+from collections import deque
+
+
+def luby(y, x):
+    """Element x (from 0) of the Luby sequence with base y: 1, 1, y, 1, 1, y, y^2, ..."""
+    size, seq = 1, 0
+    while size < x + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != x:
+        size = (size - 1) >> 1
+        seq -= 1
+        x = x % size
+    return y ** seq
+
+
+class Restart():
+    """Restarts after limit conflicts, subclasses set the next limit"""
+
+    def __init__(self, limit=None):
+        """
+        Initialization
+        limit: Conflicts until the next restart (None: never)
+        conflicts: Conflicts since the last restart
+        restarts: Restarts done so far
+        """
+        self.limit = limit
+        self.conflicts = 0
+        self.restarts = 0
+
+    def conflict(self, lbd):
+        """Called once per conflict, returns True when the search has to restart"""
+        self.conflicts += 1
+        if self.limit is None or self.conflicts < self.limit:
+            return False
+        self.restarted()
+        return True
+
+    def restarted(self):
+        self.conflicts = 0
+        self.restarts += 1
+        self.limit = self.next_limit()
+
+    def next_limit(self):
+        return self.limit
+
+
+class NoRestart(Restart):
+    """Never restarts"""
+
+
+class Luby(Restart):
+    """Restarts after unit times the elements of the Luby sequence"""
+
+    def __init__(self, unit=100):
+        self.unit = unit
+        super().__init__(unit * luby(2, 0))
+
+    def next_limit(self):
+        return self.unit * luby(2, self.restarts)
+
+
+class Geometric(Restart):
+    """Restarts after first conflicts, then after factor times more at each restart"""
+
+    def __init__(self, first=100, factor=1.5):
+        self.factor = factor
+        super().__init__(first)
+
+    def next_limit(self):
+        return self.limit * self.factor
+
+
+class Glucose(Restart):
+    """Restarts when the average LBD of the last window conflicts, times k, exceeds the global one"""
+
+    def __init__(self, window=50, k=0.8, postpone=1.0):
+        """
+        Initialization
+        recent: LBDs of the last window conflicts since the last restart
+        total: Sum of every LBD seen, count: number of them
+        postpone: Growth of the minimum number of conflicts between restarts
+        """
+        super().__init__(window)
+        self.window = window
+        self.k = k
+        self.postpone = postpone
+        self.recent = deque(maxlen=window)
+        self.recent_sum = 0
+        self.total = 0
+        self.count = 0
+
+    def conflict(self, lbd):
+        self.conflicts += 1
+        self.total += lbd
+        self.count += 1
+        if len(self.recent) == self.window:
+            self.recent_sum -= self.recent[0]
+        self.recent.append(lbd)
+        self.recent_sum += lbd
+        if (self.conflicts < self.limit or len(self.recent) < self.window
+                or self.recent_sum * self.k * self.count <= self.total * self.window):
+            return False
+        self.recent.clear()
+        self.recent_sum = 0
+        self.restarted()
+        return True
+
+    def next_limit(self):
+        return self.limit * self.postpone
+
+
+RESTARTS = {
+    'none': NoRestart,
+    'luby': Luby,
+    'geometric': Geometric,
+    'glucose': Glucose,
+}
+
+
+def make_restart(name, learning=True):
+    """Restart policy called name. Without clause learning every restart forgets the refuted
+    subtrees, so the glucose policy postpones its restarts further each time to stay complete"""
+    if name == 'glucose' and not learning:
+        return Glucose(postpone=1.5)
+    return RESTARTS[name]()
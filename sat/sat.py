@@ -25,6 +25,10 @@ import signal
 import time
 from collections import OrderedDict
 
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import read_dimacs
+
 # Classes
 from typing import Optional, List
 
@@ -50,7 +54,7 @@ class CNF():
         self.pure_literal()
 
     def pure_literal(self):
-        return filter(not None, self.unique_sign)
+        return filter(lambda x: x[1] is not None, self.unique_sign)
 
     def unit_propagation(self) -> Interpretation:
         inter_vars = [None] * (self.num_vars + 1)
@@ -81,21 +85,12 @@ class CNF():
             self.clauses[c - 1].remove(literal)
 
     def read_cnf_file(self, cnf_file_name):
-        instance = open(cnf_file_name, "r")
-        for l in instance:
-            if l[0] == "c":
-                continue
-            if l[0] == "p":
-                sl = l.split()
-                self.num_vars = int(sl[2])
-                self.num_clauses = int(sl[3])
-                self.unique_sign = [[v + 1, 0] for v in range(self.num_vars)]
-                self.dictionary = [[] for _ in range(self.num_vars * 2 + 1)]
-                continue
-            if l.strip() == "":
-                continue
-            sl = list(map(int, l.split()))
-            sl.pop()
+        formula = read_dimacs(cnf_file_name)
+        self.num_vars = formula.num_vars
+        self.num_clauses = formula.num_clauses
+        self.unique_sign = [[v + 1, 0] for v in range(self.num_vars)]
+        self.dictionary = [[] for _ in range(self.num_vars * 2 + 1)]
+        for sl in formula:
             if len(sl) == 0:
                 sys.stdout.write('\ns UNSATISFIABLE\n')
                 sys.exit()
@@ -161,9 +156,14 @@ class Interpretation():
                 cost += 1
         return cost
 
+    def assign(self, var, value):
+        self.vars[var] = value
+
+    def unassign(self, var):
+        self.vars[var] = None
+
     def copy(self):
-        new = Interpretation(self.num_vars)
-        new.vars = list(self.vars)
+        new = Interpretation(self.num_vars, list(self.vars), self.cnf)
         return new
 
     def show(self):
@@ -181,6 +181,42 @@ class Interpretation():
         pass
 
 
+class IncrementalInterpretation(Interpretation):
+    """An interpretation that keeps the cost up to date while variables are assigned"""
+
+    def __init__(self, cnf):
+        """
+        Initialization
+        false_lits: Number of falsified literals per clause
+        falsified: Number of clauses with all their literals falsified
+        """
+        super().__init__(cnf.num_vars, [None] * (cnf.num_vars + 1), cnf)
+        self.lengths = [0] + [len(c) for c in cnf.clauses]  # Clauses are numbered from 1 in cnf.dictionary
+        self.false_lits = [0] * len(self.lengths)
+        self.falsified = 0
+
+    def cost(self):
+        return self.falsified
+
+    def assign(self, var, value):
+        self.vars[var] = value
+        lit = var if value == 1 else -var
+        for c in self.cnf.dictionary[-lit]:
+            self.false_lits[c] += 1
+            if self.false_lits[c] == self.lengths[c]:  # All the literals falsified
+                self.falsified += 1
+
+    def unassign(self, var):
+        if self.vars[var] is None:
+            return
+        lit = var if self.vars[var] == 1 else -var
+        self.vars[var] = None
+        for c in self.cnf.dictionary[-lit]:
+            if self.false_lits[c] == self.lengths[c]:
+                self.falsified -= 1
+            self.false_lits[c] -= 1
+
+
 def coroutine(func):
     def start(*args, **kwargs):
         cr = func(*args, **kwargs)
@@ -193,23 +229,15 @@ def coroutine(func):
 class Solver():
     """The class Solver implements an algorithm to solve a given problem instance"""
 
-    def __init__(self, cnf):
+    def __init__(self, cnf, incremental=True):
         """
         Initialization
-        TODO
+        incremental: Track falsified clauses on assignment instead of rescanning the formula
         """
         self.cnf: CNF = cnf
         self.best_sol = None
         self.best_cost = cnf.num_clauses + 1
-
-    def get_last(self, order: List[int]):
-        for i in range(1, order[0]):
-            yield i
-        for p in range(0, len(order) - 1):
-            for i in range(order[p] + 1, order[p + 1]):
-                yield i
-        for i in range(order[-1] + 1, self.cnf.num_vars + 1):
-            yield i
+        self.incremental = incremental
 
     def solve(self):
         """
@@ -217,53 +245,34 @@ class Solver():
         TODO:
         PureLiteralRule
         Selection of variable, check heuristics
-        Not always asign variable to 0?
-        Recursive?
         """
-        curr_sol = self.cnf.unit_propagation()
-<<<<<<< HEAD
-        num_order = len(self.cnf.unit_clauses)  # None - 0 - 1
-        order = self.cnf.unit_clauses # [1, 5, 7, 10] -> [2, 3, 4, 6, 8] [1,2,3,5]
-        for i in range(0,len(order)-1):
-            if order[i+1]-order[i] > 1: 
-                print(order[i]+1)
-        
-=======
-        curr_sol.cnf = self.cnf
-        num_order = 1  # None - 0 - 1
-        order = self.cnf.unit_clauses  # [1, 5, 7, 10] -> [2, 3, 4, 6, 8] [1,2,3,5]
-        if order:
-            order = [0] + order + list(self.get_last(order))
+        if self.incremental:
+            curr_sol = IncrementalInterpretation(self.cnf)
         else:
-            order = list(range(self.cnf.num_vars))
-        print(order)
-        print(self.cnf.clauses)
-        print(order)
->>>>>>> 28bae28fdb88eddd3164f3e36ce233cd443666c9
-        while num_order > 0:
-            var = order[num_order]
+            curr_sol = Interpretation(self.cnf.num_vars, [None] * (self.cnf.num_vars + 1), self.cnf)
+        var = 1
+        while var > 0:
             if curr_sol.vars[var] == 1:  # Backtrack
-                curr_sol.vars[var] = None
-                num_order = num_order - 1
+                curr_sol.unassign(var)
+                var = var - 1
                 continue
             if curr_sol.vars[var] == None:  # Extend left branch
-                curr_sol.vars[var] = 0
+                curr_sol.assign(var, 0)
             else:  # Extend right branch
-                curr_sol.vars[var] = 1
+                curr_sol.unassign(var)
+                curr_sol.assign(var, 1)
             if curr_sol.cost() == 0:  # Undet or SAT
-                if num_order == self.cnf.num_vars:  # SAT
+                if var == self.cnf.num_vars:  # SAT
                     return curr_sol
                 else:  # Undet
-                    num_order = num_order + 1
+                    var = var + 1
         return curr_sol
 
-    # def unit_propagation():
-
 
 # Main
 def main():
-    if len(sys.argv) < 1 or len(sys.argv) > 2:
-        sys.exit("Use: %s <cnf_instance>" % sys.argv[0])
+    if len(sys.argv) < 2 or len(sys.argv) > 3 or (len(sys.argv) == 3 and sys.argv[2] != '--full-cost'):
+        sys.exit("Use: %s <cnf_instance> [--full-cost]" % sys.argv[0])
 
     if os.path.isfile(sys.argv[1]):
         cnf_file_name = os.path.abspath(sys.argv[1])
@@ -274,7 +283,7 @@ def main():
     cnf = CNF(cnf_file_name)
     print(cnf)
     # Create a solver instance with the problem to solve
-    solver = Solver(cnf)
+    solver = Solver(cnf, incremental=len(sys.argv) == 2)
     # Solve the problem and get the best solution found
     best_sol = solver.solve()
     # Show the best solution found
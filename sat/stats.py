@@ -0,0 +1,93 @@
+'''
+    Search statistics of the solvers of the package
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    The engines always keep their decision, propagation, conflict and
+    restart counters. A Stats object adds the time spent in each phase of
+    a run (parse, preprocessing, search) and, once instrument() is called,
+    in propagation and heuristic selection plus the maximum decision
+    level. instrument() replaces the engine and heuristic methods by
+    timed wrappers on those instances only, so a run without --stats
+    executes exactly the same code as before. The report is a list of
+    'c' comment lines.
+'''
+
+import time
+from contextlib import contextmanager
+
+COUNTERS = ('decisions', 'propagations', 'conflicts', 'restarts')
+
+
+class Stats():
+    """Phase timers and the counters of an engine"""
+
+    def __init__(self):
+        """
+        Initialization
+        times: Seconds spent in each phase, in the order the phases were first timed
+        max_depth: Deepest decision level reached by an instrumented engine
+        instrumented: Whether instrument() was called, the report only has a max depth then
+        """
+        self.times = {}
+        self.max_depth = 0
+        self.instrumented = False
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[phase] = self.times.get(phase, 0.0) + time.perf_counter() - start
+
+    def time_method(self, obj, name, phase):
+        """Times every call to the method name of obj (that object only) under phase"""
+        method = getattr(obj, name)
+        times, clock = self.times, time.perf_counter
+        times.setdefault(phase, 0.0)
+
+        def timed(*args):
+            start = clock()
+            try:
+                return method(*args)
+            finally:
+                times[phase] += clock() - start
+        setattr(obj, name, timed)
+
+    def instrument(self, engine, heuristic):
+        """Times the propagation of the engine and the picks of the heuristic, tracks the depth"""
+        self.instrumented = True
+        self.time_method(engine, 'propagate', 'propagation')
+        self.time_method(heuristic, 'pick', 'heuristic')
+        decide, trail_lim = engine.decide, engine.trail_lim
+
+        def deciding(literal):
+            decide(literal)
+            if len(trail_lim) > self.max_depth:
+                self.max_depth = len(trail_lim)
+        engine.decide = deciding
+
+    def lines(self, engine=None):
+        """Report lines, without the 'c ' prefix. engine is anything with the attributes of COUNTERS"""
+        search = self.times.get('search')
+        lines = []
+        if engine is not None:
+            for counter in COUNTERS:
+                value = getattr(engine, counter)
+                rate = ' (%.0f/s)' % (value / search) if search and counter != 'restarts' else ''
+                lines.append('%-16s %d%s' % (counter, value, rate))
+            if self.instrumented:
+                lines.append('%-16s %d' % ('max depth', self.max_depth))
+            learnts = getattr(engine, 'learnts', None)
+            if learnts is not None:
+                lines.append('%-16s %d kept, %d deleted, %d reductions' % (
+                    'learnt clauses', len(learnts), learnts.deleted, learnts.reductions))
+        for phase, seconds in self.times.items():
+            lines.append('%-16s %.3f s' % ('time ' + phase, seconds))
+        lines.append('%-16s %.3f s' % ('time total', time.perf_counter() - self.start))
+        return lines
+
+    def report(self, engine=None, out=print):
+        for line in self.lines(engine):
+            out('c ' + line)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+'''
+    Model verification against a parsed formula
+    Course in Advanced Programming in Artificial Intelligence - UdL
+
+    A Verifier keeps the literal and offset arrays of one formula. With
+    NumPy, a model becomes a boolean array indexed by literal (negative
+    literals from the end, as in the engines). Gathering it at the
+    literals of the formula and taking a cumulative sum gives the number
+    of true literals in each clause at once. Several models are checked
+    in one batch as the rows of a matrix. Without NumPy the same checks
+    run in plain Python. parse_output() reads the answer of a solver
+    ('s' and 'v' lines) in a single pass over its output.
+    Use: python sat/verify.py <cnf_instance> <solver_output>... ('-' reads the output from stdin)
+'''
+
+import os
+import sys
+
+if not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from sat.dimacs import load_numpy, read_dimacs
+
+BATCH_CELLS = 1 << 24  # Bound of models x literals gathered at once
+
+
+def parse_output(output):
+    """Returns (status, model) of a solver output: status is 'SATISFIABLE', 'UNSATISFIABLE', another
+    word or None, model the literals of the 'v' lines (None if there are none or they are not integers)"""
+    status, values = None, []
+    for line in output.splitlines():
+        if line.startswith('s '):
+            status = line[2:].strip()
+        elif line.startswith('v '):
+            values.append(line[2:])
+    if not values:
+        return status, None
+    try:
+        model = [int(x) for x in ' '.join(values).split()]
+    except ValueError:
+        return status, None
+    if model and model[-1] == 0:
+        model.pop()
+    return status, model
+
+
+class Verifier():
+    """Checks models against one formula"""
+
+    def __init__(self, formula, numpy=None):
+        """
+        Initialization
+        formula: Formula to check the models against (see sat.dimacs)
+        numpy: NumPy module, found automatically when None, False to use plain Python
+        lits, offsets: Arrays of the formula, NumPy arrays when NumPy is used
+        empty: Whether the formula has an empty clause (no model satisfies it)
+        """
+        self.formula = formula
+        self.num_vars = formula.num_vars
+        self.numpy = load_numpy() if numpy is None else numpy or None
+        if self.numpy is not None:
+            np = self.numpy
+            self.lits = np.frombuffer(formula.lits, dtype=np.int32) if len(formula.lits) else np.zeros(0, np.int32)
+            self.offsets = np.frombuffer(formula.offsets, dtype=np.int64)
+            self.empty = bool((np.diff(self.offsets) == 0).any())
+        else:
+            self.lits, self.offsets = formula.lits, formula.offsets
+            self.empty = any(self.offsets[i] == self.offsets[i + 1] for i in range(len(self.offsets) - 1))
+
+    def check(self, model):
+        """Whether the literals of model (vars outside 1..n are ignored) satisfy every clause"""
+        return self.check_batch([model])[0]
+
+    def check_batch(self, models):
+        """Checks several models, returns a list of booleans"""
+        models = [list(model) for model in models]
+        if self.empty:
+            return [False] * len(models)
+        if self.numpy is None:
+            return [self._check_python(model) for model in models]
+        rows = max(1, BATCH_CELLS // max(1, len(self.lits)))
+        result = []
+        for start in range(0, len(models), rows):
+            result.extend(self._check_numpy(models[start:start + rows]))
+        return result
+
+    def _check_python(self, model):
+        n = self.num_vars
+        true = [False] * (2 * n + 1)
+        for literal in model:
+            if 0 < abs(literal) <= n:
+                if true[-literal]:  # Both signs of a variable
+                    return False
+                true[literal] = True
+        lits, offsets = self.lits, self.offsets
+        for i in range(len(offsets) - 1):
+            if not any(true[l] for l in lits[offsets[i]:offsets[i + 1]]):
+                return False
+        return True
+
+    def _check_numpy(self, models):
+        np, n = self.numpy, self.num_vars
+        true = np.zeros((len(models), 2 * n + 1), dtype=bool)
+        for row, model in enumerate(models):
+            literals = np.asarray(model, dtype=np.int64)
+            literals = literals[(literals != 0) & (np.abs(literals) <= n)]
+            true[row, literals] = True  # Negative literals index from the end
+        consistent = ~(true[:, 1:n + 1] & true[:, :n:-1]).any(axis=1)
+        counts = np.zeros((len(models), len(self.lits) + 1), dtype=np.int32)
+        np.cumsum(true[:, self.lits], axis=1, out=counts[:, 1:])
+        satisfied = counts[:, self.offsets[1:]] > counts[:, self.offsets[:-1]]
+        return (consistent & satisfied.all(axis=1)).tolist()
+
+
+def check_model(formula, model, numpy=None):
+    """Checks that a list of literals satisfies every clause of the formula"""
+    return Verifier(formula, numpy).check(model)
+
+
+def main():
+    verifier = Verifier(read_dimacs(sys.argv[1]))
+    for name in sys.argv[2:]:
+        if name == '-':
+            output = sys.stdin.read()
+        else:
+            with open(name) as f:
+                output = f.read()
+        status, model = parse_output(output)
+        if status == 'SATISFIABLE':
+            verdict = 'model OK' if model is not None and verifier.check(model) else 'WRONG model'
+        else:
+            verdict = 'no model checked'
+        print('c %s: %s, %s' % (name, status or 'no answer', verdict))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import itertools
+import os
+import unittest
+from sat import Solver
+from sat.dimacs import read_dimacs
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+def satisfies(model, clauses):
+    model = set(model)
+    return all(any(l in model for l in c) for c in clauses)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_enumerates_models_with_blocking_clauses(self):
+        clauses = [[1, 2, 3], [-1, -2], [-2, -3]]
+        solver = Solver(clauses)
+        models = set()
+        while solver.solve():
+            model = solver.model()
+            assert satisfies(model, clauses)
+            models.add(tuple(model))
+            solver.add_clause([-l for l in model])
+        expected = {m for m in itertools.product((1, -1), (2, -2), (3, -3)) if satisfies(m, clauses)}
+        assert models == expected
+        assert solver.failed() == []
+
+    def test_assumptions_and_failed_subset(self):
+        solver = Solver([[-1, 2], [-2, 3], [4, 5]])
+        assert solver.solve([1])
+        assert solver.value(3)
+        assert not solver.solve([4, 1, -3])
+        assert set(solver.failed()) <= {4, 1, -3} and {1, -3} <= set(solver.failed())
+        assert solver.solve([-3])  # Assumptions do not stay
+        assert not solver.value(1)
+        assert solver.solve()
+
+    def test_new_variables_between_calls(self):
+        solver = Solver([[1, 2]])
+        assert solver.solve([-1])
+        var = solver.new_var()
+        assert var == 3
+        solver.add_clause([-2, var])
+        solver.add_clause([-var, 7])
+        assert solver.num_vars == 7
+        assert solver.solve([-1, -7]) is False
+        assert set(solver.failed()) == {-1, -7}
+        assert solver.solve([-1])
+        assert solver.value(7)
+
+    def test_learnt_clauses_carry_over(self):
+        formula = read_dimacs(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        clauses = list(formula)
+        solver = Solver(clauses)
+        assert solver.solve()
+        learnt = len(solver.engine.learnts)
+        for literal in solver.model()[:5]:
+            if solver.solve([-literal]):
+                assert satisfies(solver.model(), clauses) and -literal in solver.model()
+            else:
+                assert solver.failed() == [-literal]
+        assert len(solver.engine.learnts) >= learnt or solver.engine.learnts.reductions
+
+    def test_unsat_clauses(self):
+        solver = Solver([[1], [-1, 2]])
+        assert solver.add_clause([-2]) is False
+        assert not solver.solve([3])
+        assert solver.failed() == []
@@ -0,0 +1,30 @@
+import unittest
+from sat.arena import ClauseArena
+from sat.propagate import Propagator
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_add_remove_compact(self):
+        arena = ClauseArena()
+        a = arena.add([1, 2, 3])
+        b = arena.add([-1, 4])
+        c = arena.add([2, -3, -4])
+        arena.remove(b)
+        assert [list(clause) for clause in arena] == [[1, 2, 3], [2, -3, -4]]
+        remap = arena.compact()
+        assert b not in remap and arena.wasted == 0
+        assert list(arena[remap[a]]) == [1, 2, 3]
+        assert list(arena[remap[c]]) == [2, -3, -4]
+
+    def test_detach_and_compact_engine(self):
+        engine = Propagator(3, [[1, 2], [-1, 3], [-2, -3]])
+        engine.detach(engine.clauses.refs[0])
+        engine.compact()
+        engine.decide(1)
+        assert engine.propagate() is None
+        assert list(engine.clauses[engine.reason[2]]) == [-2, -3]
+
+
+if __name__ == '__main__':
+    unittest.main()
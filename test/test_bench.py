@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+from sat import bench
+from sat.dimacs import read_dimacs
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_run_one(self):
+        formula = read_dimacs(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        for engine in ('musk', 'cdcl'):
+            record = bench.run_one(engine, formula)
+            assert record['status'] == 'SAT', engine
+            assert record['decisions'] > 0 and record['propagations_per_s'] > 0
+            assert record['cpu'] > 0 and record['peak_kb'] > 0
+        record = bench.run_one('paia_sat', formula, timeout=0.2)
+        assert record['status'] in ('SAT', 'TIMEOUT') and record['decisions'] is None
+
+    def test_compare(self):
+        def run(*results):
+            return {'results': [dict(zip(('engine', 'instance', 'status', 'cpu'), r)) for r in results]}
+        baseline = run(('musk', 'a', 'SAT', 1.0), ('musk', 'b', 'UNSAT', 1.0), ('cdcl', 'a', 'SAT', 0.01))
+        current = run(('musk', 'a', 'SAT', 1.05), ('musk', 'b', 'TIMEOUT', None), ('cdcl', 'a', 'SAT', 0.03),
+                      ('cdcl', 'c', 'SAT', 9.0))
+        assert bench.compare(baseline, current) == [('musk', 'b', 'UNSAT -> TIMEOUT')]
+        regressions = bench.compare(baseline, current, threshold=0.01, min_time=0.01)
+        assert [r[:2] for r in regressions] == [('musk', 'a'), ('musk', 'b'), ('cdcl', 'a')]
+
+    def test_history(self):
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, 'history.json')
+        for name in ('cnf-10-70-3.cnf', 'cnf-50-212-3.cnf'):
+            shutil.copy(os.path.join(BENCH, name), folder)
+        try:
+            argv = ['--history', path, 'run', '--engines', 'cdcl,musk', '--sets', folder, '--timeout', '5']
+            for label in ('first', 'second'):
+                assert bench.main(argv + ['--label', label]) == 0
+            history = bench.load_history(path)
+            assert [run['label'] for run in history] == ['first', 'second']
+            assert len(history[0]['results']) == 4
+            assert bench.main(['--history', path, 'compare', '--threshold', '100']) == 0
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
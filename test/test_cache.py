@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from sat import cache, dimacs
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.instance = os.path.join(self.folder, 'instance.cnf')
+        shutil.copy(os.path.join(BENCH, 'cnf-50-212-3.cnf'), self.instance)
+        self.cache = cache.FormulaCache(os.path.join(self.folder, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_round_trip(self):
+        parsed = dimacs.parse_dimacs(self.instance)
+        first = self.cache.load(self.instance)
+        second = self.cache.load(self.instance)
+        assert (self.cache.misses, self.cache.hits) == (1, 1)
+        assert isinstance(second.lits, memoryview)
+        assert second.num_vars == parsed.num_vars
+        assert list(second) == list(parsed) == list(first)
+
+    def test_invalidation(self):
+        self.cache.load(self.instance)
+        os.utime(self.instance, ns=(0, 0))  # Same contents, new mtime: only hashed again
+        self.cache.load(self.instance)
+        assert (self.cache.misses, self.cache.hits) == (1, 1)
+        with open(self.instance, 'a') as f:
+            f.write('1 2 3 0\n')
+        formula = self.cache.load(self.instance)
+        assert self.cache.misses == 2
+        assert formula.clause(len(formula) - 1) == [1, 2, 3]
+
+    def test_eviction(self):
+        self.cache.max_bytes = 10000
+        for i in range(4):
+            with open(self.instance, 'a') as f:
+                f.write('%d 0\n' % (i + 1))
+            self.cache.load(self.instance)
+        files = os.listdir(self.cache.directory)
+        assert sum(os.path.getsize(os.path.join(self.cache.directory, f)) for f in files) <= 10000
+        assert 0 < len([f for f in files if f.endswith('.formula')]) < 4
+
+    def test_read_dimacs_environment(self):
+        os.environ['SAT_CACHE'] = self.cache.directory
+        try:
+            dimacs.read_dimacs(self.instance)
+            formula = dimacs.read_dimacs(self.instance)
+        finally:
+            del os.environ['SAT_CACHE']
+        assert isinstance(formula.lits, memoryview)
+        assert len([f for f in os.listdir(self.cache.directory) if f.endswith('.formula')]) == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
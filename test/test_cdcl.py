@@ -0,0 +1,34 @@
+import os
+import unittest
+from sat import cdcl
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+def satisfies(model, clauses):
+    model = set(model)
+    return all(any(l in model for l in c) for c in clauses)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_bench_answers(self):
+        for name, expected in (('cnf-10-70-3.cnf', False), ('dpllcnf-graph-10-0.8-3.cnf', False),
+                               ('cnf-50-212-3.cnf', True), ('graph-15-08-7-3.cnf', True)):
+            variables, clauses = cdcl.parse(os.path.join(BENCH, name))
+            solver = cdcl.CDCL(variables, clauses)
+            assert solver.solve() == expected, name
+            if expected:
+                assert satisfies(solver.model(), clauses)
+
+    def test_learnt_clause_asserts_uip(self):
+        solver = cdcl.CDCL(4, [[-1, 2], [-1, 3], [-2, -3, 4], [-2, -3, -4]])
+        solver.decide(1)
+        conflict = solver.propagate()
+        learnt, level = solver.analyze(conflict)
+        assert learnt == [-1] and level == 0
+        assert not any(solver.seen)
+
+
+if __name__ == '__main__':
+    unittest.main()
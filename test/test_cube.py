@@ -0,0 +1,67 @@
+import os
+import unittest
+from sat import cube
+from sat.dimacs import Formula, read_dimacs
+from sat.propagate import Propagator
+from sat.verify import check_model
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+def dead_worker(name, index, tasks, *args):
+    tasks.get()  # Takes a cube and dies without an answer
+    os._exit(1)
+
+
+def dying_worker(name, index, tasks, *args):
+    """The first worker dies on its first cube, the others solve normally"""
+    if index == 0:
+        dead_worker(name, index, tasks)
+    cube.worker(name, index, tasks, *args)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_failed_literal_grows_cube(self):
+        # 1 implies both 2 and -2 so the lookahead fixes -1, then -3 fails (-3, -4 and -1 falsify [1, 3, 4])
+        formula = Formula.from_clauses(4, [[-1, 2], [-1, -2], [1, 3, 4], [-3, 4], [3, -4]])
+        engine = Propagator(4, formula)
+        assert cube.branch(engine, [], cube.occurrence_order(formula)) == ('split', [-1, 3], 2)
+        assert cube.branch(engine, [1], [1, 2, 3, 4])[0] == 'unsat'
+
+    def test_make_cubes(self):
+        formula = read_dimacs(os.path.join(BENCH, 'smileSAT-135-580-3-14.cnf'))
+        model, cubes = cube.make_cubes(formula, 8)
+        assert model is None and len(cubes) == 8
+        assert all(c and not any(-l in c for l in c) for c in cubes)
+        assert cube.make_cubes(read_dimacs(os.path.join(BENCH, 'cnf-10-70-3.cnf')), 8) == (None, [])  # Refuted
+
+    def test_conquer_with_splits(self):
+        lines, counters = [], {}
+        for name, expected in (('smileSAT-135-580-3-14.cnf', False), ('cnf-100-425-3.cnf', True)):
+            formula = read_dimacs(os.path.join(BENCH, name))
+            _, cubes = cube.make_cubes(formula, 4)
+            sat, model = cube.conquer(formula, cubes, workers=2, time_slice=0.01, report=lines.append,
+                                      counters=counters)
+            assert sat == expected, name
+            assert counters['decisions'] > 0 and counters['propagations'] >= counters['decisions']
+            if sat:
+                assert check_model(formula, model)
+        assert int(lines[0].split(', ')[2].split()[0]) > 0  # The UNSAT one needed dynamic splits
+
+    def test_dead_worker(self):
+        formula = read_dimacs(os.path.join(BENCH, 'smileSAT-135-580-3-14.cnf'))
+        _, cubes = cube.make_cubes(formula, 4)
+        lines = []
+        assert cube.conquer(formula, cubes, workers=2, report=lines.append, target=dying_worker) == (False, None)
+        assert lines[0].endswith('1 re-queued from dead workers')
+        assert cube.conquer(formula, cubes, workers=2, target=dead_worker) == (None, None)  # No worker left
+
+    def test_solve(self):
+        formula = read_dimacs(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        sat, model = cube.solve(formula, workers=2, cubes=4)
+        assert sat and check_model(formula, model)
+
+
+if __name__ == '__main__':
+    unittest.main()
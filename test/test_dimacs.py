@@ -0,0 +1,66 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import sys
+import tempfile
+import unittest
+from sat import dimacs
+
+TEXT = b'c comment\np cnf 5 4\n1 -2\n 3 0 -4\t5 0\nc middle\n2 0 1 2 3 4 5 0\n%\n0\n'
+CLAUSES = [[1, -2, 3], [-4, 5], [2], [1, 2, 3, 4, 5]]
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.cnf')
+        os.write(fd, TEXT)
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_clauses_across_lines(self):
+        formula = dimacs.read_dimacs(self.path)
+        assert formula.num_vars == 5
+        assert list(formula) == CLAUSES
+        assert list(formula.offsets) == [0, 3, 5, 6, 11]
+
+    def test_small_chunks(self):
+        chunk = dimacs.CHUNK
+        dimacs.CHUNK = 2
+        try:
+            assert dimacs.read_dimacs(self.path).clause(3) == [1, 2, 3, 4, 5]
+        finally:
+            dimacs.CHUNK = chunk
+
+    def test_compressed_streams(self):
+        chunk = dimacs.CHUNK
+        dimacs.CHUNK = 3
+        try:
+            for extension, module in (('.gz', gzip), ('.xz', lzma), ('.bz2', bz2)):
+                path = self.path + extension
+                with module.open(path, 'wb') as f:
+                    f.write(TEXT)
+                try:
+                    formula = dimacs.read_dimacs(path)
+                finally:
+                    os.remove(path)
+                assert formula.num_vars == 5 and list(formula) == CLAUSES, extension
+        finally:
+            dimacs.CHUNK = chunk
+
+    def test_stdin(self):
+        stdin = sys.stdin
+        sys.stdin = io.TextIOWrapper(io.BytesIO(b'1 -2 0\n2 3'))
+        try:
+            formula = dimacs.read_dimacs('-')
+        finally:
+            sys.stdin = stdin
+        assert formula.num_vars == 3 and list(formula) == [[1, -2], [2, 3]]
+
+
+if __name__ == '__main__':
+    unittest.main()
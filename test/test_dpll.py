@@ -0,0 +1,31 @@
+import os
+import unittest
+from sat import melisSAT, musk
+from sat.dpll import search
+from sat.heuristics import make_heuristic
+from sat.propagate import Propagator
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_deeper_than_recursion_limit(self):
+        engine = Propagator(3000, [[1, 2]])
+        assert search(engine, make_heuristic('static', engine))
+        assert engine.decision_level() == 3000
+
+    def test_bench_answers(self):
+        for name, expected in (('cnf-10-70-3.cnf', False), ('cnf-50-212-3.cnf', True)):
+            variables, clauses = musk.parse(os.path.join(BENCH, name))
+            for solve in (musk.solve, melisSAT.backtracking):
+                engine = Propagator(variables, clauses)
+                answer = engine.ok and solve(engine, make_heuristic('vsids', engine))
+                assert answer == expected, name
+                if expected:
+                    model = set(engine.model())
+                    assert all(any(l in model for l in c) for c in clauses)
+
+
+if __name__ == '__main__':
+    unittest.main()
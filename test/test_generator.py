@@ -0,0 +1,58 @@
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from sat.dimacs import load_numpy, read_dimacs
+from sat.verify import check_model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location('rnd_cnf_gen', os.path.join(ROOT, 'rnd-cnf-gen.py'))
+generator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(generator)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def numpy_options(self):
+        return (None, load_numpy()) if load_numpy() is not None else (None,)
+
+    def test_families(self):
+        for numpy in self.numpy_options():
+            for family in generator.FAMILIES:
+                gen = generator.Generator(60, 3, family, communities=6, seed=1, numpy=numpy)
+                clauses = [list(c) for batch in gen.batches(500, batch=128) for c in batch]
+                assert len(clauses) == 500
+                assert all(len({abs(l) for l in c}) == 3 and all(1 <= abs(l) <= 60 for l in c) for c in clauses)
+                if family == 'planted':
+                    assert all(any(gen.planted[abs(l)] == l for l in c) for c in clauses)
+                if family == 'community':
+                    inside = sum(len({(abs(l) - 1) // 10 for l in c}) == 1 for c in clauses)
+                    assert inside > 0.7 * 500
+
+    def test_output(self):
+        for numpy in self.numpy_options():
+            gen = generator.Generator(30, 3, 'planted', seed=2, numpy=numpy)
+            out = io.StringIO()
+            generator.write_formula(gen, 200, out, batch=64)
+            text = out.getvalue()
+            fd, path = tempfile.mkstemp(suffix='.cnf')
+            os.write(fd, text.encode())
+            os.close(fd)
+            try:
+                formula = read_dimacs(path)
+            finally:
+                os.remove(path)
+            assert formula.num_vars == 30 and len(formula) == 200
+            assert text.count('\n') == 203
+            assert check_model(formula, gen.planted[1:])
+
+    def test_arguments(self):
+        args = generator.parse_args(['100', '0', '3', '--ratio', '4.26', '--family', 'community'])
+        assert args.num_clauses == 426 and args.seed is None
+        with self.assertRaises(ValueError):
+            generator.Generator(10, 3, 'community', communities=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
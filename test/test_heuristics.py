@@ -0,0 +1,74 @@
+import os
+import unittest
+from sat.cdcl import CDCL
+from sat.dimacs import read_dimacs
+from sat.dpll import search
+from sat.heuristics import VarHeap, make_heuristic, probe
+from sat.propagate import Propagator
+from sat.verify import check_model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_heap_order(self):
+        activity = [0.0, 3.0, 1.0, 5.0, 2.0]
+        heap = VarHeap(activity)
+        for var in range(1, 5):
+            heap.push(var)
+        activity[2] = 10.0
+        heap.increased(2)
+        assert [heap.pop() for _ in range(4)] == [2, 3, 1, 4]
+        assert 2 not in heap
+
+    def test_vsids_reinserts_on_backtrack(self):
+        engine = Propagator(3, [[1, 2, 3], [-1, 2], [-2, 3, 1]])
+        heuristic = make_heuristic('vsids', engine)
+        var = heuristic.pick()
+        engine.decide(var)
+        engine.propagate()
+        engine.backtrack(0)
+        assert var in heuristic.order
+        heuristic.bump([-3])
+        assert heuristic.pick() == 3
+
+    def test_static_order(self):
+        engine = Propagator(3, [[1, 2, 3]])
+        heuristic = make_heuristic('static', engine)
+        assert [heuristic.pick() for _ in range(3)] == [1, 2, 3]
+        assert heuristic.pick() is None
+
+
+    def test_probe(self):
+        engine = Propagator(4, [[-1, 2], [-2, 3], [-1, -3, 4]])
+        engine.save_phases()
+        engine.decide(-4)
+        assert probe(engine, 1, list) is None  # 1 implies 2, 3 and then contradicts -4
+        assert probe(engine, 2, list) == [2, 3, -1]
+        assert engine.trail == [-4] and engine.decisions == 1 and engine.phase == [None] * 5
+
+    def test_lookahead(self):
+        engine = Propagator(3, [[1, 2, 3], [-1, -2, 3], [1, -2, -3], [-1, 2, -3]])
+        heuristic = make_heuristic('lookahead', engine)
+        var = heuristic.pick()
+        assert var is not None and engine.value[var] is None and heuristic.failed is None
+        engine = Propagator(3, [[-1, 2], [-1, -2], [1, 3, 2]])
+        heuristic = make_heuristic('lookahead', engine)
+        assert heuristic.pick() == 1 and heuristic.polarity(1) == 1  # Branching on 1 fails at once
+        assert heuristic.polarity(2) is None
+
+    def test_lookahead_search(self):
+        for name in ('cnf-20-85-3.cnf', 'cnf-10-70-3.cnf', 'smileSAT-135-580-3-13.cnf'):
+            formula = read_dimacs(os.path.join(ROOT, 'bench', name))
+            engine = Propagator(formula.num_vars, formula)
+            sat = search(engine, make_heuristic('lookahead', engine))
+            assert sat == (name != 'cnf-10-70-3.cnf')
+            assert not sat or check_model(formula, engine.model())
+            solver = CDCL(formula.num_vars, formula, 'lookahead')
+            assert solver.solve() == sat
+            assert not sat or check_model(formula, solver.model())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import unittest
+from sat import cdcl
+from sat.learnts import LearntClauses
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_reductions_keep_answers(self):
+        for name, expected in (('ricard_albert_arnau_40_1000_5.cnf', False), ('smileSAT-135-580-3-15.cnf', True)):
+            variables, clauses = cdcl.parse(os.path.join(BENCH, name))
+            solver = cdcl.CDCL(variables, clauses)
+            lines = []
+            solver.learnts = LearntClauses(solver, first=100, increment=50, budget=2000, report=lines.append)
+            assert solver.solve() == expected, name
+            assert solver.learnts.reductions == len(lines)
+            assert lines or expected  # The UNSAT instance needs thousands of conflicts
+            assert solver.learnts.literals == sum(solver.clauses.size(ref) for ref in solver.learnts)
+            if expected:
+                model = set(solver.model())
+                assert all(any(l in model for l in c) for c in clauses)
+
+    def test_glue_and_locked_clauses_survive(self):
+        solver = cdcl.CDCL(4, [[1, 2, 3, 4]])
+        learnts = solver.learnts
+        glue = solver.attach([1, 2])
+        learnts.add(glue, 2)
+        worst = [solver.attach([1, 3, 4]), solver.attach([2, 3, 4])]
+        for ref in worst:
+            learnts.add(ref, 3)
+        locked = solver.attach([-1, -2, -3])
+        learnts.add(locked, 3)
+        solver.decide(1)
+        solver.decide(2)
+        assert solver.propagate() is None and solver.reason[3] == locked
+        learnts.reduce()
+        assert glue in learnts and locked in learnts and len(learnts) == 3
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import contextlib
+import io
+import unittest
+from sat.newsat import ENGINES, OPTIONS, parse_args
+from sat.options import search_argv
+
+
+class MyTestCase(unittest.TestCase):
+
+    def rejected(self, argv):
+        with contextlib.redirect_stderr(io.StringIO()) as err, self.assertRaises(SystemExit):
+            parse_args(argv)
+        return err.getvalue()
+
+    def test_engine_options(self):
+        assert set(OPTIONS) == set(ENGINES)
+        args = parse_args(['x.cnf', '-e', 'musk', '--pure-literals', '--restart', 'luby'])
+        assert search_argv(args) == ['--restart', 'luby', '--pure-literals']
+        assert parse_args(['x.cnf', '-e', 'cube', '--learnt-budget', '100']).learnt_budget == 100
+        assert parse_args(['x.cnf', '-e', 'portfolio', '--stats', '--profile', 'f.prof']).profile == 'f.prof'
+        assert 'cdcl engine does not take --pure-literals' in self.rejected(['x.cnf', '-e', 'cdcl', '--pure-literals'])
+        assert 'does not take --pure-literals' in self.rejected(['x.cnf', '-e', 'cube', '--pure-literals'])
+        assert 'does not take --learnt-budget' in self.rejected(['x.cnf', '-e', 'musk', '--learnt-budget', '100'])
+        assert 'does not take --heuristic' in self.rejected(['x.cnf', '-e', 'sat', '--heuristic', 'jw'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import unittest
+from sat import portfolio
+from sat.dimacs import read_dimacs
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_shared_formula(self):
+        formula = read_dimacs(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        shm = portfolio.share(formula)
+        try:
+            shared = portfolio.shared_formula(shm)
+            assert shared.num_vars == formula.num_vars
+            assert list(shared) == list(formula)
+            shared.lits.release()
+            shared.offsets.release()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_race(self):
+        for name, expected in (('cnf-10-70-3.cnf', False), ('cnf-50-212-3.cnf', True)):
+            formula = read_dimacs(os.path.join(BENCH, name))
+            engine, sat, model = portfolio.race(formula, ('musk', 'melisSAT', 'cdcl'))
+            assert sat == expected, name
+            if sat:
+                assert portfolio.check_model(formula, model)
+
+    def test_engines(self):
+        for name, expected in (('cnf-10-70-3.cnf', False), ('cnf-50-212-3.cnf', True)):
+            formula = read_dimacs(os.path.join(BENCH, name))
+            decisions = set()
+            for engine in ('musk', 'melisSAT', 'SATanas', 'SATanas2'):
+                sat, model, state = portfolio.ENGINES[engine](formula, 'vsids')
+                assert sat == expected and (not sat or portfolio.check_model(formula, model)), (name, engine)
+                decisions.add(state.decisions)
+            assert len(decisions) > 1, name  # The DPLL members do not search alike
+
+    def test_check_model(self):
+        formula = read_dimacs(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        assert not portfolio.check_model(formula, [-v for v in range(1, formula.num_vars + 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
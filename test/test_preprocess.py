@@ -0,0 +1,93 @@
+import itertools
+import random
+import unittest
+from sat.cdcl import CDCL
+from sat.preprocess import Preprocessor, strongly_connected_components
+
+
+def satisfiable(num_vars, clauses):
+    for bits in itertools.product((False, True), repeat=num_vars):
+        if all(any((l > 0) == bits[abs(l) - 1] for l in c) for c in clauses):
+            return True
+    return False
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_subsumption_and_strengthening(self):
+        preprocessor = Preprocessor(4, [[1, 2], [1, 2, 3], [-1, 2, 4], [2, 1], [3, -3, 4]], frozen=range(1, 5))
+        clauses = preprocessor.simplify()
+        assert sorted(map(sorted, clauses)) == [[1, 2], [2, 4]]
+        assert (preprocessor.duplicates, preprocessor.tautologies) == (1, 1)
+        assert preprocessor.subsumed == 1 and preprocessor.strengthened == 1
+
+    def test_subsumed_resolvent(self):
+        preprocessor = Preprocessor(4, [[1, 2, 3], [-1, 4], [2, 4]], frozen=(2, 3, 4))
+        assert preprocessor.simplify() == [[2, 4]]  # The resolvent [2, 3, 4] on 1 is subsumed by [2, 4]
+        assert preprocessor.eliminated == {1} and preprocessor.subsumed == 1
+
+    def test_elimination_and_reconstruction(self):
+        clauses = [[1, 2], [-1, 3], [-2, -3], [2, 3, 4]]
+        preprocessor = Preprocessor(4, clauses)
+        simplified = preprocessor.simplify()
+        assert preprocessor.eliminated
+        solver = CDCL(4, simplified)
+        assert solver.solve()
+        model = set(preprocessor.extend(solver.model()))
+        assert all(any(l in model for l in c) for c in clauses)
+
+    def test_components(self):
+        graph = {1: [2], 2: [3], 3: [1, 4], 4: [5], 5: [4], 6: [1]}
+        components = strongly_connected_components(graph, [6])
+        assert [sorted(c) for c in components] == [[4, 5], [1, 2, 3], [6]]  # Reverse topological order
+
+    def test_equivalent_literals(self):
+        clauses = [[-1, 2], [-2, -3], [3, 1], [1, 4, 5], [-2, -4, 5], [-3, -5, 4], [4, 5, 6]]
+        preprocessor = Preprocessor(6, clauses, frozen=(4, 5, 6))
+        simplified = preprocessor.simplify()
+        assert preprocessor.substituted == 2 and {abs(l) for c in simplified for l in c} <= {1, 4, 5, 6}
+        solver = CDCL(6, simplified)
+        assert solver.solve()
+        model = set(preprocessor.extend(solver.model()))
+        assert all(any(l in model for l in c) for c in clauses)
+        assert not CDCL(2, Preprocessor(2, [[-1, 2], [1, -2], [1, 2], [-1, -2]]).simplify()).solve()
+
+    def test_failed_literals_and_hyper_binary_resolvents(self):
+        preprocessor = Preprocessor(4, [[-1, 2], [-1, 3], [-2, -3, 4], [-1, -4]], frozen=range(1, 5))
+        assert [-1] in preprocessor.simplify() and preprocessor.failed == 1
+        preprocessor = Preprocessor(4, [[-1, 2], [-1, -3], [-2, 3, 4]], frozen=range(1, 5))
+        assert [-1, 4] in preprocessor.simplify() and preprocessor.hyper_binary == 1
+
+    def test_random_formulas(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            num_vars = rng.randint(1, 7)
+            clauses = [[rng.choice((-1, 1)) * rng.randint(1, num_vars) for _ in range(rng.randint(1, 4))]
+                       for _ in range(rng.randint(0, 25))]
+            preprocessor = Preprocessor(num_vars, clauses)
+            solver = CDCL(num_vars, preprocessor.simplify())
+            assert solver.solve() == satisfiable(num_vars, clauses), clauses
+            if solver.ok:
+                model = set(preprocessor.extend(solver.model()))
+                assert all(any(l in model for l in c) for c in clauses), clauses
+
+
+    def test_random_binary_formulas(self):
+        rng = random.Random(11)
+        for _ in range(300):
+            num_vars = rng.randint(2, 8)
+            clauses = [[rng.choice((-1, 1)) * rng.randint(1, num_vars) for _ in range(rng.choice((2, 2, 2, 3)))]
+                       for _ in range(rng.randint(0, 25))]
+            frozen = [v for v in range(1, num_vars + 1) if rng.random() < 0.2]
+            preprocessor = Preprocessor(num_vars, clauses, frozen=frozen)
+            simplified = preprocessor.simplify()
+            assert not any(abs(l) in preprocessor.eliminated for c in simplified for l in c), clauses
+            solver = CDCL(num_vars, simplified)
+            assert solver.solve() == satisfiable(num_vars, clauses), clauses
+            if solver.ok:
+                model = set(preprocessor.extend(solver.model()))
+                assert all(any(l in model for l in c) for c in clauses), clauses
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from sat import profiling
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INSTANCE = os.path.join(ROOT, 'bench', 'cnf-10-70-3.cnf')
+
+
+def busy():
+    return sum(i * i for i in range(300000))
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_profilers(self):
+        for name in ('a.prof', 'b.folded'):
+            with profiling.Profiler(os.path.join(self.folder, name), interval=0.0005):
+                for _ in range(10):
+                    busy()
+        stacks = profiling.read_folded(os.path.join(self.folder, 'b.folded'))
+        assert any('test_profiling.py:busy' in stack for stack in stacks)
+        merged = profiling.merge(self.folder, os.path.join(self.folder, profiling.MERGED))
+        assert {stack.split(';')[0] for stack in merged} == {'samples', 'cprofile'}
+        assert profiling.read_folded(os.path.join(self.folder, profiling.MERGED)) == merged
+        profiling.merge(self.folder, os.path.join(self.folder, profiling.MERGED))  # The output is not read back
+        assert profiling.read_folded(os.path.join(self.folder, profiling.MERGED)) == merged
+        lines = profiling.ranking(self.folder, top=5)
+        assert lines[0].startswith('cProfile totals of 1 runs') and 'sampled totals' in lines[6]
+
+    def test_ranked(self):
+        stacks = {'main;solve;cost': 5, 'main;solve': 2, 'main;cost': 1}
+        assert profiling.ranked(stacks) == [('cost', 6, 6), ('solve', 2, 7)]  # main has no own samples
+
+    def test_entry_points(self):
+        output = os.path.join(self.folder, 'musk.prof')
+        run = subprocess.run([sys.executable, os.path.join(ROOT, 'sat', 'musk.py'), INSTANCE, '--profile', output],
+                             capture_output=True, text=True)
+        assert run.stdout.startswith('s UNSATISFIABLE') and os.path.getsize(output) > 0
+        output = os.path.join(self.folder, 'paia_sat.folded')
+        run = subprocess.run([sys.executable, os.path.join(ROOT, 'sat', 'profiling.py'), 'run', '-o', output,
+                              os.path.join(ROOT, 'paia_sat.py'), INSTANCE], capture_output=True, text=True)
+        assert os.path.exists(output), run.stderr
+        assert profiling.ranking(self.folder)[0].startswith('cProfile totals of 1 runs')
+        output = os.path.join(self.folder, 'portfolio.prof')
+        run = subprocess.run([sys.executable, '-m', 'sat', INSTANCE, '-e', 'portfolio', '--profile', output],
+                             capture_output=True, text=True, cwd=ROOT)
+        assert 's UNSATISFIABLE' in run.stdout, run.stderr
+        stats = pstats.Stats(output).stats  # Saved by the coordinator, not by a forked worker
+        assert any(name == 'race' and filename.endswith('portfolio.py') for filename, _, name in stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from sat.propagate import Propagator, PureLiteralPropagator
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_unit_chain(self):
+        engine = Propagator(3, [[-1, 2], [-2, 3]])
+        engine.decide(1)
+        assert engine.propagate() is None
+        assert engine.trail == [1, 2, 3]
+        assert engine.reason[1] is None and list(engine.clauses[engine.reason[3]]) == [3, -2]
+        assert engine.level[3] == 1
+
+    def test_conflict_and_backtrack(self):
+        engine = Propagator(3, [[1, 2], [1, 3], [-2, -3]])
+        assert engine.propagate() is None
+        engine.decide(-1)
+        assert engine.propagate() is not None
+        engine.backtrack(0)
+        assert engine.trail == []
+        assert all(v is None for v in engine.value)
+        engine.decide(1)
+        assert engine.propagate() is None
+
+    def test_empty_and_contradicting_units(self):
+        assert not Propagator(1, [[]]).ok
+        assert not Propagator(1, [[1], [-1]]).ok
+
+    def test_pure_literal_during_search(self):
+        engine = PureLiteralPropagator(3, [[1, 2], [-1, 3], [-2, -3], [2, 3]])
+        assert engine.candidates == []
+        engine.decide(1)  # Satisfies [1, 2], -2 only occurs now
+        assert engine.propagate() is None
+        assert engine.value[3] and engine.value[-2] and engine.pure_literals == 0
+        engine.backtrack(0)
+        assert engine.count[2] == 2 and engine.count[-1] == 1
+        engine = PureLiteralPropagator(3, [[1, 2], [1, -3], [-2, 3]])
+        assert engine.propagate() is None and engine.value[1]  # 1 is pure from the start
+        assert engine.pure_literals == 2  # Then -2 or 3, the clause left is [-2, 3]
+        assert engine.value[-2] or engine.value[3]
+
+
+if __name__ == '__main__':
+    unittest.main()
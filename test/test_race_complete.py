@@ -0,0 +1,148 @@
+import gzip
+import importlib.util
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location('race_complete', os.path.join(ROOT, 'race-complete.py'))
+race = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(race)
+
+SOLVER = os.path.join(ROOT, 'sat', 'cdcl.py')
+INSTANCES = ('cnf-10-42-3.cnf', 'cnf-10-70-3.cnf', 'cnf-20-85-3.cnf')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.files = []
+        for name in INSTANCES[:-1]:
+            shutil.copy(os.path.join(ROOT, 'bench', name), self.folder)
+            self.files.append(os.path.join(self.folder, name))
+        with open(os.path.join(ROOT, 'bench', INSTANCES[-1]), 'rb') as f, \
+                gzip.open(os.path.join(self.folder, INSTANCES[-1] + '.gz'), 'wb') as out:
+            out.write(f.read())
+        self.files.append(os.path.join(self.folder, INSTANCES[-1] + '.gz'))
+        self.coordinator = None
+
+    def tearDown(self):
+        if self.coordinator:
+            self.coordinator.shutdown()
+            self.coordinator.server_close()
+        shutil.rmtree(self.folder)
+
+    def serve(self, **options):
+        self.coordinator = race.Coordinator(('localhost', 0), self.files, SOLVER, **options)
+        threading.Thread(target=self.coordinator.serve_forever, daemon=True).start()
+        return self.coordinator.server_address[:2]
+
+    def workers(self, address, count):
+        done = []
+        threads = [threading.Thread(target=lambda: done.append(race.work(address, retry=5))) for _ in range(count)]
+        for t in threads:
+            t.start()
+        results = list(self.coordinator.wait_results())
+        for t in threads:
+            t.join(10)
+        return results, done
+
+    def test_run_solver(self):
+        output, cpu_time = race.run_solver(SOLVER, os.path.join(ROOT, 'bench', 'cnf-10-70-3.cnf'), 10)
+        assert race.parse_output(output)[0] == 'UNSATISFIABLE' and cpu_time > 0
+        busy = os.path.join(self.folder, 'busy.py')
+        with open(busy, 'w') as f:
+            f.write('while True:\n    pass\n')
+        output, cpu_time = race.run_solver(busy, self.files[0], 1)  # Killed by the CPU limit
+        assert race.parse_output(output) == (None, None) and 0.5 < cpu_time < 3
+
+    def test_jobs(self):
+        reports = []
+        for jobs in ('1', '2'):
+            output = subprocess.run([sys.executable, os.path.join(ROOT, 'race-complete.py'), self.folder, SOLVER,
+                                     '-j', jobs], capture_output=True, text=True, check=True).stdout
+            reports.append(re.sub(r'time = [0-9.]+', 'time', output))
+        assert reports[0] == reports[1] and reports[0].count('OK!') == len(self.files)
+
+    def test_protocol(self):
+        address = self.serve(output=True)
+        results, done = self.workers(address, 2)
+        assert len(done) == 2 and sum(done) == len(self.files)
+        for (output, cpu_time, correct, unsat), bf in zip(results, self.files):
+            assert correct is True and cpu_time >= 0 and output.startswith('s ')
+            assert unsat == (race.check_correctness(bf, output)[1])
+        assert self.coordinator.requeued == 0
+
+    def test_dead_worker(self):
+        address = self.serve()
+        with socket.create_connection(address) as sock, sock.makefile('rwb') as stream:
+            race.send_message(stream, {'type': 'get'})
+            job = race.receive_message(stream)
+            assert job['type'] == 'job' and job['solver'] == os.path.join('sat', 'cdcl.py')
+        results, done = self.workers(address, 1)  # The job of the closed connection is run again
+        assert done == [len(self.files)] and all(r[2] is True for r in results)
+        assert self.coordinator.requeued == 1
+
+    def test_expired_lease(self):
+        address = self.serve(lease=0)
+        with socket.create_connection(address) as sock, sock.makefile('rwb') as stream:
+            race.send_message(stream, {'type': 'get'})
+            job = race.receive_message(stream)
+            results, done = self.workers(address, 1)  # Takes the job of the silent worker
+            assert done == [len(self.files)] and all(r[2] is True for r in results)
+            race.send_message(stream, {'type': 'result', 'id': job['id'], 'status': 'SATISFIABLE',
+                                       'model': [], 'time': 0})  # Too late, the first result stays
+            race.send_message(stream, {'type': 'get'})
+            assert race.receive_message(stream) == {'type': 'done'}
+        assert self.coordinator.results[job['id']][2] is True and self.coordinator.requeued >= 1
+
+    def test_wrong_result(self):
+        address = self.serve()
+        with socket.create_connection(address) as sock, sock.makefile('rwb') as stream:
+            race.send_message(stream, {'type': 'get'})
+            job = race.receive_message(stream)
+            race.send_message(stream, {'type': 'result', 'id': job['id'], 'status': 'SATISFIABLE',
+                                       'model': [-v for v in range(1, 11)], 'time': 0.5})
+            output, cpu_time, correct, unsat = self.coordinator.wait_result(job['id'])
+        assert (output, cpu_time, correct, unsat) == ('', 0.5, False, False)
+        result = race.run_job(job)
+        assert result['status'] in ('SATISFIABLE', 'UNSATISFIABLE') and result['output'] is None
+
+    def test_malformed_result(self):
+        address = self.serve()
+        bad = ({'id': '0'}, {'id': -1}, {'id': True}, {'time': 'fast'}, {'model': [1, 'x']}, {'model': 'v 1'})
+        for fields in bad:
+            with socket.create_connection(address) as sock, sock.makefile('rwb') as stream:
+                race.send_message(stream, {'type': 'get'})
+                job = race.receive_message(stream)
+                race.send_message(stream, dict({'type': 'result', 'id': job['id'], 'status': 'SATISFIABLE',
+                                                'model': [], 'time': 0}, **fields))
+                assert race.receive_message(stream) is None, fields  # The connection is dropped
+        with socket.create_connection(address) as sock, sock.makefile('rwb') as stream:
+            race.send_message(stream, [])  # Not even an object
+            assert race.receive_message(stream) is None
+        results, done = self.workers(address, 1)  # Every job is still served
+        assert done == [len(self.files)] and all(r[2] is True for r in results)
+        assert not self.coordinator.leases and self.coordinator.requeued == len(bad)
+
+    def test_solver_outside(self):
+        busy = os.path.join(self.folder, 'busy.py')
+        with open(busy, 'w') as f:
+            f.write('while True:\n    pass\n')
+        self.assertRaises(ValueError, race.Coordinator, ('localhost', 0), self.files, busy)
+        job = {'type': 'job', 'id': 0, 'name': 'x.cnf', 'data': '', 'seconds': 1, 'output': True}
+        for solver in (busy, os.path.join('..', 'busy.py'), os.path.join('sat', '..', '..', 'busy.py')):
+            result = race.run_job(dict(job, solver=solver))
+            assert result['status'] is None and result['output'].startswith('ERROR: Solver outside')
+        assert race.parse_address('8000') == ('localhost', 8000)
+
+
+if __name__ == '__main__':
+    unittest.main()
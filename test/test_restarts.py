@@ -0,0 +1,50 @@
+import os
+import unittest
+from sat import cdcl
+from sat.dpll import search
+from sat.heuristics import make_heuristic
+from sat.propagate import Propagator
+from sat.restarts import Geometric, Glucose, luby, make_restart
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_luby_sequence(self):
+        assert [luby(2, i) for i in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+    def test_geometric_limits(self):
+        policy = Geometric(first=2, factor=2)
+        restarts = [i for i in range(1, 15) if policy.conflict(1)]
+        assert restarts == [2, 6, 14]
+
+    def test_glucose_restarts_on_bad_lbds(self):
+        policy = Glucose(window=3)
+        assert not any(policy.conflict(2) for _ in range(10))
+        assert any(policy.conflict(9) for _ in range(3))
+        assert policy.restarts == 1
+
+    def test_phase_saving(self):
+        engine = Propagator(2, [[1, 2]])
+        engine.save_phases()
+        engine.decide(-1)
+        engine.propagate()
+        engine.restart()
+        assert engine.polarity(1) == -1 and engine.polarity(2) == 2
+        assert engine.restarts == 1
+
+    def test_policies_keep_answers(self):
+        for name, expected in (('cnf-10-70-3.cnf', False), ('cnf-50-212-3.cnf', True)):
+            variables, clauses = cdcl.parse(os.path.join(BENCH, name))
+            for restart in ('luby', 'geometric', 'glucose'):
+                solver = cdcl.CDCL(variables, clauses, restart=restart)
+                assert solver.solve() == expected, (name, restart)
+                engine = Propagator(variables, clauses)
+                engine.save_phases()
+                heuristic = make_heuristic('vsids', engine)
+                assert search(engine, heuristic, restart=make_restart(restart, learning=False)) == expected
+
+
+if __name__ == '__main__':
+    unittest.main()
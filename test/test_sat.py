@@ -1,17 +1,33 @@
+import os
 import unittest
 from sat import sat
 
+CNFS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cnfs_test')
+
 
 class MyTestCase(unittest.TestCase):
 
 
     def test_pure_literal(self):
-        cnf = sat.CNF(cnf_file_name='cnfs_test/pure_literal.cnf')
+        cnf = sat.CNF(cnf_file_name=os.path.join(CNFS, 'pure_literal.cnf'))
         assert cnf.num_vars == 10
         assert cnf.num_clauses == 6
         for lit in (cnf.pure_literal()):
             assert lit[1] is not None
 
+    def test_incremental_cost(self):
+        cnf = sat.CNF(cnf_file_name=os.path.join(CNFS, 'unit_prop2neg.cnf'))
+        incremental = sat.IncrementalInterpretation(cnf)
+        scan = sat.Interpretation(cnf.num_vars, [None] * (cnf.num_vars + 1), cnf)
+        for var, value in ((1, 0), (2, 1), (3, 0)):
+            incremental.assign(var, value)
+            scan.assign(var, value)
+            assert incremental.cost() == scan.cost()
+        incremental.unassign(1)
+        scan.unassign(1)
+        assert incremental.cost() == scan.cost() == 1
+        assert sat.Solver(cnf).solve().vars[1:] == [1, 0, 0]
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,54 @@
+import contextlib
+import io
+import os
+import unittest
+from sat import SATanas, musk
+from sat.cdcl import CDCL
+from sat.heuristics import make_heuristic
+from sat.propagate import Propagator
+from sat.stats import Stats
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_instrumented_dpll(self):
+        variables, clauses = musk.parse(os.path.join(BENCH, 'cnf-10-70-3.cnf'))
+        engine = Propagator(variables, clauses)
+        heuristic = make_heuristic('vsids', engine)
+        stats = Stats()
+        stats.instrument(engine, heuristic)
+        with stats.timer('search'):
+            assert not musk.solve(engine, heuristic)
+        assert stats.max_depth > 0 and engine.decisions >= stats.max_depth
+        assert 0 < stats.times['propagation'] <= stats.times['search']
+        lines = stats.lines(engine)
+        assert lines[0].startswith('decisions') and lines[-1].startswith('time total')
+        assert not any(line.startswith('learnt') for line in lines)
+
+    def test_instrumented_cdcl(self):
+        variables, clauses = musk.parse(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        solver = CDCL(variables, clauses)
+        stats = Stats()
+        stats.instrument(solver, solver.heuristic)
+        assert solver.solve()
+        assert stats.times['heuristic'] > 0
+        out = []
+        stats.report(solver, out.append)
+        assert all(line.startswith('c ') for line in out)
+        assert any(line.startswith('c learnt clauses') for line in out)
+
+    def test_disabled_costs_nothing(self):
+        variables, clauses = musk.parse(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        engine = Propagator(variables, clauses)
+        heuristic = make_heuristic('vsids', engine, weight=3)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assert SATanas.solve(engine, heuristic)
+        assert output.getvalue() == ''  # No trace of the decisions
+        assert 'propagate' not in vars(engine) and 'pick' not in vars(heuristic)
+
+
+if __name__ == '__main__':
+    unittest.main()
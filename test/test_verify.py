@@ -0,0 +1,52 @@
+import os
+import unittest
+from sat import verify
+from sat.cdcl import CDCL
+from sat.dimacs import Formula, load_numpy, read_dimacs
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench')
+
+
+class MyTestCase(unittest.TestCase):
+
+    def verifiers(self, formula):
+        yield verify.Verifier(formula, numpy=False)
+        if load_numpy() is not None:
+            yield verify.Verifier(formula)
+
+    def test_models(self):
+        formula = read_dimacs(os.path.join(BENCH, 'cnf-50-212-3.cnf'))
+        solver = CDCL(formula.num_vars, formula)
+        assert solver.solve()
+        model = solver.model()
+        flipped = [[-l if i == j else l for i, l in enumerate(model)] for j in range(len(model))]
+        for verifier in self.verifiers(formula):
+            assert verifier.check(model)
+            assert verifier.check([0] + model + [99])  # Out of range literals are ignored
+            assert not verifier.check(model + [-model[0]])  # Contradictory
+            assert not verifier.check([-v for v in range(1, formula.num_vars + 1)])
+            expected = [all(any(l in set(m) for l in c) for c in formula) for m in flipped]
+            assert verifier.check_batch([model] + flipped) == [True] + expected
+
+    def test_small_batches(self):
+        formula = Formula.from_clauses(3, [[1, -2], [2, 3], [-1, -3]])
+        models = [[a, b, c] for a in (1, -1) for b in (2, -2) for c in (3, -3)]
+        cells = verify.BATCH_CELLS
+        verify.BATCH_CELLS = 12
+        try:
+            for verifier in self.verifiers(formula):
+                assert verifier.check_batch(models) == [False, True, False, False, False, False, True, False]
+        finally:
+            verify.BATCH_CELLS = cells
+        for verifier in self.verifiers(Formula.from_clauses(1, [[1], []])):
+            assert verifier.check_batch([[1]]) == [False]
+
+    def test_parse_output(self):
+        assert verify.parse_output('c x\ns SATISFIABLE\nv 1 -2\nv 3 0\n') == ('SATISFIABLE', [1, -2, 3])
+        assert verify.parse_output('s UNSATISFIABLE\n') == ('UNSATISFIABLE', None)
+        assert verify.parse_output('s SATISFIABLE\nv 1 x 0\n') == ('SATISFIABLE', None)
+        assert verify.parse_output('Traceback') == (None, None)
+
+
+if __name__ == '__main__':
+    unittest.main()